@@ -0,0 +1,231 @@
+"""
+Management command to benchmark routine generation.
+Runs the generation strategies on synthetic problem instances and reports JSON metrics.
+"""
+import json
+import multiprocessing
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from routine.factories.generation_factory import GenerationFactory, STRATEGY_TYPES
+from routine.strategies.genetic_algorithm_strategy import Data, Schedule
+from routine.synthetic_data import build_synthetic_entities, SIZE_OPTIONS
+from core.exceptions import BaseApplicationException
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+# Size options multiplied by --scales (more departments need more rooms and instructors)
+SCALED_OPTIONS = ('departments', 'rooms', 'instructors')
+# Strategies whose worker processes outlive the run (a shared pool), so they are
+# never reaped children of it and RUSAGE_CHILDREN does not cover them
+POOLED_STRATEGIES = ('parallel_genetic_algorithm',)
+# Strategies whose progress reports count something other than generations
+# (sections solved), so there is no generation count to feasibility
+NO_GENERATIONS_STRATEGIES = ('constraint_programming',)
+
+
+def _peak_rss_mb(who: int) -> Optional[float]:
+    """Peak resident set size of this process (or its largest child) in MB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux, in bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_benchmark(strategy_type: str, size: Dict[str, int], seed: int,
+                  params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build one synthetic instance and solve it with one strategy.
+    
+    Repair is given a greedy timetable of the instance whose first room
+    changed. The first progress report without conflicts gives the
+    generations to feasibility (0 when the starting schedule already has
+    none, None when no schedule without conflicts was found or the
+    strategy has no generations). peak_child_rss_mb is None for strategies
+    whose workers are not reaped children of the run.
+    
+    Returns:
+        Metrics of the run
+    """
+    setup_started = time.perf_counter()
+    data = Data(**build_synthetic_entities(seed=seed, **size))
+    kwargs: Dict[str, Any] = {'data': data, 'progress_interval': 0}
+    if strategy_type == 'repair':
+        kwargs['base'] = Schedule(data, np.random.default_rng(seed)).initialize_greedy().serialize()
+        kwargs['changed'] = {'rooms': [room.r_number for room in data.get_rooms()[:1]]}
+    feasible_at: List[int] = []
+    
+    def on_progress(progress: Dict[str, Any]) -> None:
+        if progress['conflicts'] == 0 and not feasible_at:
+            feasible_at.append(progress['generation'])
+    
+    kwargs['progress_callback'] = on_progress
+    strategy = GenerationFactory.create_strategy(strategy_type, seed=seed, **params)
+    setup_time = time.perf_counter() - setup_started
+    
+    started = time.perf_counter()
+    result = strategy.generate(**kwargs)
+    wall_time = time.perf_counter() - started
+    
+    evaluations = result.get('evaluations')
+    if result['conflicts'] > 0 or strategy_type in NO_GENERATIONS_STRATEGIES:
+        generations_to_feasibility = None
+    else:
+        generations_to_feasibility = feasible_at[0] if feasible_at else 0
+    return {
+        'strategy': strategy_type,
+        'seed': seed,
+        'classes': len(result['schedule']),
+        'setup_time_s': round(setup_time, 4),
+        'wall_time_s': round(wall_time, 4),
+        'evaluations': evaluations,
+        'evaluations_per_second': round(evaluations / wall_time, 1) if evaluations and wall_time else None,
+        'generations': result['generations'],
+        'generations_to_feasibility': generations_to_feasibility,
+        'final_conflicts': result['conflicts'],
+        'fitness': result['fitness'],
+        'stop_reason': result.get('stop_reason'),
+        'peak_rss_mb': _peak_rss_mb(resource.RUSAGE_SELF) if resource else None,
+        'peak_child_rss_mb': (_peak_rss_mb(resource.RUSAGE_CHILDREN)
+                              if resource and strategy_type not in POOLED_STRATEGIES else None),
+    }
+
+
+class Command(BaseCommand):
+    """Command to benchmark the generation strategies on synthetic data."""
+    
+    help = ('Benchmark the routine generation strategies on synthetic instances '
+            'and print the metrics as JSON')
+    # Synthetic instances live in memory, no database or URLconf is needed
+    requires_system_checks = []
+    
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        for option, default in SIZE_OPTIONS.items():
+            parser.add_argument(
+                f"--{option.replace('_', '-')}",
+                type=int,
+                default=default,
+                help=f"{option.replace('_', ' ').capitalize()} of the instance (default {default})",
+            )
+        parser.add_argument(
+            '--scales',
+            type=float,
+            nargs='+',
+            default=[1.0],
+            help='Instance sizes to run, as multiples of the departments, rooms and instructors',
+        )
+        parser.add_argument(
+            '--strategies',
+            nargs='+',
+            choices=STRATEGY_TYPES,
+            default=list(STRATEGY_TYPES),
+            help='Strategies to run (default all)',
+        )
+        parser.add_argument(
+            '--seeds',
+            type=int,
+            nargs='+',
+            default=[0],
+            help='Seeds of the instances and runs; every strategy runs once per seed',
+        )
+        parser.add_argument(
+            '--max-generations',
+            type=int,
+            default=1000,
+            help='Maximum generations (sweeps) of the search strategies',
+        )
+        parser.add_argument(
+            '--population-size',
+            type=int,
+            default=None,
+            help='Population size of the genetic strategies (default theirs)',
+        )
+        parser.add_argument(
+            '--time-limit',
+            type=float,
+            default=None,
+            help='Time limit of every run in seconds',
+        )
+        parser.add_argument(
+            '--in-process',
+            action='store_true',
+            help='Run in this process instead of a fresh one per run (peak RSS is then cumulative)',
+        )
+        parser.add_argument(
+            '--output',
+            default=None,
+            help='File to write the JSON report to (default stdout)',
+        )
+        parser.add_argument(
+            '--indent',
+            type=int,
+            default=2,
+            help='Indentation of the JSON report',
+        )
+    
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Execute the command."""
+        params: Dict[str, Any] = {'max_generations': options['max_generations']}
+        if options['population_size'] is not None:
+            params['population_size'] = options['population_size']
+        if options['time_limit'] is not None:
+            params['time_limit_seconds'] = options['time_limit']
+        
+        runs = []
+        for scale in options['scales']:
+            size = {
+                option: max(1, round(options[option] * scale)) if option in SCALED_OPTIONS else options[option]
+                for option in SIZE_OPTIONS
+            }
+            for strategy_type in options['strategies']:
+                for seed in options['seeds']:
+                    run = self._run(strategy_type, size, seed, params, options['in_process'])
+                    runs.append({'scale': scale, 'size': size, **run})
+                    self.stderr.write(
+                        f"{strategy_type} x{scale} seed {seed}: {run['wall_time_s']}s, "
+                        f"{run['final_conflicts']} conflicts"
+                    )
+        
+        report = {
+            'environment': {
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'platform': platform.platform(),
+                'cpu_count': multiprocessing.cpu_count(),
+            },
+            'params': params,
+            'runs': runs,
+        }
+        output = json.dumps(report, indent=options['indent'] or None)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+            self.stderr.write(self.style.SUCCESS(f"Benchmark report written to {options['output']}"))
+        else:
+            self.stdout.write(output)
+    
+    @staticmethod
+    def _run(strategy_type: str, size: Dict[str, int], seed: int, params: Dict[str, Any],
+             in_process: bool) -> Dict[str, Any]:
+        """Run one benchmark, in a fresh spawned process unless in_process."""
+        try:
+            if in_process:
+                return run_benchmark(strategy_type, size, seed, params)
+            # A fresh process per run, so peak RSS belongs to this run alone
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                return executor.submit(run_benchmark, strategy_type, size, seed, params).result()
+        except BaseApplicationException as e:
+            raise CommandError(f"{strategy_type} failed: {e.message}")
@@ -1,33 +1,92 @@
 """
 Management command to create sample data.
-Example command following the boilerplate template.
+Generates a reproducible synthetic scheduling dataset with bulk writes.
 """
-from django.core.management.base import BaseCommand
+import time
+from django.core.management.base import BaseCommand, CommandError
 from typing import Any
 
+from core.exceptions import BaseApplicationException
+from core.repositories.mongodb_repository import BULK_BATCH_SIZE
+from routine.repositories import (
+    RoomRepository, MeetingTimeRepository, InstructorRepository, CourseRepository,
+    DepartmentRepository, SectionRepository
+)
+from routine.services.snapshot_cache_service import SnapshotCacheService
+from routine.synthetic_data import build_synthetic_records, SIZE_OPTIONS
+
+
+# Repository of every entity list, in insertion order (referenced documents first)
+REPOSITORIES = {
+    'rooms': RoomRepository,
+    'meeting_times': MeetingTimeRepository,
+    'instructors': InstructorRepository,
+    'courses': CourseRepository,
+    'depts': DepartmentRepository,
+    'sections': SectionRepository,
+}
+
 
 class Command(BaseCommand):
     """Command to create sample data for development/testing."""
     
-    help = 'Create sample data for the application'
+    help = ('Create a synthetic scheduling dataset (departments, rooms, instructors, '
+            'meeting times, courses and sections) with bulk inserts')
     
     def add_arguments(self, parser):
         """Add command arguments."""
+        for option, default in SIZE_OPTIONS.items():
+            parser.add_argument(
+                f"--{option.replace('_', '-')}",
+                type=int,
+                default=default,
+                help=f"{option.replace('_', ' ').capitalize()} to create (default {default})",
+            )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Seed of the generator; the same options create the same dataset',
+        )
         parser.add_argument(
-            '--number',
+            '--batch-size',
             type=int,
-            default=10,
-            help='Number of items to create',
+            default=BULK_BATCH_SIZE,
+            help='Documents per insert_many call',
+        )
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Delete the existing rooms, instructors, meeting times, courses, '
+                 'departments and sections first',
         )
     
     def handle(self, *args: Any, **options: Any) -> None:
         """Execute the command."""
-        number = options['number']
+        started = time.perf_counter()
+        try:
+            records = build_synthetic_records(
+                seed=options['seed'], **{option: options[option] for option in SIZE_OPTIONS}
+            )
+            self.stdout.write(
+                f"Generated {sum(len(documents) for documents in records.values())} documents "
+                f"in {time.perf_counter() - started:.2f}s"
+            )
+            
+            repositories = {name: repository() for name, repository in REPOSITORIES.items()}
+            if options['clear']:
+                # Sections first, so no reference ever points to a deleted document
+                for name in reversed(list(repositories)):
+                    repositories[name].delete_all()
+            for name, repository in repositories.items():
+                inserted = repository.bulk_insert(records[name], options['batch_size'])
+                self.stdout.write(f"  {name}: {inserted}")
+        except BaseApplicationException as e:
+            raise CommandError(e.message)
+        finally:
+            # Bulk writes send no document signals; this also reaches other processes
+            SnapshotCacheService.invalidate()
+        
         self.stdout.write(
-            self.style.SUCCESS(f'Creating {number} sample items...')
+            self.style.SUCCESS(f'Sample data created in {time.perf_counter() - started:.2f}s')
         )
-        # Add your data creation logic here
-        self.stdout.write(
-            self.style.SUCCESS('Sample data created successfully!')
-        )
-
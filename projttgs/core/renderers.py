@@ -0,0 +1,32 @@
+"""
+Custom DRF renderers.
+"""
+import json
+from typing import Any
+
+from rest_framework.renderers import BaseRenderer
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Renderer for Server-Sent Events endpoints.
+    
+    Lets content negotiation accept the 'Accept: text/event-stream' header
+    every EventSource sends. Streams are returned as StreamingHttpResponse
+    and bypass rendering; this renderer only formats plain Responses (such
+    as validation errors) as a single 'error' event.
+    """
+    
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+    
+    @staticmethod
+    def format_event(event: str, payload: Any) -> str:
+        """Format one event with a JSON payload."""
+        return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+    
+    def render(self, data: Any, accepted_media_type: str = None, renderer_context: dict = None) -> bytes:
+        if data is None:
+            return b''
+        return self.format_event('error', data).encode(self.charset)
@@ -4,11 +4,16 @@ Following Repository Pattern - concrete implementation of BaseRepository.
 """
 from typing import Optional, List, Dict, Any
 from mongoengine import Document, DoesNotExist
+from pymongo.errors import BulkWriteError
 
 from core.repositories.base import BaseRepository, ModelType
 from core.exceptions import NotFoundError, DatabaseError
 
 
+# Documents per insert_many call of bulk_insert
+BULK_BATCH_SIZE = 10000
+
+
 class MongoDBRepository(BaseRepository[ModelType]):
     """
     MongoDB repository implementation using mongoengine.
@@ -125,3 +130,44 @@ class MongoDBRepository(BaseRepository[ModelType]):
             return self.model.objects.filter(**kwargs).count() > 0
         except Exception as e:
             raise DatabaseError(f"Error checking existence of {self.model.__name__}: {str(e)}")
+    
+    def bulk_insert(self, documents: List[Dict[str, Any]], batch_size: int = BULK_BATCH_SIZE) -> int:
+        """
+        Insert raw documents with batched insert_many calls.
+        
+        Model validation, signals and per-document round trips are skipped,
+        so the documents must already be in their stored layout (as produced
+        by to_mongo()).
+        
+        Args:
+            documents: Documents keyed by database field name
+            batch_size: Documents per insert_many call
+            
+        Returns:
+            Number of inserted documents
+        """
+        try:
+            collection = self.model._get_collection()
+            for start in range(0, len(documents), batch_size):
+                collection.insert_many(documents[start:start + batch_size], ordered=False)
+            return len(documents)
+        except BulkWriteError as e:
+            errors = e.details.get('writeErrors') or [{}]
+            raise DatabaseError(
+                f"Error bulk inserting {self.model.__name__}: {len(errors)} documents rejected "
+                f"({errors[0].get('errmsg', str(e))})"
+            )
+        except Exception as e:
+            raise DatabaseError(f"Error bulk inserting {self.model.__name__}: {str(e)}")
+    
+    def delete_all(self) -> int:
+        """
+        Delete every instance with one delete_many call, without per-document signals.
+        
+        Returns:
+            Number of deleted documents
+        """
+        try:
+            return self.model._get_collection().delete_many({}).deleted_count
+        except Exception as e:
+            raise DatabaseError(f"Error deleting {self.model.__name__} list: {str(e)}")
@@ -123,6 +123,27 @@ DATABASES = {
     }
 }
 
+# Routine generation snapshot cache: seconds a loaded dataset may be reused
+# before it is reloaded (saves, deletes and bulk writes through the app
+# invalidate it at once in every process; this bounds writes that bypass them).
+ROUTINE_SNAPSHOT_CACHE_TTL = config('ROUTINE_SNAPSHOT_CACHE_TTL', default=300, cast=int)
+
+# Background threads that run asynchronous routine generation jobs
+ROUTINE_GENERATION_WORKERS = config('ROUTINE_GENERATION_WORKERS', default=2, cast=int)
+
+# Seconds a generation job may run before it returns the best schedule found
+# so far; jobs left Queued or Running well past it (their process stopped)
+# are marked Failed.
+ROUTINE_GENERATION_JOB_TIMEOUT = config('ROUTINE_GENERATION_JOB_TIMEOUT', default=3600, cast=float)
+
+# Minimum seconds between two streamed generation progress events
+ROUTINE_PROGRESS_EVENT_INTERVAL = config('ROUTINE_PROGRESS_EVENT_INTERVAL', default=0.1, cast=float)
+
+# Upper bound in seconds on synchronous and streamed generation requests, which
+# then return the best schedule found so far (0 disables the cap; jobs are
+# capped by ROUTINE_GENERATION_JOB_TIMEOUT instead).
+ROUTINE_SYNC_TIME_LIMIT = config('ROUTINE_SYNC_TIME_LIMIT', default=0, cast=float)
+
 # Skip migrations for routine app since it uses MongoDB (mongoengine), not Django ORM
 MIGRATION_MODULES = {
     'routine': None,
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class RoutineConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'routine'
+    
+    def ready(self):
+        # Keep the cached generation snapshot in sync with document changes
+        from routine.services.snapshot_cache_service import SnapshotCacheService
+        SnapshotCacheService.connect_signals()
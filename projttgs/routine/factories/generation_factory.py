@@ -5,8 +5,16 @@ Following Factory Pattern - centralizes strategy creation.
 from typing import Optional
 from routine.strategies.base_strategy import BaseGenerationStrategy
 from routine.strategies.genetic_algorithm_strategy import GeneticAlgorithmStrategy
+from routine.strategies.parallel_genetic_algorithm_strategy import ParallelGeneticAlgorithmStrategy
+from routine.strategies.simulated_annealing_strategy import SimulatedAnnealingStrategy
+from routine.strategies.constraint_programming_strategy import ConstraintProgrammingStrategy
+from routine.strategies.repair_strategy import RepairStrategy
 from core.exceptions import ValidationError
 
+# Strategy types create_strategy accepts
+STRATEGY_TYPES = ('genetic_algorithm', 'parallel_genetic_algorithm', 'simulated_annealing',
+                  'constraint_programming', 'repair')
+
 
 class GenerationFactory:
     """
@@ -20,7 +28,9 @@ class GenerationFactory:
         Create a generation strategy based on type.
         
         Args:
-            strategy_type: Type of strategy ('genetic_algorithm', etc.)
+            strategy_type: Type of strategy ('genetic_algorithm',
+                'parallel_genetic_algorithm', 'simulated_annealing',
+                'constraint_programming', 'repair', etc.)
             **kwargs: Strategy-specific parameters
             
         Returns:
@@ -31,6 +41,14 @@ class GenerationFactory:
         """
         if strategy_type == 'genetic_algorithm':
             return GeneticAlgorithmStrategy(**kwargs)
+        elif strategy_type == 'parallel_genetic_algorithm':
+            return ParallelGeneticAlgorithmStrategy(**kwargs)
+        elif strategy_type == 'simulated_annealing':
+            return SimulatedAnnealingStrategy(**kwargs)
+        elif strategy_type == 'constraint_programming':
+            return ConstraintProgrammingStrategy(**kwargs)
+        elif strategy_type == 'repair':
+            return RepairStrategy(**kwargs)
         else:
             raise ValidationError(f"Unknown strategy type: {strategy_type}")
     
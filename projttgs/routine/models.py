@@ -164,6 +164,8 @@ class GenerationHistory(Document):
     )
     strategy_type = fields.StringField(max_length=50, default='genetic_algorithm')
     parameters = fields.DictField(default=dict)  # population_size, max_generations, mutation_rate
+    stop_reason = fields.StringField(max_length=20, null=True)  # solved, stagnation, time_limit, ...
+    profile = fields.DictField(null=True)  # phase timings and counters of profiled runs
     created_by = fields.StringField(max_length=100, null=True)  # User ID or username
     created_at = fields.DateTimeField(default=datetime.utcnow)
     
@@ -175,3 +177,54 @@ class GenerationHistory(Document):
     
     def __str__(self) -> str:
         return f'Generation {self.timestamp} - Fitness: {self.fitness_score}'
+
+
+class GenerationJob(Document):
+    """Asynchronous routine generation job and its persisted result."""
+    STATUS_QUEUED = 'Queued'
+    STATUS_RUNNING = 'Running'
+    STATUS_COMPLETED = 'Completed'
+    STATUS_FAILED = 'Failed'
+    STATUS_CANCELLED = 'Cancelled'
+    FINISHED_STATUSES = (STATUS_COMPLETED, STATUS_FAILED, STATUS_CANCELLED)
+    
+    status = fields.StringField(
+        max_length=10,
+        choices=[(s, s) for s in (STATUS_QUEUED, STATUS_RUNNING, STATUS_COMPLETED,
+                                  STATUS_FAILED, STATUS_CANCELLED)],
+        default=STATUS_QUEUED,
+        required=True
+    )
+    strategy_type = fields.StringField(max_length=50, default='genetic_algorithm')
+    parameters = fields.DictField(default=dict)
+    progress = fields.DictField(default=dict)  # generation, best_fitness, conflicts
+    result = fields.DictField(null=True)  # same shape as the synchronous generation response
+    error = fields.StringField(null=True)
+    cancel_requested = fields.BooleanField(default=False)
+    history = fields.ReferenceField('GenerationHistory', null=True)
+    created_by = fields.StringField(max_length=100, null=True)
+    created_at = fields.DateTimeField(default=datetime.utcnow)
+    started_at = fields.DateTimeField(null=True)
+    finished_at = fields.DateTimeField(null=True)
+    
+    meta = {
+        'collection': 'routine_generationjob',
+        'indexes': ['-created_at', 'status', 'created_by'],
+        'ordering': ['-created_at']
+    }
+    
+    def __str__(self) -> str:
+        return f'Generation job {self.pk} - {self.status}'
+
+
+class DatasetVersion(Document):
+    """Shared change counter of a dataset, so every process sees another's changes."""
+    name = fields.StringField(max_length=50, primary_key=True)
+    version = fields.IntField(default=0)
+    
+    meta = {
+        'collection': 'routine_datasetversion',
+    }
+    
+    def __str__(self) -> str:
+        return f'{self.name} v{self.version}'
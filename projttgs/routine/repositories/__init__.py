@@ -8,6 +8,9 @@ from .course_repository import CourseRepository
 from .department_repository import DepartmentRepository
 from .section_repository import SectionRepository
 from .generation_history_repository import GenerationHistoryRepository
+from .generation_job_repository import GenerationJobRepository
+from .snapshot_repository import SnapshotRepository
+from .dataset_version_repository import DatasetVersionRepository
 
 __all__ = [
     'RoomRepository',
@@ -17,5 +20,8 @@ __all__ = [
     'DepartmentRepository',
     'SectionRepository',
     'GenerationHistoryRepository',
+    'GenerationJobRepository',
+    'SnapshotRepository',
+    'DatasetVersionRepository',
 ]
 
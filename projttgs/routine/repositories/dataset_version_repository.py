@@ -0,0 +1,41 @@
+"""
+Dataset version repository implementation.
+"""
+from core.repositories.mongodb_repository import MongoDBRepository
+from core.exceptions import DatabaseError
+from routine.models import DatasetVersion
+
+
+class DatasetVersionRepository(MongoDBRepository[DatasetVersion]):
+    """Repository for DatasetVersion model."""
+    
+    def __init__(self):
+        super().__init__(DatasetVersion)
+    
+    def get_version(self, name: str) -> int:
+        """
+        Get the current version of a dataset with one primary key lookup.
+        
+        Args:
+            name: Dataset name
+            
+        Returns:
+            Version, 0 if the dataset never changed
+        """
+        try:
+            document = self.model.objects(pk=name).only('version').first()
+            return document.version if document else 0
+        except Exception as e:
+            raise DatabaseError(f"Error reading {self.model.__name__}: {str(e)}")
+    
+    def bump(self, name: str) -> None:
+        """
+        Atomically increment the version of a dataset, creating it if needed.
+        
+        Args:
+            name: Dataset name
+        """
+        try:
+            self.model.objects(pk=name).update_one(inc__version=1, upsert=True)
+        except Exception as e:
+            raise DatabaseError(f"Error updating {self.model.__name__}: {str(e)}")
@@ -0,0 +1,78 @@
+"""
+Generation job repository implementation.
+"""
+from datetime import datetime
+from typing import Any, Optional
+from mongoengine import Q
+from core.repositories.mongodb_repository import MongoDBRepository
+from core.exceptions import DatabaseError
+from routine.models import GenerationJob
+
+
+class GenerationJobRepository(MongoDBRepository[GenerationJob]):
+    """Repository for GenerationJob model."""
+    
+    def __init__(self):
+        super().__init__(GenerationJob)
+    
+    def update_fields(self, pk: Any, **kwargs) -> None:
+        """
+        Atomically set fields on a job without loading it.
+        
+        Args:
+            pk: Job primary key
+            **kwargs: Field values to set
+        """
+        try:
+            self.model.objects(pk=pk).update(**{f'set__{key}': value for key, value in kwargs.items()})
+        except Exception as e:
+            raise DatabaseError(f"Error updating {self.model.__name__}: {str(e)}")
+    
+    def is_cancel_requested(self, pk: Any) -> bool:
+        """
+        Check whether cancellation was requested for a job.
+        
+        Args:
+            pk: Job primary key
+            
+        Returns:
+            True if the job should stop
+        """
+        job = self.model.objects(pk=pk).only('cancel_requested').first()
+        return bool(job and job.cancel_requested)
+    
+    def fail_stale(self, cutoff: datetime, error: str) -> int:
+        """
+        Atomically mark unfinished jobs that made no progress since cutoff as Failed.
+        
+        Running jobs started before cutoff and queued jobs created before it
+        are stale.
+        
+        Args:
+            cutoff: Latest start (or creation, for queued jobs) of a stale job
+            error: Error message stored on the failed jobs
+            
+        Returns:
+            Number of jobs marked as failed
+        """
+        try:
+            return self.model.objects(
+                Q(status=GenerationJob.STATUS_RUNNING, started_at__lt=cutoff)
+                | Q(status=GenerationJob.STATUS_QUEUED, created_at__lt=cutoff)
+            ).update(set__status=GenerationJob.STATUS_FAILED, set__error=error,
+                     set__finished_at=datetime.utcnow())
+        except Exception as e:
+            raise DatabaseError(f"Error updating {self.model.__name__}: {str(e)}")
+    
+    def get_latest_result(self) -> Optional[GenerationJob]:
+        """
+        Get the most recently finished job that produced a schedule.
+        
+        Returns:
+            Job with its result loaded, or None
+        """
+        try:
+            return (self.model.objects(status=GenerationJob.STATUS_COMPLETED, result__ne=None)
+                    .order_by('-finished_at').only('result').first())
+        except Exception as e:
+            raise DatabaseError(f"Error loading latest generation result: {str(e)}")
@@ -1,7 +1,9 @@
 """
 Section repository implementation.
 """
+from typing import List
 from core.repositories.mongodb_repository import MongoDBRepository
+from core.exceptions import DatabaseError
 from routine.models import Section
 
 
@@ -11,3 +13,19 @@ class SectionRepository(MongoDBRepository[Section]):
     def __init__(self):
         super().__init__(Section)
 
+    
+    def get_assignments(self) -> List[Section]:
+        """
+        Get the persisted assignment of every section, without dereferencing.
+        
+        Returns:
+            Sections with section_id, course, meeting_time, room and
+            instructor loaded; references are left as DBRefs
+        """
+        try:
+            return list(
+                self.model.objects.only('section_id', 'course', 'meeting_time', 'room', 'instructor')
+                .no_dereference()
+            )
+        except Exception as e:
+            raise DatabaseError(f"Error loading section assignments: {str(e)}")
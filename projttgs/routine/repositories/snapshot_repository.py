@@ -0,0 +1,119 @@
+"""
+Snapshot repository implementation.
+Loads everything routine generation needs in one bulk, read-only pass.
+"""
+import logging
+import time
+from typing import Any, Dict, List
+
+from routine.models import Room, Instructor, MeetingTime, Course, Department, Section
+from core.exceptions import DatabaseError
+
+logger = logging.getLogger(__name__)
+
+
+# Fields the scheduler reads from each collection
+ROOM_FIELDS = ('r_number', 'seating_capacity')
+INSTRUCTOR_FIELDS = ('uid', 'name')
+MEETING_TIME_FIELDS = ('pid', 'day', 'time')
+COURSE_FIELDS = ('course_number', 'course_name', 'max_numb_students', 'instructors')
+DEPARTMENT_FIELDS = ('dept_name', 'courses')
+SECTION_FIELDS = ('section_id', 'department', 'num_class_in_week')
+
+
+def _ref_id(reference: Any) -> Any:
+    """Primary key of an undereferenced reference (DBRef, Document or raw id)."""
+    return getattr(reference, 'id', reference)
+
+
+def resolve_references(loaded: Dict[str, List[Any]]) -> Dict[str, List[Any]]:
+    """
+    Replace undereferenced references between loaded entities with the entities themselves.
+    
+    Course.instructors, Department.courses and Section.department are
+    resolved by id in place; dangling references are dropped, and so are
+    sections whose department no longer exists, as they cannot be scheduled.
+    
+    Args:
+        loaded: Dictionary with instructors, courses, depts and sections lists
+    
+    Returns:
+        The same dictionary
+    """
+    instructors_by_id = {instructor.pk: instructor for instructor in loaded['instructors']}
+    courses_by_id = {course.pk: course for course in loaded['courses']}
+    depts_by_id = {dept.pk: dept for dept in loaded['depts']}
+    
+    for course in loaded['courses']:
+        course.instructors = [
+            instructors_by_id[_ref_id(ref)] for ref in course.instructors
+            if _ref_id(ref) in instructors_by_id
+        ]
+    for dept in loaded['depts']:
+        dept.courses = [
+            courses_by_id[_ref_id(ref)] for ref in dept.courses
+            if _ref_id(ref) in courses_by_id
+        ]
+    sections = []
+    for section in loaded['sections']:
+        dept = depts_by_id.get(_ref_id(section.department))
+        if dept is not None:
+            section.department = dept
+            sections.append(section)
+    loaded['sections'] = sections
+    return loaded
+
+
+class SnapshotRepository:
+    """
+    Read-only repository that loads the scheduling problem in bulk.
+    
+    Each collection is fetched exactly once with a projection of the fields
+    the scheduler needs and without automatic dereferencing. References
+    (Course.instructors, Department.courses, Section.department) are then
+    resolved in memory by id, so no per-document queries are issued.
+    """
+    
+    def __init__(self):
+        self.last_stats: Dict[str, Any] = {}
+    
+    def load(self) -> Dict[str, List[Any]]:
+        """
+        Load all scheduling entities.
+        
+        Returns:
+            Dictionary with rooms, meeting_times, instructors, courses,
+            depts and sections lists, ready to be passed to Data. Load
+            duration, collections read and documents loaded are stored in
+            last_stats.
+        
+        Raises:
+            DatabaseError: If any collection cannot be read
+        """
+        started = time.perf_counter()
+        try:
+            loaded = {
+                name: list(queryset) for name, queryset in (
+                    ('rooms', Room.objects.only(*ROOM_FIELDS)),
+                    ('instructors', Instructor.objects.only(*INSTRUCTOR_FIELDS)),
+                    ('meeting_times', MeetingTime.objects.only(*MEETING_TIME_FIELDS)),
+                    ('courses', Course.objects.only(*COURSE_FIELDS).no_dereference()),
+                    ('depts', Department.objects.only(*DEPARTMENT_FIELDS).no_dereference()),
+                    ('sections', Section.objects.only(*SECTION_FIELDS).no_dereference()),
+                )
+            }
+        except Exception as e:
+            raise DatabaseError(f"Error loading scheduling snapshot: {str(e)}")
+        resolve_references(loaded)
+        
+        self.last_stats = {
+            'duration_ms': round((time.perf_counter() - started) * 1000, 3),
+            'collections': len(loaded),
+            'documents': sum(len(documents) for documents in loaded.values()),
+        }
+        logger.info(
+            f"Loaded scheduling snapshot: {self.last_stats['documents']} documents, "
+            f"{self.last_stats['collections']} collections, {self.last_stats['duration_ms']} ms"
+        )
+        
+        return loaded
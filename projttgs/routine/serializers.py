@@ -6,6 +6,8 @@ from rest_framework import serializers
 from routine.models import (
     Room, Instructor, MeetingTime, Course, Department, Section
 )
+from routine.strategies.soft_constraints import build_soft_constraints
+from core.exceptions import ValidationError
 
 
 class RoomSerializer(serializers.Serializer):
@@ -255,13 +257,52 @@ class SectionSerializer(serializers.Serializer):
 class RoutineGenerationSerializer(serializers.Serializer):
     """Serializer for routine generation request."""
     strategy_type = serializers.ChoiceField(
-        choices=['genetic_algorithm'],
+        choices=['genetic_algorithm', 'parallel_genetic_algorithm', 'simulated_annealing',
+                 'constraint_programming'],
         default='genetic_algorithm',
         required=False
     )
     population_size = serializers.IntegerField(default=9, required=False, min_value=1, max_value=100)
     max_generations = serializers.IntegerField(default=1000, required=False, min_value=1, max_value=10000)
     mutation_rate = serializers.FloatField(default=0.1, required=False, min_value=0.0, max_value=1.0)
+    warm_start = serializers.ChoiceField(
+        choices=['persisted', 'previous'],
+        required=False,
+        allow_null=True
+    )
+    warm_start_job_id = serializers.CharField(required=False, allow_null=True)
+    seed = serializers.IntegerField(required=False, allow_null=True, min_value=0, max_value=2 ** 32 - 1)
+    target_conflicts = serializers.IntegerField(default=0, required=False, min_value=0)
+    stagnation_generations = serializers.IntegerField(required=False, allow_null=True, min_value=1)
+    adaptive_mutation = serializers.BooleanField(default=False, required=False)
+    time_limit_seconds = serializers.FloatField(required=False, allow_null=True, min_value=0.0)
+    soft_constraints = serializers.DictField(child=serializers.DictField(), required=False, allow_null=True)
+    profile = serializers.BooleanField(default=False, required=False)
+    profile_allocations = serializers.BooleanField(default=False, required=False)
+    
+    def validate_soft_constraints(self, value):
+        """Reject unknown soft constraints and invalid parameters before generation starts."""
+        try:
+            build_soft_constraints(value)
+        except ValidationError as e:
+            raise serializers.ValidationError(e.message)
+        return value
+
+
+class RoutineRepairSerializer(serializers.Serializer):
+    """Serializer for routine repair request."""
+    rooms = serializers.ListField(child=serializers.CharField(), required=False, default=list)
+    instructors = serializers.ListField(child=serializers.CharField(), required=False, default=list)
+    meeting_times = serializers.ListField(child=serializers.CharField(), required=False, default=list)
+    base = serializers.ChoiceField(
+        choices=['persisted', 'previous'],
+        default='previous',
+        required=False
+    )
+    base_job_id = serializers.CharField(required=False, allow_null=True)
+    max_rounds = serializers.IntegerField(default=20, required=False, min_value=1, max_value=1000)
+    seed = serializers.IntegerField(required=False, allow_null=True, min_value=0, max_value=2 ** 32 - 1)
+    time_limit_seconds = serializers.FloatField(required=False, allow_null=True, min_value=0.0)
 
 
 class TimetableItemSerializer(serializers.Serializer):
@@ -287,6 +328,16 @@ class TimetableSerializer(serializers.Serializer):
     fitness = serializers.FloatField()
     conflicts = serializers.IntegerField()
     generations = serializers.IntegerField()
+    infeasible_sections = serializers.ListField(
+        child=serializers.DictField(child=serializers.CharField()), required=False
+    )
+    changed_classes = serializers.IntegerField(required=False)
+    seed = serializers.IntegerField(required=False)
+    stop_reason = serializers.CharField(required=False, allow_null=True)
+    timed_out = serializers.BooleanField(required=False)
+    soft_penalty = serializers.FloatField(required=False)
+    soft_violations = serializers.DictField(child=serializers.FloatField(), required=False)
+    profile = serializers.DictField(required=False)
 
 
 class GenerationHistorySerializer(serializers.Serializer):
@@ -299,10 +350,34 @@ class GenerationHistorySerializer(serializers.Serializer):
     status = serializers.CharField(read_only=True)
     strategy_type = serializers.CharField(read_only=True)
     parameters = serializers.DictField(read_only=True)
+    stop_reason = serializers.CharField(read_only=True, allow_null=True)
+    profile = serializers.DictField(read_only=True, allow_null=True)
     created_by = serializers.CharField(read_only=True, allow_null=True)
     created_at = serializers.DateTimeField(read_only=True)
 
 
+class GenerationJobSerializer(serializers.Serializer):
+    """Serializer for asynchronous generation job status."""
+    id = serializers.CharField(read_only=True)
+    status = serializers.CharField(read_only=True)
+    strategy_type = serializers.CharField(read_only=True)
+    parameters = serializers.DictField(read_only=True)
+    progress = serializers.DictField(read_only=True)
+    result = TimetableSerializer(read_only=True, allow_null=True)
+    error = serializers.CharField(read_only=True, allow_null=True)
+    cancel_requested = serializers.BooleanField(read_only=True)
+    history_id = serializers.SerializerMethodField()
+    created_by = serializers.CharField(read_only=True, allow_null=True)
+    created_at = serializers.DateTimeField(read_only=True)
+    started_at = serializers.DateTimeField(read_only=True, allow_null=True)
+    finished_at = serializers.DateTimeField(read_only=True, allow_null=True)
+    
+    def get_history_id(self, obj):
+        """Return the linked generation history ID without dereferencing it."""
+        history = obj._data.get('history')
+        return str(history.id) if history is not None else None
+
+
 class CountsSerializer(serializers.Serializer):
     """Serializer for entity counts."""
     rooms = serializers.IntegerField()
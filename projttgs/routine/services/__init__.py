@@ -5,10 +5,18 @@ Following Service Layer Pattern - business logic isolation.
 from .routine_generation_service import RoutineGenerationService
 from .timetable_service import TimetableService
 from .pdf_generation_service import PDFGenerationService
+from .snapshot_cache_service import SnapshotCacheService
+from .generation_job_service import GenerationJobService
+from .generation_stream_service import GenerationStreamService
+from .warm_start_service import WarmStartService
 
 __all__ = [
     'RoutineGenerationService',
     'TimetableService',
     'PDFGenerationService',
+    'SnapshotCacheService',
+    'GenerationJobService',
+    'GenerationStreamService',
+    'WarmStartService',
 ]
 
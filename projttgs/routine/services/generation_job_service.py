@@ -0,0 +1,244 @@
+"""
+Generation job service.
+Following Single Responsibility Principle - runs routine generation as background jobs.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+
+from django.conf import settings
+
+from routine.models import GenerationJob
+from routine.repositories.generation_job_repository import GenerationJobRepository
+from routine.repositories.generation_history_repository import GenerationHistoryRepository
+from routine.services.routine_generation_service import RoutineGenerationService
+from core.services.base import BaseService
+from core.exceptions import NotFoundError, ValidationError
+
+# Minimum seconds between two progress writes of one job
+PROGRESS_WRITE_INTERVAL = 1.0
+
+# Seconds between two cancel polls of a running job
+CANCEL_POLL_INTERVAL = 0.5
+
+# Seconds a job may finish its result after its timeout before it counts as stale
+STALE_JOB_GRACE = 60
+
+
+class GenerationJobService(BaseService):
+    """
+    Service for asynchronous routine generation jobs.
+    
+    Jobs run in a process-wide thread pool (ROUTINE_GENERATION_WORKERS
+    threads, no external broker). Job state, throttled progress and the
+    final result are persisted on GenerationJob documents, so status and
+    cancel requests may be served by any worker process.
+    
+    A job runs for at most ROUTINE_GENERATION_JOB_TIMEOUT seconds and then
+    completes with the best schedule found so far. Jobs of a process that
+    died are lost with its thread pool, so a job still Queued or Running
+    well past that timeout is stale: it is marked Failed when it is
+    fetched and whenever a process starts its thread pool.
+    """
+    
+    _executor: Optional[ThreadPoolExecutor] = None
+    _executor_lock = threading.Lock()
+    
+    def __init__(self, job_repository: GenerationJobRepository = None,
+                 history_repository: GenerationHistoryRepository = None):
+        """
+        Initialize service with repository dependencies.
+        
+        Args:
+            job_repository: Generation job repository instance
+            history_repository: Generation history repository instance
+        """
+        super().__init__()
+        self.job_repository = job_repository or GenerationJobRepository()
+        self.history_repository = history_repository or GenerationHistoryRepository()
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if GenerationJobService._executor is None:
+                self.recover_stale_jobs()
+                GenerationJobService._executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'ROUTINE_GENERATION_WORKERS', 2),
+                    thread_name_prefix='routine-generation'
+                )
+            return GenerationJobService._executor
+    
+    @staticmethod
+    def _job_timeout() -> float:
+        return getattr(settings, 'ROUTINE_GENERATION_JOB_TIMEOUT', 3600)
+    
+    def _stale_cutoff(self) -> datetime:
+        """Latest start (or creation, for queued jobs) of a job that should have finished."""
+        return datetime.utcnow() - timedelta(seconds=self._job_timeout() + STALE_JOB_GRACE)
+    
+    def recover_stale_jobs(self) -> int:
+        """
+        Mark jobs left Queued or Running by a process that died as Failed.
+        
+        Returns:
+            Number of recovered jobs
+        """
+        recovered = self.job_repository.fail_stale(
+            self._stale_cutoff(), error='Generation job was interrupted (its worker process stopped)'
+        )
+        if recovered:
+            self.log_warning(f"Marked {recovered} stale generation jobs as failed")
+        return recovered
+    
+    def submit(self, strategy_type: str, parameters: Dict[str, Any],
+               created_by: Optional[str] = None) -> GenerationJob:
+        """
+        Queue a generation job and return immediately.
+        
+        Args:
+            strategy_type: Type of generation strategy to use
+            parameters: Strategy parameters (population_size, max_generations, ...)
+            created_by: Username of the requester
+        
+        Returns:
+            Created job in Queued state
+        """
+        job = self.job_repository.create(
+            strategy_type=strategy_type,
+            parameters=parameters,
+            created_by=created_by,
+        )
+        self._get_executor().submit(self._run, job.pk)
+        return job
+    
+    def get_job(self, job_id: str) -> GenerationJob:
+        """
+        Get a job by ID.
+        
+        Raises:
+            NotFoundError: If the job does not exist
+        """
+        try:
+            job = self.job_repository.get_by_id(job_id)
+        except Exception:
+            job = None
+        if job is None:
+            raise NotFoundError(f"Generation job with id {job_id} not found")
+        if job.status not in GenerationJob.FINISHED_STATUSES:
+            since = job.started_at if job.status == GenerationJob.STATUS_RUNNING else job.created_at
+            if since and since < self._stale_cutoff() and self.recover_stale_jobs():
+                job.reload()
+        return job
+    
+    def cancel(self, job_id: str) -> GenerationJob:
+        """
+        Request cancellation of a job.
+        
+        A queued job is cancelled right away; a running job stops within
+        CANCEL_POLL_INTERVAL seconds and keeps the best schedule found so far.
+        
+        Raises:
+            NotFoundError: If the job does not exist
+            ValidationError: If the job has already finished
+        """
+        job = self.get_job(job_id)
+        if job.status in GenerationJob.FINISHED_STATUSES:
+            raise ValidationError(f"Generation job {job_id} has already finished")
+        
+        if job.status == GenerationJob.STATUS_QUEUED:
+            self.job_repository.update_fields(
+                job.pk, cancel_requested=True,
+                status=GenerationJob.STATUS_CANCELLED, finished_at=datetime.utcnow()
+            )
+        else:
+            self.job_repository.update_fields(job.pk, cancel_requested=True)
+        job.reload()
+        return job
+    
+    def _run(self, job_id: Any) -> None:
+        """Execute a job in a worker thread."""
+        job = self.job_repository.get_by_id(job_id)
+        # Cancelled, or failed as stale while it waited in the queue
+        if job is None or job.cancel_requested or job.status != GenerationJob.STATUS_QUEUED:
+            return
+        
+        self.job_repository.update_fields(
+            job_id, status=GenerationJob.STATUS_RUNNING, started_at=datetime.utcnow()
+        )
+        cancel_event = threading.Event()
+        finished = threading.Event()
+        last_write = [0.0]
+        
+        def on_progress(progress: Dict[str, Any]) -> None:
+            now = time.monotonic()
+            if now - last_write[0] < PROGRESS_WRITE_INTERVAL:
+                return
+            last_write[0] = now
+            self.job_repository.update_fields(job_id, progress=progress)
+        
+        def watch_cancel() -> None:
+            while not finished.wait(CANCEL_POLL_INTERVAL):
+                if self.job_repository.is_cancel_requested(job_id):
+                    cancel_event.set()
+                    return
+        
+        parameters = dict(job.parameters)
+        requested = parameters.get('time_limit_seconds')
+        parameters['time_limit_seconds'] = (self._job_timeout() if requested is None
+                                            else min(requested, self._job_timeout()))
+        threading.Thread(target=watch_cancel, name=f'routine-generation-cancel-{job_id}', daemon=True).start()
+        try:
+            result = RoutineGenerationService().generate_routine(
+                strategy_type=job.strategy_type,
+                progress_callback=on_progress,
+                cancel_event=cancel_event,
+                **parameters
+            )
+            history = self._record_history(job, result, 'Success')
+            self.job_repository.update_fields(
+                job_id,
+                status=(GenerationJob.STATUS_CANCELLED if result.get('cancelled')
+                        else GenerationJob.STATUS_COMPLETED),
+                progress={
+                    'generation': result.get('generations', 0),
+                    'best_fitness': result.get('fitness', 0.0),
+                    'conflicts': result.get('conflicts', 0),
+                },
+                result=result,
+                history=history,
+                finished_at=datetime.utcnow(),
+            )
+        except Exception as e:
+            self.log_error(f"Generation job {job_id} failed", error=e)
+            history = self._record_history(job, None, 'Failed')
+            self.job_repository.update_fields(
+                job_id,
+                status=GenerationJob.STATUS_FAILED,
+                error=getattr(e, 'message', str(e)),
+                history=history,
+                finished_at=datetime.utcnow(),
+            )
+        finally:
+            finished.set()
+    
+    def _record_history(self, job: GenerationJob, result: Optional[Dict[str, Any]],
+                        status: str):
+        """Save the GenerationHistory entry for a finished job."""
+        try:
+            return self.history_repository.create(
+                timestamp=datetime.utcnow(),
+                fitness_score=result.get('fitness', 0.0) if result else 0.0,
+                conflicts_count=result.get('conflicts', 0) if result else 0,
+                generations_run=result.get('generations', 0) if result else 0,
+                status=status,
+                strategy_type=job.strategy_type,
+                stop_reason=result.get('stop_reason') if result else None,
+                profile=result.get('profile') if result else None,
+                # The seed the run used, so it can be repeated exactly
+                parameters=dict(job.parameters, seed=result.get('seed')) if result else job.parameters,
+                created_by=job.created_by,
+            )
+        except Exception as e:
+            self.log_error("Error saving generation history", error=e)
+            return None
@@ -0,0 +1,108 @@
+"""
+Generation stream service.
+Following Single Responsibility Principle - streams routine generation progress as it happens.
+"""
+import queue
+import threading
+from datetime import datetime
+from typing import Dict, Any, Iterator, Optional, Tuple
+
+from django.conf import settings
+
+from routine.repositories.generation_history_repository import GenerationHistoryRepository
+from routine.services.routine_generation_service import RoutineGenerationService
+from core.services.base import BaseService
+
+# Seconds without an event after which a keep-alive is emitted
+KEEPALIVE_INTERVAL = 15.0
+
+
+class GenerationStreamService(BaseService):
+    """
+    Service that runs one routine generation and yields its events live.
+    
+    Generation runs in a helper thread and hands progress reports to the
+    consuming request through a queue. The strategy only reports every
+    ROUTINE_PROGRESS_EVENT_INTERVAL seconds (plus the final generation), so
+    the stream costs a handful of events per second whatever the speed of
+    evolution. Closing the stream cancels the generation.
+    """
+    
+    def __init__(self, generation_service: RoutineGenerationService = None,
+                 history_repository: GenerationHistoryRepository = None):
+        """
+        Initialize service with its dependencies.
+        
+        Args:
+            generation_service: Routine generation service instance
+            history_repository: Generation history repository instance
+        """
+        super().__init__()
+        self.generation_service = generation_service or RoutineGenerationService()
+        self.history_repository = history_repository or GenerationHistoryRepository()
+    
+    def stream(self, strategy_type: str, parameters: Dict[str, Any],
+               created_by: Optional[str] = None) -> Iterator[Tuple[str, Any]]:
+        """
+        Run a generation and yield (event, payload) pairs.
+        
+        Events are 'progress' (per-generation report), 'keepalive' (None),
+        then exactly one of 'result' (generation result) or 'error' (message).
+        
+        Args:
+            strategy_type: Type of generation strategy to use
+            parameters: Strategy parameters (population_size, max_generations, ...)
+            created_by: Username of the requester
+        """
+        events: queue.Queue = queue.Queue()
+        cancel_event = threading.Event()
+        
+        def run() -> None:
+            try:
+                result = self.generation_service.generate_routine(
+                    strategy_type=strategy_type,
+                    progress_callback=lambda progress: events.put(('progress', progress)),
+                    cancel_event=cancel_event,
+                    progress_interval=getattr(settings, 'ROUTINE_PROGRESS_EVENT_INTERVAL', 0.1),
+                    **parameters
+                )
+                self._record_history(strategy_type, parameters, created_by, result)
+                events.put(('result', result))
+            except Exception as e:
+                self._record_history(strategy_type, parameters, created_by, None)
+                events.put(('error', getattr(e, 'message', str(e))))
+        
+        threading.Thread(target=run, name='routine-generation-stream', daemon=True).start()
+        try:
+            while True:
+                try:
+                    event, payload = events.get(timeout=KEEPALIVE_INTERVAL)
+                except queue.Empty:
+                    yield 'keepalive', None
+                    continue
+                yield event, payload
+                if event in ('result', 'error'):
+                    return
+        finally:
+            # Client went away (or the stream ended): stop evolving
+            cancel_event.set()
+    
+    def _record_history(self, strategy_type: str, parameters: Dict[str, Any],
+                        created_by: Optional[str], result: Optional[Dict[str, Any]]) -> None:
+        """Save the GenerationHistory entry for a finished stream."""
+        try:
+            self.history_repository.create(
+                timestamp=datetime.utcnow(),
+                fitness_score=result.get('fitness', 0.0) if result else 0.0,
+                conflicts_count=result.get('conflicts', 0) if result else 0,
+                generations_run=result.get('generations', 0) if result else 0,
+                status='Success' if result else 'Failed',
+                strategy_type=strategy_type,
+                stop_reason=result.get('stop_reason') if result else None,
+                profile=result.get('profile') if result else None,
+                # The seed the run used, so it can be repeated exactly
+                parameters=dict(parameters, seed=result.get('seed')) if result else parameters,
+                created_by=created_by,
+            )
+        except Exception as e:
+            self.log_error("Error saving generation history", error=e)
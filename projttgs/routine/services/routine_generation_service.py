@@ -2,11 +2,15 @@
 Routine generation service.
 Following Single Responsibility Principle - handles routine generation business logic only.
 """
-from typing import Dict, Any
+import threading
+from typing import Dict, Any, Callable, List, Optional
 from routine.factories.generation_factory import GenerationFactory
 from routine.strategies.base_strategy import BaseGenerationStrategy
+from routine.strategies.profiling import GenerationProfiler, NULL_PROFILER, PHASE_DB_LOAD
+from routine.services.snapshot_cache_service import SnapshotCacheService
+from routine.services.warm_start_service import WarmStartService
 from core.services.base import BaseService
-from core.exceptions import RoutineGenerationError
+from core.exceptions import RoutineGenerationError, ValidationError, NotFoundError
 
 
 class RoutineGenerationService(BaseService):
@@ -15,36 +19,90 @@ class RoutineGenerationService(BaseService):
     Following Dependency Inversion Principle - depends on strategy abstraction.
     """
     
-    def __init__(self, strategy: BaseGenerationStrategy = None):
+    def __init__(self, strategy: BaseGenerationStrategy = None,
+                 snapshot_cache: SnapshotCacheService = None,
+                 warm_start_service: WarmStartService = None):
         """
         Initialize service with a generation strategy.
         
         Args:
-            strategy: Generation strategy (defaults to genetic algorithm)
+            strategy: Generation strategy, used when generate_routine gets no
+                strategy parameters (defaults to genetic algorithm)
+            snapshot_cache: Cache of loaded generation data
+            warm_start_service: Source of previous timetables for warm starts
         """
         super().__init__()
         self.strategy = strategy or GenerationFactory.get_default_strategy()
+        self.snapshot_cache = snapshot_cache or SnapshotCacheService()
+        self.warm_start_service = warm_start_service or WarmStartService()
     
-    def generate_routine(self, strategy_type: str = 'genetic_algorithm', **kwargs) -> Dict[str, Any]:
+    def generate_routine(self, strategy_type: str = 'genetic_algorithm',
+                         progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                         cancel_event: Optional[threading.Event] = None,
+                         progress_interval: float = 0.0,
+                         warm_start: Optional[str] = None,
+                         warm_start_job_id: Optional[str] = None,
+                         profile: bool = False,
+                         profile_allocations: bool = False,
+                         **kwargs) -> Dict[str, Any]:
         """
         Generate a routine/timetable.
         
         Args:
             strategy_type: Type of generation strategy to use
+            progress_callback: Optional per-generation progress hook
+            cancel_event: Optional event that stops generation early when set
+            progress_interval: Minimum seconds between two progress reports
+            warm_start: Seed the search from the 'persisted' Section assignments
+                or the 'previous' generation result instead of starting cold
+            warm_start_job_id: Job whose result a 'previous' warm start uses
+                (latest completed job if omitted)
+            profile: Record per-phase timings and counters (database load,
+                plus the strategy's own phases where it is instrumented) and
+                return them under 'profile'
+            profile_allocations: Profile, and also trace the memory each phase
+                allocates (slows the run down)
             **kwargs: Strategy-specific parameters
-            
+        
         Returns:
             Dictionary with generated routine data
-            
+        
         Raises:
+            ValidationError: If the strategy type or warm start source is unknown
+            NotFoundError: If warm_start_job_id does not name a job with a result
             RoutineGenerationError: If generation fails
         """
+        profiler = (GenerationProfiler(trace_allocations=profile_allocations)
+                    if profile or profile_allocations else NULL_PROFILER)
         try:
-            # Create strategy if different from current
-            if strategy_type != 'genetic_algorithm' or self.strategy is None:
+            # Parameters always configure a fresh strategy, including the default one
+            if strategy_type != 'genetic_algorithm' or kwargs or self.strategy is None:
                 self.strategy = GenerationFactory.create_strategy(strategy_type, **kwargs)
             
-            result = self.strategy.generate(**kwargs)
+            with profiler.phase(PHASE_DB_LOAD):
+                data = self.snapshot_cache.get_data()
+                if warm_start:
+                    kwargs['warm_start'] = self.warm_start_service.get_assignments(
+                        warm_start, data, job_id=warm_start_job_id
+                    )
+            if profiler.enabled:
+                load_stats = self.snapshot_cache.last_load_stats
+                profiler.count('db_collection_reads', load_stats.get('collections', 0) + (1 if warm_start else 0))
+                profiler.count('snapshot_cache_hits', 0 if load_stats else 1)
+            
+            result = self.strategy.generate(
+                data=data,
+                progress_callback=progress_callback,
+                cancel_event=cancel_event,
+                progress_interval=progress_interval,
+                profiler=profiler,
+                **kwargs
+            )
+            if profiler.enabled:
+                # Strategies without phase instrumentation still report their evaluations
+                if 'profile' not in result:
+                    profiler.count('evaluations', result.get('evaluations') or 0)
+                result['profile'] = profiler.report()
             
             self.log_info(
                 f"Routine generated successfully: "
@@ -53,7 +111,69 @@ class RoutineGenerationService(BaseService):
             )
             
             return result
+        except (ValidationError, NotFoundError):
+            raise
         except Exception as e:
             self.log_error("Error generating routine", error=e)
             raise RoutineGenerationError(f"Failed to generate routine: {str(e)}")
+        finally:
+            profiler.stop()
+    
+    def repair_routine(self, changed: Dict[str, List[str]], base: str = 'previous',
+                       base_job_id: Optional[str] = None,
+                       progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                       cancel_event: Optional[threading.Event] = None,
+                       **kwargs) -> Dict[str, Any]:
+        """
+        Repair an existing routine after a data change.
+        
+        Only classes that use a changed entity, lost their assignment or are
+        in conflict are re-solved; all other classes keep their base
+        assignment, so the result differs minimally from the base.
+        
+        Args:
+            changed: Changed entity keys, as lists under 'rooms' (r_number),
+                'instructors' (uid) and 'meeting_times' (pid)
+            base: Timetable to repair: the 'persisted' Section assignments or
+                the 'previous' generation result
+            base_job_id: Job whose result a 'previous' base uses (latest
+                completed job if omitted)
+            progress_callback: Optional per-round progress hook
+            cancel_event: Optional event that stops the repair early when set
+            **kwargs: Repair strategy parameters
+        
+        Returns:
+            Dictionary with repaired routine data
+        
+        Raises:
+            ValidationError: If there is no base timetable
+            NotFoundError: If base_job_id does not name a job with a result
+            RoutineGenerationError: If repair fails
+        """
+        try:
+            data = self.snapshot_cache.get_data()
+            rows = self.warm_start_service.get_assignments(base, data, job_id=base_job_id)
+            if not rows:
+                raise ValidationError("There is no timetable to repair yet")
+            
+            result = GenerationFactory.create_strategy('repair', **kwargs).generate(
+                data=data,
+                base=rows,
+                changed=changed,
+                progress_callback=progress_callback,
+                cancel_event=cancel_event,
+            )
+            
+            self.log_info(
+                f"Routine repaired: "
+                f"conflicts={result.get('conflicts', 0)}, "
+                f"changed_classes={result.get('changed_classes', 0)}"
+            )
+            
+            return result
+        except (ValidationError, NotFoundError):
+            raise
+        except Exception as e:
+            self.log_error("Error repairing routine", error=e)
+            raise RoutineGenerationError(f"Failed to repair routine: {getattr(e, 'message', str(e))}")
 
@@ -0,0 +1,113 @@
+"""
+Snapshot cache service.
+Following Single Responsibility Principle - reuses loaded generation data across requests.
+"""
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+from mongoengine import signals
+
+from routine.models import Room, Instructor, MeetingTime, Course, Department, Section
+from routine.repositories.dataset_version_repository import DatasetVersionRepository
+from routine.strategies.genetic_algorithm_strategy import Data
+from core.services.base import BaseService
+from core.exceptions import DatabaseError
+
+logger = logging.getLogger(__name__)
+
+
+# Documents whose changes invalidate the generation snapshot
+SNAPSHOT_DOCUMENTS = (Room, Instructor, MeetingTime, Course, Department, Section)
+
+# DatasetVersion counting changes to SNAPSHOT_DOCUMENTS
+SNAPSHOT_DATASET = 'routine_snapshot'
+
+
+class SnapshotCacheService(BaseService):
+    """
+    Process-level cache of the generation Data snapshot.
+    
+    The cached snapshot is tagged with the dataset version, which
+    save/delete/bulk insert signals on the routine documents (and explicit
+    invalidate() calls, e.g. after bulk writes) bump both in this process
+    and in a shared DatasetVersion document. Every get_data reads the shared
+    version with one primary key lookup, so a change made by any worker
+    process is seen on the next request, and repeated generations against
+    unchanged data skip the load entirely. Only the snapshot of the current
+    version is kept, which bounds memory to one loaded dataset.
+    
+    Writes that send no signals and do not call invalidate(), such as
+    QuerySet.update() or direct writes from outside the application, are
+    not detected: the snapshot also expires after
+    ROUTINE_SNAPSHOT_CACHE_TTL seconds to bound how long they stay unseen.
+    """
+    
+    _lock = threading.Lock()
+    _version = 0
+    _entry: Optional[Tuple[Tuple[int, int], float, Data]] = None
+    
+    def __init__(self, version_repository: DatasetVersionRepository = None):
+        super().__init__()
+        self.version_repository = version_repository or DatasetVersionRepository()
+        # Load duration and collections read by this instance's last get_data (empty on a cache hit)
+        self.last_load_stats: Dict[str, Any] = {}
+    
+    def get_data(self) -> Data:
+        """
+        Get the snapshot for the current dataset version, loading it on a miss.
+        
+        Returns:
+            Data snapshot shared by every caller until the dataset changes
+        """
+        ttl = getattr(settings, 'ROUTINE_SNAPSHOT_CACHE_TTL', 300)
+        self.last_load_stats = {}
+        # Read before loading: a change made while loading bumps it, so the next call misses
+        version = (SnapshotCacheService._version, self.version_repository.get_version(SNAPSHOT_DATASET))
+        with self._lock:
+            entry = SnapshotCacheService._entry
+            if entry is not None and entry[0] == version and time.monotonic() - entry[1] < ttl:
+                return entry[2]
+        
+        data = Data()
+        self.last_load_stats = data.get_load_stats()
+        self.log_info(f"Loaded generation snapshot for dataset version {version[1]}")
+        
+        with self._lock:
+            # Only cache if nothing changed in this process while loading
+            if SnapshotCacheService._version == version[0]:
+                SnapshotCacheService._entry = (version, time.monotonic(), data)
+        return data
+    
+    @classmethod
+    def get_version(cls) -> int:
+        """Get the shared dataset version."""
+        return DatasetVersionRepository().get_version(SNAPSHOT_DATASET)
+    
+    @classmethod
+    def invalidate(cls, *args, **kwargs) -> None:
+        """
+        Bump the dataset version and drop the cached snapshot.
+        
+        Accepts and ignores signal arguments so it can be connected directly
+        as a mongoengine signal receiver. If the shared version cannot be
+        bumped, only this process's cache is invalidated and the write that
+        triggered it still succeeds.
+        """
+        with cls._lock:
+            cls._version += 1
+            cls._entry = None
+        try:
+            DatasetVersionRepository().bump(SNAPSHOT_DATASET)
+        except DatabaseError as e:
+            logger.warning(f"Generation snapshot invalidated in this process only: {e.message}")
+    
+    @classmethod
+    def connect_signals(cls) -> None:
+        """Invalidate the cache whenever a routine document is saved or deleted."""
+        for document in SNAPSHOT_DOCUMENTS:
+            signals.post_save.connect(cls.invalidate, sender=document, weak=False)
+            signals.post_delete.connect(cls.invalidate, sender=document, weak=False)
+            signals.post_bulk_insert.connect(cls.invalidate, sender=document, weak=False)
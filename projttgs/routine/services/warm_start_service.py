@@ -0,0 +1,105 @@
+"""
+Warm start service.
+Following Single Responsibility Principle - provides previous timetables to seed generation.
+"""
+from typing import Dict, Any, List, Optional
+
+from routine.repositories.section_repository import SectionRepository
+from routine.repositories.generation_job_repository import GenerationJobRepository
+from routine.strategies.genetic_algorithm_strategy import Data
+from core.services.base import BaseService
+from core.exceptions import NotFoundError, ValidationError
+
+# Supported warm start sources
+WARM_START_PERSISTED = 'persisted'
+WARM_START_PREVIOUS = 'previous'
+WARM_START_SOURCES = (WARM_START_PERSISTED, WARM_START_PREVIOUS)
+
+
+class WarmStartService(BaseService):
+    """
+    Service that turns an existing timetable into warm-start rows.
+    
+    Rows have the shape of generated timetable entries (section,
+    course_number, meeting_time_id, room_number, instructor_uid), which is
+    what the strategies accept as warm_start.
+    """
+    
+    def __init__(self, section_repository: SectionRepository = None,
+                 job_repository: GenerationJobRepository = None):
+        """
+        Initialize service with repository dependencies.
+        
+        Args:
+            section_repository: Section repository instance
+            job_repository: Generation job repository instance
+        """
+        super().__init__()
+        self.section_repository = section_repository or SectionRepository()
+        self.job_repository = job_repository or GenerationJobRepository()
+    
+    def get_assignments(self, source: str, data: Data,
+                        job_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get warm-start rows from a timetable source.
+        
+        Args:
+            source: 'persisted' (assignments stored on Section documents) or
+                'previous' (result of a generation job)
+            data: Generation snapshot used to resolve persisted references
+            job_id: Job to take the result from (latest completed if omitted)
+        
+        Returns:
+            Timetable rows; empty when the source holds no timetable yet
+        
+        Raises:
+            ValidationError: If the source is unknown
+            NotFoundError: If job_id does not name a job with a result
+        """
+        if source == WARM_START_PERSISTED:
+            return self._from_sections(data)
+        if source == WARM_START_PREVIOUS:
+            return self._from_job(job_id)
+        raise ValidationError(f"Unknown warm start source: {source}")
+    
+    def _from_sections(self, data: Data) -> List[Dict[str, Any]]:
+        """Rows for the assignments stored on Section documents."""
+        courses = {course.pk: course for course in data.get_courses()}
+        meeting_times = {mt.pk: mt for mt in data.get_meetingTimes()}
+        rooms = {room.pk: room for room in data.get_rooms()}
+        instructors = {inst.pk: inst for inst in data.get_instructors()}
+        
+        rows = []
+        for section in self.section_repository.get_assignments():
+            # References are undereferenced DBRefs (or None)
+            course = courses.get(getattr(section.course, 'id', None))
+            if course is None:
+                continue
+            meeting_time = meeting_times.get(getattr(section.meeting_time, 'id', None))
+            room = rooms.get(getattr(section.room, 'id', None))
+            instructor = instructors.get(getattr(section.instructor, 'id', None))
+            rows.append({
+                'section': section.section_id,
+                'course_number': course.course_number,
+                'meeting_time_id': meeting_time.pid if meeting_time else None,
+                'room_number': room.r_number if room else None,
+                'instructor_uid': instructor.uid if instructor else None,
+            })
+        self.log_info(f"Warm start from {len(rows)} persisted section assignments")
+        return rows
+    
+    def _from_job(self, job_id: Optional[str]) -> List[Dict[str, Any]]:
+        """Rows of a generation job's result."""
+        if job_id:
+            try:
+                job = self.job_repository.get_by_id(job_id)
+            except Exception:
+                job = None
+            if job is None or not job.result:
+                raise NotFoundError(f"Generation job with id {job_id} has no result")
+        else:
+            job = self.job_repository.get_latest_result()
+            if job is None:
+                self.log_info("No previous generation result, starting cold")
+                return []
+        return list(job.result.get('schedule', []))
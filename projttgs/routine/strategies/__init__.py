@@ -4,6 +4,17 @@ Following Strategy Pattern - allows swapping algorithms.
 """
 from .base_strategy import BaseGenerationStrategy
 from .genetic_algorithm_strategy import GeneticAlgorithmStrategy
+from .parallel_genetic_algorithm_strategy import ParallelGeneticAlgorithmStrategy
+from .simulated_annealing_strategy import SimulatedAnnealingStrategy
+from .constraint_programming_strategy import ConstraintProgrammingStrategy
+from .repair_strategy import RepairStrategy
 
-__all__ = ['BaseGenerationStrategy', 'GeneticAlgorithmStrategy']
+__all__ = [
+    'BaseGenerationStrategy',
+    'GeneticAlgorithmStrategy',
+    'ParallelGeneticAlgorithmStrategy',
+    'SimulatedAnnealingStrategy',
+    'ConstraintProgrammingStrategy',
+    'RepairStrategy',
+]
 
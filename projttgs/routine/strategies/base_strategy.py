@@ -6,6 +6,16 @@ from abc import ABC, abstractmethod
 from typing import List, Dict, Any
 
 
+# Why a strategy stopped, reported as the result's stop_reason
+STOP_SOLVED = 'solved'
+STOP_TARGET_CONFLICTS = 'target_conflicts'
+STOP_STAGNATION = 'stagnation'
+STOP_TIME_LIMIT = 'time_limit'
+STOP_MAX_GENERATIONS = 'max_generations'
+STOP_CANCELLED = 'cancelled'
+STOP_INFEASIBLE = 'infeasible'
+
+
 class BaseGenerationStrategy(ABC):
     """
     Abstract base class for routine generation strategies.
@@ -0,0 +1,353 @@
+"""
+Constraint Programming strategy for routine generation.
+Solves the class assignment exactly, section by section.
+"""
+import time
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+try:
+    from ortools.sat.python import cp_model
+except ImportError:  # optional dependency, the backtracking solver is used instead
+    cp_model = None
+
+from routine.strategies.base_strategy import (
+    BaseGenerationStrategy, STOP_SOLVED, STOP_TIME_LIMIT, STOP_CANCELLED, STOP_INFEASIBLE
+)
+from routine.strategies.genetic_algorithm_strategy import Data, Schedule, NONE_INDEX
+from core.exceptions import RoutineGenerationError
+
+
+# Constraint Programming Constants
+SECTION_TIME_LIMIT_SECONDS = 10.0
+MAX_BACKTRACK_NODES = 200000
+DEADLINE_CHECK_NODES = 1000
+
+# Section outcomes
+FEASIBLE = 'feasible'
+INFEASIBLE = 'infeasible'
+UNKNOWN = 'unknown'
+
+# (meeting_time, room, instructor) of one class
+Assignment = Tuple[int, int, int]
+
+
+class _SectionProblem:
+    """Domains of the classes of one section (classes only conflict within a section)."""
+    
+    def __init__(self, genes: List[int], meeting_times: List[int],
+                 rooms: List[List[int]], instructors: List[List[int]]):
+        self.genes = genes
+        self.meeting_times = meeting_times
+        self.rooms = rooms
+        self.instructors = instructors
+    
+    def infeasibility(self) -> Optional[str]:
+        """
+        Cheap necessary conditions; a returned reason proves infeasibility.
+        
+        Fitting room sets are nested by capacity, so Hall's condition on the
+        rooms reduces to: the k classes with the largest requirement need at
+        least k (meeting time, room) slots among the rooms fitting the k-th.
+        """
+        slots = len(self.meeting_times)
+        by_requirement = sorted(self.rooms, key=len)
+        for k, rooms in enumerate(by_requirement, start=1):
+            if not rooms:
+                return "a course fits in no room"
+            if k > slots * len(rooms):
+                return f"{k} classes compete for {slots * len(rooms)} large enough room slots"
+        
+        sole_instructor: Dict[int, int] = {}
+        for candidates in self.instructors:
+            if len(candidates) == 1:
+                sole_instructor[candidates[0]] = sole_instructor.get(candidates[0], 0) + 1
+        for count in sole_instructor.values():
+            if count > slots:
+                return f"an instructor has {count} classes but only {slots} meeting times"
+        everyone = {inst for candidates in self.instructors for inst in candidates}
+        if len(self.genes) > slots * len(everyone):
+            return f"{len(self.genes)} classes but only {slots * len(everyone)} instructor slots"
+        return None
+
+
+class ConstraintProgrammingStrategy(BaseGenerationStrategy):
+    """
+    Exact constraint programming strategy implementation.
+    Following Strategy Pattern - can be swapped with other strategies.
+    
+    Two classes only conflict within the same section, so every section is
+    an independent constraint satisfaction problem: each class takes a
+    meeting time, a room large enough for its course and one of its
+    instructors, and classes sharing a meeting time must use different
+    rooms and instructors. Necessary counting conditions are checked first
+    so most infeasible sections are rejected without search. The rest are
+    solved with OR-Tools CP-SAT when it is installed, or with a
+    deterministic backtracking search otherwise. Sections that are
+    infeasible (or not decided within the limits) keep a greedy
+    assignment and are listed in infeasible_sections. When the run's
+    time_limit_seconds expires, the remaining sections keep their greedy
+    assignment too and timed_out=True is returned.
+    """
+    
+    def __init__(self, time_limit_seconds: Optional[float] = None,
+                 section_time_limit_seconds: float = SECTION_TIME_LIMIT_SECONDS,
+                 max_nodes: int = MAX_BACKTRACK_NODES,
+                 use_cp_sat: bool = True,
+                 seed: Optional[int] = None,
+                 **kwargs):
+        """
+        Initialize solver limits.
+        
+        Args:
+            time_limit_seconds: Wall-clock budget of the whole run
+            section_time_limit_seconds: CP-SAT time limit per section
+            max_nodes: Backtracking node limit per section
+            use_cp_sat: Use OR-Tools CP-SAT when it is installed
+            seed: Seed of the greedy assignment kept by unsolved sections
+                (0 if omitted: unlike the search strategies, a run without a
+                seed is reproducible too)
+            **kwargs: Parameters of the genetic strategies, accepted and
+                ignored so strategies stay interchangeable (soft_constraints
+                too: the solver only satisfies hard constraints)
+        """
+        self.time_limit_seconds = time_limit_seconds
+        self.section_time_limit_seconds = section_time_limit_seconds
+        self.max_nodes = max_nodes
+        self.use_cp_sat = use_cp_sat and cp_model is not None
+        self.seed = seed
+    
+    def generate(self, **kwargs) -> Dict[str, Any]:
+        """
+        Generate routine by solving every section exactly.
+        
+        Args:
+            data: Preloaded Data snapshot (loaded from the database if omitted)
+            progress_callback: Called after every section with a dict of
+                generation (sections done), best_fitness, mean_fitness,
+                conflicts (unsolved sections so far) and elapsed_ms
+            cancel_event: threading.Event; when set, remaining sections keep
+                their greedy assignment and cancelled=True is returned
+        
+        Returns:
+            Dictionary with generated schedule data, plus infeasible_sections
+            (section and reason of every section left unsolved), generations
+            (sections done, the counter of the progress reports), the seed,
+            stop_reason, timed_out and evaluations (only the final schedule
+            is evaluated; sections are searched on their domains)
+        """
+        try:
+            data = kwargs.get('data')
+            if data is None:
+                data = Data()
+            progress_callback = kwargs.get('progress_callback')
+            cancel_event = kwargs.get('cancel_event')
+            started = time.perf_counter()
+            deadline = None if self.time_limit_seconds is None else started + self.time_limit_seconds
+            
+            seed = self.seed if self.seed is not None else 0
+            schedule = Schedule(data, np.random.default_rng(seed)).initialize_greedy(randomness=0.0)
+            infeasible_sections: List[Dict[str, str]] = []
+            stop_reason = None
+            done = 0
+            problems = self._section_problems(data)
+            for section, problem in problems.items():
+                if cancel_event is not None and cancel_event.is_set():
+                    stop_reason = STOP_CANCELLED
+                    break
+                if deadline is not None and time.perf_counter() >= deadline:
+                    stop_reason = STOP_TIME_LIMIT
+                    infeasible_sections.extend(
+                        {'section': data.get_section_ids()[rest],
+                         'reason': "not decided within the time limit"}
+                        for rest in list(problems)[done:]
+                    )
+                    break
+                
+                reason = problem.infeasibility()
+                status, assignments = INFEASIBLE, None
+                if reason is None:
+                    if self.use_cp_sat:
+                        status, assignments = self._solve_cp_sat(problem, deadline)
+                    else:
+                        status, assignments = self._solve_backtracking(problem, deadline)
+                if status == FEASIBLE:
+                    schedule.assign_genes(problem.genes, *zip(*assignments))
+                else:
+                    infeasible_sections.append({
+                        'section': data.get_section_ids()[section],
+                        'reason': reason or ("no conflict-free assignment exists"
+                                             if status == INFEASIBLE else
+                                             "not decided within the solver limits"),
+                    })
+                done += 1
+                
+                if progress_callback is not None:
+                    fitness = 1.0 / (1 + len(infeasible_sections))
+                    progress_callback({
+                        'generation': done,
+                        'best_fitness': fitness,
+                        'mean_fitness': fitness,
+                        'conflicts': len(infeasible_sections),
+                        'elapsed_ms': round((time.perf_counter() - started) * 1000, 3),
+                    })
+            
+            return {
+                'schedule': schedule.serialize(),
+                'fitness': schedule.get_fitness(),
+                'conflicts': schedule.get_numb_of_conflicts(),
+                'generations': done,
+                'cancelled': stop_reason == STOP_CANCELLED,
+                'infeasible_sections': infeasible_sections,
+                'seed': seed,
+                'stop_reason': stop_reason or (STOP_INFEASIBLE if infeasible_sections else STOP_SOLVED),
+                'timed_out': stop_reason == STOP_TIME_LIMIT,
+                'evaluations': 1,
+            }
+        except Exception as e:
+            raise RoutineGenerationError(f"Error generating routine: {str(e)}")
+    
+    @staticmethod
+    def _section_problems(data: Data) -> Dict[int, _SectionProblem]:
+        """Group the template's classes by section and resolve their domains."""
+        template = data.get_gene_template()
+        meeting_times = list(range(len(data.get_meetingTimes()))) or [NONE_INDEX]
+        # Rooms smallest first, so the first solution found uses the best fits
+        eligible_rooms: Dict[int, List[int]] = {}
+        
+        problems: Dict[int, _SectionProblem] = {}
+        for gene, (course, section) in enumerate(zip(template.course_idx.tolist(),
+                                                     template.section_idx.tolist())):
+            problem = problems.setdefault(section, _SectionProblem([], meeting_times, [], []))
+            offset = int(template.instructor_offsets[gene])
+            problem.genes.append(gene)
+            if course not in eligible_rooms:
+                eligible_rooms[course] = (data.get_eligible_rooms(course).tolist()
+                                          if data.get_rooms() else [NONE_INDEX])
+            problem.rooms.append(eligible_rooms[course])
+            problem.instructors.append(template.instructor_candidates[
+                offset:offset + int(template.instructor_counts[gene])].tolist())
+        return problems
+    
+    def _solve_cp_sat(self, problem: _SectionProblem,
+                      deadline: Optional[float] = None) -> Tuple[str, Optional[List[Assignment]]]:
+        """Solve one section with OR-Tools CP-SAT."""
+        model = cp_model.CpModel()
+        slots = len(problem.meeting_times)
+        room_range = max(max(rooms) for rooms in problem.rooms) + 2
+        instructor_range = max(max(insts) for insts in problem.instructors) + 2
+        
+        positions, rooms, instructors, room_keys, instructor_keys = [], [], [], [], []
+        for i in range(len(problem.genes)):
+            position = model.NewIntVar(0, slots - 1, f'time_{i}')
+            room = model.NewIntVarFromDomain(
+                cp_model.Domain.FromValues([r + 1 for r in problem.rooms[i]]), f'room_{i}')
+            instructor = model.NewIntVarFromDomain(
+                cp_model.Domain.FromValues(problem.instructors[i]), f'instructor_{i}')
+            room_key = model.NewIntVar(0, slots * room_range, f'room_key_{i}')
+            instructor_key = model.NewIntVar(0, slots * instructor_range, f'instructor_key_{i}')
+            model.Add(room_key == position * room_range + room)
+            model.Add(instructor_key == position * instructor_range + instructor)
+            positions.append(position)
+            rooms.append(room)
+            instructors.append(instructor)
+            room_keys.append(room_key)
+            instructor_keys.append(instructor_key)
+        model.AddAllDifferent(room_keys)
+        model.AddAllDifferent(instructor_keys)
+        
+        solver = cp_model.CpSolver()
+        time_limit = self.section_time_limit_seconds
+        if deadline is not None:
+            time_limit = max(0.0, min(time_limit, deadline - time.perf_counter()))
+        solver.parameters.max_time_in_seconds = time_limit
+        # Single worker keeps the strategy deterministic
+        solver.parameters.num_workers = 1
+        status = solver.Solve(model)
+        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            return FEASIBLE, [
+                (problem.meeting_times[solver.Value(positions[i])], solver.Value(rooms[i]) - 1,
+                 solver.Value(instructors[i]))
+                for i in range(len(problem.genes))
+            ]
+        if status == cp_model.INFEASIBLE:
+            return INFEASIBLE, None
+        return UNKNOWN, None
+    
+    def _solve_backtracking(self, problem: _SectionProblem,
+                            deadline: Optional[float] = None) -> Tuple[str, Optional[List[Assignment]]]:
+        """
+        Solve one section with depth-first search and forward checking.
+        
+        Classes with the smallest domains are assigned first; after every
+        assignment each remaining class must still have a free (meeting
+        time, room) and (meeting time, instructor) pair. The deadline is
+        checked every DEADLINE_CHECK_NODES nodes.
+        """
+        n = len(problem.genes)
+        order = sorted(range(n), key=lambda i: len(problem.rooms[i]) * len(problem.instructors[i]))
+        used_rooms = set()
+        used_instructors = set()
+        meeting_time_load = {mt: 0 for mt in problem.meeting_times}
+        assignments: List[Optional[Assignment]] = [None] * n
+        nodes = 0
+        
+        def has_option(i: int) -> bool:
+            return any(
+                any((mt, room) not in used_rooms for room in problem.rooms[i]) and
+                any((mt, inst) not in used_instructors for inst in problem.instructors[i])
+                for mt in problem.meeting_times
+            )
+        
+        def search(depth: int) -> Optional[bool]:
+            nonlocal nodes
+            if depth == n:
+                return True
+            i = order[depth]
+            tried_empty = False
+            for mt in problem.meeting_times:
+                # Meeting times no class uses yet are interchangeable
+                if meeting_time_load[mt] == 0:
+                    if tried_empty:
+                        continue
+                    tried_empty = True
+                for room in problem.rooms[i]:
+                    if (mt, room) in used_rooms:
+                        continue
+                    for inst in problem.instructors[i]:
+                        if (mt, inst) in used_instructors:
+                            continue
+                        nodes += 1
+                        if nodes > self.max_nodes:
+                            return None
+                        if (deadline is not None and nodes % DEADLINE_CHECK_NODES == 0 and
+                                time.perf_counter() >= deadline):
+                            return None
+                        used_rooms.add((mt, room))
+                        used_instructors.add((mt, inst))
+                        meeting_time_load[mt] += 1
+                        assignments[i] = (mt, room, inst)
+                        if all(has_option(j) for j in order[depth + 1:]):
+                            found = search(depth + 1)
+                            if found is not False:
+                                return found
+                        used_rooms.discard((mt, room))
+                        used_instructors.discard((mt, inst))
+                        meeting_time_load[mt] -= 1
+                    # The smallest free fitting room is enough: a solution using
+                    # a larger one can swap rooms with whichever later class
+                    # takes the smaller room at this meeting time
+                    break
+            return False
+        
+        found = search(0)
+        if found is None:
+            return UNKNOWN, None
+        if not found:
+            return INFEASIBLE, None
+        return FEASIBLE, assignments
+    
+    def get_fitness(self, schedule: Schedule) -> float:
+        """Calculate fitness for a schedule."""
+        return schedule.get_fitness()
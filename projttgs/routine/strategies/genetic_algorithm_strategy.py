@@ -2,11 +2,26 @@
 Genetic Algorithm strategy for routine generation.
 Preserves the original genetic algorithm logic while following Strategy Pattern.
 """
-import random as rnd
-from typing import List, Dict, Any, Optional
+import copy
+import secrets
+import time
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
 
 from routine.models import Room, Instructor, MeetingTime, Course, Department, Section
-from routine.strategies.base_strategy import BaseGenerationStrategy
+from routine.repositories.snapshot_repository import SnapshotRepository
+from routine.strategies.base_strategy import (
+    BaseGenerationStrategy, STOP_SOLVED, STOP_TARGET_CONFLICTS, STOP_STAGNATION,
+    STOP_TIME_LIMIT, STOP_MAX_GENERATIONS, STOP_CANCELLED
+)
+from routine.strategies.soft_constraints import (
+    SoftConstraints, SoftPenaltyCounter, build_soft_constraints
+)
+from routine.strategies.profiling import (
+    NullProfiler, NULL_PROFILER, PHASE_DB_LOAD, PHASE_INITIALIZATION, PHASE_EVALUATION,
+    PHASE_SELECTION, PHASE_SERIALIZATION
+)
 from core.exceptions import RoutineGenerationError
 
 
@@ -16,56 +31,180 @@ NUMB_OF_ELITE_SCHEDULES = 1
 TOURNAMENT_SELECTION_SIZE = 3
 MUTATION_RATE = 0.1
 
+# Adaptive mutation: the rate is multiplied by the factor after every
+# ADAPTIVE_MUTATION_PATIENCE generations without improvement and divided by
+# it after an improvement, within [MIN_MUTATION_RATE, MAX_MUTATION_RATE]
+ADAPTIVE_MUTATION_FACTOR = 1.5
+ADAPTIVE_MUTATION_PATIENCE = 10
+MIN_MUTATION_RATE = 0.01
+MAX_MUTATION_RATE = 0.5
+
+# Share of the initial population built by the greedy constructor, and the
+# chance that the constructor places a class at random instead
+GREEDY_SEED_RATIO = 0.3
+GREEDY_RANDOMNESS = 0.1
+
+# Share of the initial population seeded from a warm-start timetable, and the
+# chance that a seeded class is redrawn at random (the first seed is exact)
+WARM_START_RATIO = 0.5
+WARM_START_RANDOMNESS = 0.1
+
+# Gene encoding: every entity is referred to by its index in Data,
+# NONE_INDEX marks an unassigned meeting time, room or instructor.
+GENE_DTYPE = np.int32
+NONE_INDEX = -1
+_NEVER_BELOW = np.iinfo(np.int64).min
+_NEVER_ABOVE = np.iinfo(np.int64).max
+
+
+def _identity(document: Any) -> Any:
+    """Hashable key that matches mongoengine Document equality (pk, else object)."""
+    if document is None:
+        return None
+    pk = document.pk
+    return pk if pk is not None else id(document)
+
+
+def _random_indices(rng: np.random.Generator, size: int, count: int) -> np.ndarray:
+    """Uniform random indices in [0, count), or NONE_INDEX when there is nothing to pick."""
+    if count == 0:
+        return np.full(size, NONE_INDEX, dtype=GENE_DTYPE)
+    return rng.integers(0, count, size=size, dtype=GENE_DTYPE)
+
+
+def fitness_of(conflicts: int, soft_penalty: float = 0.0) -> float:
+    """Fitness of a schedule (higher is better, 1.0 without conflicts or soft penalty)."""
+    return 1 / (1.0 * conflicts + soft_penalty + 1)
 
-class Class:
-    """Represents a single class in a schedule."""
-    
-    def __init__(self, class_id: int, dept: Department, section: str, course: Course):
-        self.section_id = class_id
-        self.department = dept
-        self.course = course
-        self.instructor: Optional[Instructor] = None
-        self.meeting_time: Optional[MeetingTime] = None
-        self.room: Optional[Room] = None
-        self.section = section
 
-    def get_id(self) -> int:
-        return self.section_id
+def reached_target(conflicts: int, soft_penalty: float, target_conflicts: int = 0) -> Optional[str]:
+    """
+    Stop reason when a best schedule is good enough: solved when it has no
+    conflicts and no soft penalty, target_conflicts when a non-zero target
+    is met. Soft constraints therefore keep a conflict-free run improving
+    unless a target was set.
+    """
+    if conflicts == 0 and soft_penalty == 0:
+        return STOP_SOLVED
+    if target_conflicts and conflicts <= target_conflicts:
+        return STOP_TARGET_CONFLICTS
+    return None
 
-    def get_dept(self) -> Department:
-        return self.department
 
-    def get_course(self) -> Course:
-        return self.course
+def soft_constraint_report(schedule: 'Schedule') -> Dict[str, Any]:
+    """Result fields on the soft constraints of a run's best schedule (none without soft constraints)."""
+    soft_constraints = schedule._data.get_soft_constraints()
+    if not soft_constraints:
+        return {}
+    return {
+        'soft_penalty': schedule.get_soft_penalty(),
+        'soft_violations': soft_constraints.breakdown(
+            schedule.meeting_time_idx, schedule.room_idx, schedule.instructor_idx,
+            schedule.course_idx, schedule.section_idx),
+    }
 
-    def get_instructor(self) -> Optional[Instructor]:
-        return self.instructor
 
-    def get_meetingTime(self) -> Optional[MeetingTime]:
-        return self.meeting_time
+def random_seed() -> int:
+    """Fresh seed for a run without one, returned with the result so the run can be repeated."""
+    return secrets.randbits(32)
 
-    def get_room(self) -> Optional[Room]:
-        return self.room
 
-    def set_instructor(self, instructor: Instructor) -> None:
-        self.instructor = instructor
+class GeneTemplate:
+    """
+    Immutable layout of the classes every schedule has to place.
+    
+    Slot i is one weekly class of section section_idx[i] for course
+    course_idx[i]; its candidate instructors are
+    instructor_candidates[instructor_offsets[i]:instructor_offsets[i] + instructor_counts[i]].
+    All references are resolved to indices when the template is built, so
+    schedules are created from it without touching the database.
+    """
+    
+    def __init__(self, course_idx: List[int], section_idx: List[int],
+                 candidate_instructors: List[List[int]]):
+        self.course_idx = np.array(course_idx, dtype=GENE_DTYPE)
+        self.section_idx = np.array(section_idx, dtype=GENE_DTYPE)
+        self.instructor_counts = np.array([len(c) for c in candidate_instructors], dtype=np.int64)
+        self.instructor_offsets = np.zeros(len(candidate_instructors), dtype=np.int64)
+        if len(candidate_instructors) > 1:
+            np.cumsum(self.instructor_counts[:-1], out=self.instructor_offsets[1:])
+        self.instructor_candidates = np.array(
+            [inst for candidates in candidate_instructors for inst in candidates], dtype=GENE_DTYPE
+        )
+        for array in (self.course_idx, self.section_idx, self.instructor_counts,
+                      self.instructor_offsets, self.instructor_candidates):
+            array.flags.writeable = False
 
-    def set_meetingTime(self, meeting_time: MeetingTime) -> None:
-        self.meeting_time = meeting_time
+    def __len__(self) -> int:
+        return len(self.course_idx)
 
-    def set_room(self, room: Room) -> None:
-        self.room = room
+    def random_instructors(self, rng: np.random.Generator,
+                           slots: Optional[np.ndarray] = None) -> np.ndarray:
+        """Pick one candidate instructor per slot (all slots, or only the given ones) at random."""
+        counts = self.instructor_counts if slots is None else self.instructor_counts[slots]
+        offsets = self.instructor_offsets if slots is None else self.instructor_offsets[slots]
+        picks = (rng.random(len(counts)) * counts).astype(np.int64)
+        return self.instructor_candidates[offsets + picks]
 
 
 class Data:
-    """Data container for all entities needed for schedule generation."""
+    """
+    Data container for all entities needed for schedule generation.
+    
+    Entities are addressed by integer index so schedules can be stored as
+    plain int arrays; the documents are only looked up again when the best
+    schedule is serialized. Soft constraints are part of the problem: a
+    snapshot shared between runs gets its own shallow copy with a run's
+    compiled soft constraints (with_soft_constraints). Rooms are also
+    indexed by capacity: the rooms large enough for a course are a suffix
+    of get_rooms_by_capacity(), so schedules draw only rooms that fit and
+    capacity conflicts are left out of the search space instead of being
+    penalized on every evaluation.
+    """
     
-    def __init__(self):
-        self._rooms = list(Room.objects.all())
-        self._meeting_times = list(MeetingTime.objects.all())
-        self._instructors = list(Instructor.objects.all())
-        self._courses = list(Course.objects.all())
-        self._depts = list(Department.objects.all())
+    def __init__(self, rooms: Optional[List[Room]] = None,
+                 meeting_times: Optional[List[MeetingTime]] = None,
+                 instructors: Optional[List[Instructor]] = None,
+                 courses: Optional[List[Course]] = None,
+                 depts: Optional[List[Department]] = None,
+                 sections: Optional[List[Section]] = None):
+        self._load_stats: Dict[str, Any] = {}
+        if None in (rooms, meeting_times, instructors, courses, depts, sections):
+            repository = SnapshotRepository()
+            loaded = repository.load()
+            self._load_stats = repository.last_stats
+            rooms = loaded['rooms'] if rooms is None else rooms
+            meeting_times = loaded['meeting_times'] if meeting_times is None else meeting_times
+            instructors = loaded['instructors'] if instructors is None else instructors
+            courses = loaded['courses'] if courses is None else courses
+            depts = loaded['depts'] if depts is None else depts
+            sections = loaded['sections'] if sections is None else sections
+        
+        self._rooms = list(rooms)
+        self._meeting_times = list(meeting_times)
+        self._instructors = list(instructors)
+        self._courses = list(courses)
+        self._depts = list(depts)
+        self._sections = list(sections)
+        self._section_ids: List[str] = []
+        self._section_depts: List[Department] = []
+        
+        self._room_index = {_identity(room): i for i, room in enumerate(self._rooms)}
+        self._meeting_time_index = {_identity(mt): i for i, mt in enumerate(self._meeting_times)}
+        self._instructor_index = {_identity(inst): i for i, inst in enumerate(self._instructors)}
+        self._course_index = {_identity(course): i for i, course in enumerate(self._courses)}
+        self._section_index: Dict[str, int] = {}
+        
+        self._room_capacities: Optional[np.ndarray] = None
+        self._course_max_students: Optional[np.ndarray] = None
+        self._rooms_by_capacity: Optional[np.ndarray] = None
+        self._first_eligible_room: Optional[np.ndarray] = None
+        self._soft_constraints: Optional[SoftConstraints] = None
+        self._gene_template = self._build_gene_template()
+        # Materialize lookup arrays now so a shared snapshot is read-only afterwards
+        self.get_room_capacities()
+        self.get_course_max_students()
+        self.get_first_eligible_room()
 
     def get_rooms(self) -> List[Room]:
         return self._rooms
@@ -82,119 +221,735 @@ class Data:
     def get_meetingTimes(self) -> List[MeetingTime]:
         return self._meeting_times
 
+    def get_load_stats(self) -> Dict[str, Any]:
+        """Duration, collections read and documents of the bulk load (empty when entities were passed in)."""
+        return self._load_stats
 
-class Schedule:
-    """Represents a single schedule solution."""
+    def get_sections(self) -> List[Section]:
+        return self._sections
+
+    def get_gene_template(self) -> GeneTemplate:
+        return self._gene_template
+
+    def get_soft_constraints(self) -> Optional[SoftConstraints]:
+        return self._soft_constraints
+
+    def with_soft_constraints(self, soft_constraints: Optional[SoftConstraints]) -> 'Data':
+        """Shallow copy of this snapshot that also scores the given soft constraints."""
+        data = copy.copy(self)
+        data._soft_constraints = soft_constraints.compile(self) if soft_constraints else None
+        return data
+
+    def get_section_ids(self) -> List[str]:
+        return self._section_ids
+
+    def get_section_dept(self, section_idx: int) -> Department:
+        return self._section_depts[section_idx]
+
+    @staticmethod
+    def _index_of(entity: Any, entities: List[Any], index: Dict[Any, int]) -> int:
+        """Return the index of an entity, registering documents created after loading."""
+        if entity is None:
+            return NONE_INDEX
+        key = _identity(entity)
+        position = index.get(key)
+        if position is None:
+            position = len(entities)
+            entities.append(entity)
+            index[key] = position
+        return position
+
+    def room_index(self, room: Optional[Room]) -> int:
+        if _identity(room) not in self._room_index:
+            self._room_capacities = None
+            self._first_eligible_room = None
+        return self._index_of(room, self._rooms, self._room_index)
+
+    def meeting_time_index(self, meeting_time: Optional[MeetingTime]) -> int:
+        return self._index_of(meeting_time, self._meeting_times, self._meeting_time_index)
+
+    def instructor_index(self, instructor: Optional[Instructor]) -> int:
+        return self._index_of(instructor, self._instructors, self._instructor_index)
+
+    def course_index(self, course: Course) -> int:
+        if _identity(course) not in self._course_index:
+            self._course_max_students = None
+            self._first_eligible_room = None
+        return self._index_of(course, self._courses, self._course_index)
+
+    def section_index(self, section: Section) -> int:
+        """Return the index of a section, recording its department on first sight."""
+        position = self._section_index.get(section.section_id)
+        if position is None:
+            position = len(self._section_ids)
+            self._section_ids.append(section.section_id)
+            self._section_depts.append(section.department)
+            self._section_index[section.section_id] = position
+        return position
+
+    def _build_gene_template(self) -> GeneTemplate:
+        """Resolve every section's weekly classes into index slots, once per run."""
+        course_idx: List[int] = []
+        section_idx: List[int] = []
+        candidate_instructors: List[List[int]] = []
+        
+        for section in self._sections:
+            n = section.num_class_in_week
+            courses = list(section.department.courses)
+            if not courses:
+                continue
+            
+            section_position = self.section_index(section)
+            for course in courses:
+                num_classes = n // len(courses)
+                instructors = [self.instructor_index(inst) for inst in course.instructors]
+                if not instructors:
+                    continue
+                
+                course_position = self.course_index(course)
+                for _ in range(num_classes):
+                    course_idx.append(course_position)
+                    section_idx.append(section_position)
+                    candidate_instructors.append(instructors)
+        
+        return GeneTemplate(course_idx, section_idx, candidate_instructors)
+
+    def get_room_capacities(self) -> np.ndarray:
+        """Seating capacity per room index (rooms without one never conflict)."""
+        if self._room_capacities is None:
+            self._room_capacities = np.array(
+                [room.seating_capacity if isinstance(room.seating_capacity, int) else _NEVER_ABOVE
+                 for room in self._rooms],
+                dtype=np.int64,
+            )
+        return self._room_capacities
+
+    def get_course_max_students(self) -> np.ndarray:
+        """max_numb_students per course index, parsed once (unparsable values never conflict)."""
+        if self._course_max_students is None:
+            values = []
+            for course in self._courses:
+                try:
+                    values.append(int(course.max_numb_students))
+                except (ValueError, TypeError):
+                    values.append(_NEVER_BELOW)
+            self._course_max_students = np.array(values, dtype=np.int64)
+        return self._course_max_students
+
+    def get_rooms_by_capacity(self) -> np.ndarray:
+        """Room indices by ascending seating capacity."""
+        self.get_first_eligible_room()
+        return self._rooms_by_capacity
+
+    def get_first_eligible_room(self) -> np.ndarray:
+        """
+        Per course index, the position in get_rooms_by_capacity() of the
+        smallest room that seats max_numb_students (the number of rooms when
+        none does).
+        """
+        if self._first_eligible_room is None:
+            capacities = self.get_room_capacities()
+            self._rooms_by_capacity = np.argsort(capacities, kind='stable').astype(GENE_DTYPE)
+            self._first_eligible_room = np.searchsorted(
+                capacities[self._rooms_by_capacity], self.get_course_max_students())
+            self._rooms_by_capacity.flags.writeable = False
+            self._first_eligible_room.flags.writeable = False
+        return self._first_eligible_room
+
+    def get_eligible_rooms(self, course: int) -> np.ndarray:
+        """Indices of the rooms large enough for a course, smallest first (may be empty)."""
+        return self.get_rooms_by_capacity()[self.get_first_eligible_room()[course]:]
+
+    def random_rooms(self, rng: np.random.Generator, course_idx: np.ndarray) -> np.ndarray:
+        """
+        Pick one room large enough for each class's course at random. Classes
+        of a course no room fits get the largest room.
+        """
+        rooms = self.get_rooms_by_capacity()
+        if len(rooms) == 0:
+            return np.full(len(course_idx), NONE_INDEX, dtype=GENE_DTYPE)
+        first = np.minimum(self.get_first_eligible_room()[course_idx], len(rooms) - 1)
+        picks = (rng.random(len(first)) * (len(rooms) - first)).astype(np.int64)
+        return rooms[first + picks]
+
+
+def _conflicts_per_individual(data: Data, meeting_time_idx: np.ndarray, room_idx: np.ndarray,
+                              instructor_idx: np.ndarray, course_idx: np.ndarray,
+                              section_idx: np.ndarray, individual: np.ndarray,
+                              n_individuals: int) -> np.ndarray:
+    """
+    Count hard conflicts of many encoded schedules in one vectorized pass.
+    
+    The gene arrays of all schedules are concatenated and individual[i] tells
+    which schedule gene i belongs to. Two classes of the same section conflict
+    when they share a meeting time and either a room or an instructor; each
+    class also conflicts when its room is smaller than the course's
+    max_numb_students. Genes are grouped by combined (individual,
+    meeting_time, section, room/instructor) keys and every group of k
+    classes adds k * (k - 1) / 2 conflicts to its individual.
+    """
+    conflicts = np.zeros(n_individuals, dtype=np.int64)
+    if individual.size == 0:
+        return conflicts
+    
+    has_room = room_idx != NONE_INDEX
+    capacities = data.get_room_capacities()[room_idx[has_room]]
+    max_students = data.get_course_max_students()[course_idx[has_room]]
+    conflicts += np.bincount(individual[has_room][capacities < max_students],
+                             minlength=n_individuals)
+    
+    individual = individual.astype(np.int64)
+    slot_range = (len(data.get_meetingTimes()) + 1) * (len(data.get_section_ids()) + 1)
+    slot = (individual * slot_range
+            + (meeting_time_idx.astype(np.int64) + 1) * (len(data.get_section_ids()) + 1)
+            + section_idx)
+    for assignment, assignment_range in ((room_idx, len(data.get_rooms()) + 1),
+                                         (instructor_idx, len(data.get_instructors()) + 1)):
+        keys, counts = np.unique(slot * assignment_range + assignment + 1, return_counts=True)
+        conflicted = counts > 1
+        owners = keys[conflicted] // (slot_range * assignment_range)
+        pairs = counts[conflicted] * (counts[conflicted] - 1) // 2
+        conflicts += np.bincount(owners, weights=pairs, minlength=n_individuals).astype(np.int64)
+    return conflicts
+
+
+def count_conflicts(data: Data, meeting_time_idx: np.ndarray, room_idx: np.ndarray,
+                    instructor_idx: np.ndarray, course_idx: np.ndarray,
+                    section_idx: np.ndarray) -> int:
+    """Count hard conflicts of one encoded schedule."""
+    individual = np.zeros(len(course_idx), dtype=np.int64)
+    return int(_conflicts_per_individual(
+        data, meeting_time_idx, room_idx, instructor_idx, course_idx, section_idx,
+        individual, 1
+    )[0])
+
+
+def evaluate_population(data: Data, schedules: List['Schedule']) -> int:
+    """
+    Score every schedule whose fitness is stale in one batched pass.
+    
+    Python overhead is a handful of NumPy calls plus one concatenation and
+    one assignment per schedule, regardless of how many genes they hold.
+    Returns the number of schedules scored.
+    """
+    stale = [schedule for schedule in schedules if schedule.needs_evaluation()]
+    if not stale:
+        return 0
+    
+    individual = np.repeat(np.arange(len(stale)),
+                           [schedule.get_numb_of_classes() for schedule in stale])
+    genes = (
+        np.concatenate([schedule.meeting_time_idx for schedule in stale]),
+        np.concatenate([schedule.room_idx for schedule in stale]),
+        np.concatenate([schedule.instructor_idx for schedule in stale]),
+        np.concatenate([schedule.course_idx for schedule in stale]),
+        np.concatenate([schedule.section_idx for schedule in stale]),
+    )
+    conflicts = _conflicts_per_individual(data, *genes, individual, len(stale))
+    soft_constraints = data.get_soft_constraints()
+    if soft_constraints:
+        penalties = soft_constraints.penalties(*genes, individual, len(stale)).tolist()
+    else:
+        penalties = [0.0] * len(stale)
+    for schedule, schedule_conflicts, penalty in zip(stale, conflicts.tolist(), penalties):
+        schedule.set_numb_of_conflicts(schedule_conflicts, penalty)
+    return len(stale)
+
+
+def decode_timetable(data: Data, assignments: List[Dict[str, Any]]
+                     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Map timetable rows back onto the gene template.
+    
+    assignments are rows as produced by Schedule.serialize() (section,
+    course_number, meeting_time_id, room_number, instructor_uid). Each class
+    takes the next unused row of its section and course.
+    
+    Returns:
+        meeting_time_idx, room_idx and instructor_idx arrays, NONE_INDEX where
+        a class has no row, the entity no longer exists, or the instructor no
+        longer teaches the course
+    """
+    template = data.get_gene_template()
+    size = len(template)
+    meeting_time_idx = np.full(size, NONE_INDEX, dtype=GENE_DTYPE)
+    room_idx = np.full(size, NONE_INDEX, dtype=GENE_DTYPE)
+    instructor_idx = np.full(size, NONE_INDEX, dtype=GENE_DTYPE)
+    meeting_times = {mt.pid: i for i, mt in enumerate(data.get_meetingTimes())}
+    rooms = {room.r_number: i for i, room in enumerate(data.get_rooms())}
+    instructors = {inst.uid: i for i, inst in enumerate(data.get_instructors())}
+    course_numbers = [course.course_number for course in data.get_courses()]
+    section_ids = data.get_section_ids()
+    
+    rows: Dict[Tuple[Any, Any], List[Dict[str, Any]]] = {}
+    for row in assignments:
+        rows.setdefault((row.get('section'), row.get('course_number')), []).append(row)
+    for queue in rows.values():
+        queue.reverse()
+    
+    for i, (course, section) in enumerate(zip(template.course_idx.tolist(),
+                                              template.section_idx.tolist())):
+        queue = rows.get((section_ids[section], course_numbers[course]))
+        if not queue:
+            continue
+        row = queue.pop()
+        meeting_time_idx[i] = meeting_times.get(row.get('meeting_time_id'), NONE_INDEX)
+        room_idx[i] = rooms.get(row.get('room_number'), NONE_INDEX)
+        instructor = instructors.get(row.get('instructor_uid'))
+        offset = int(template.instructor_offsets[i])
+        if instructor in template.instructor_candidates[
+                offset:offset + int(template.instructor_counts[i])].tolist():
+            instructor_idx[i] = instructor
+    return meeting_time_idx, room_idx, instructor_idx
+
+
+class ConflictCounter:
+    """
+    Incrementally maintained conflict count for single-gene edits.
+    
+    Classes are hashed into (meeting_time, section, room) and
+    (meeting_time, section, instructor) buckets; a class joining a bucket
+    that already holds k classes adds k conflicts, and leaving it removes
+    k - 1. Replacing one gene therefore costs O(1) instead of a full
+    evaluation. When the snapshot has soft constraints, their penalty is
+    maintained alongside by a SoftPenaltyCounter and included in move_delta.
+    """
     
     def __init__(self, data: Data):
+        self._room_capacities = data.get_room_capacities()
+        self._course_max_students = data.get_course_max_students()
+        self._room_slots: Dict[Any, int] = {}
+        self._instructor_slots: Dict[Any, int] = {}
+        self.conflicts = 0
+        soft_constraints = data.get_soft_constraints()
+        self.soft: Optional[SoftPenaltyCounter] = (
+            SoftPenaltyCounter(soft_constraints) if soft_constraints else None)
+
+    def _capacity_conflicts(self, room: int, course: int) -> int:
+        if room != NONE_INDEX and self._room_capacities[room] < self._course_max_students[course]:
+            return 1
+        return 0
+
+    def add(self, meeting_time: int, room: int, instructor: int, course: int, section: int) -> None:
+        """Add a class and the conflicts it causes with classes already counted."""
+        room_key = (meeting_time, section, room)
+        instructor_key = (meeting_time, section, instructor)
+        room_count = self._room_slots.get(room_key, 0)
+        instructor_count = self._instructor_slots.get(instructor_key, 0)
+        self._room_slots[room_key] = room_count + 1
+        self._instructor_slots[instructor_key] = instructor_count + 1
+        self.conflicts += room_count + instructor_count + self._capacity_conflicts(room, course)
+        if self.soft is not None:
+            self.soft.add(meeting_time, room, instructor, course, section)
+
+    def move_delta(self, old: Tuple[int, int, int], new: Tuple[int, int, int],
+                   course: int, section: int) -> float:
+        """
+        Change in conflicts (plus soft penalty) if a counted class moved from
+        old to new (meeting_time, room, instructor), without applying the move.
+        """
+        old_room_key = (old[0], section, old[1])
+        old_instructor_key = (old[0], section, old[2])
+        new_room_key = (new[0], section, new[1])
+        new_instructor_key = (new[0], section, new[2])
+        removed = (self._room_slots[old_room_key] - 1 + self._instructor_slots[old_instructor_key] - 1
+                   + self._capacity_conflicts(old[1], course))
+        added = (self._room_slots.get(new_room_key, 0) - (new_room_key == old_room_key)
+                 + self._instructor_slots.get(new_instructor_key, 0)
+                 - (new_instructor_key == old_instructor_key)
+                 + self._capacity_conflicts(new[1], course))
+        if self.soft is not None:
+            return added - removed + self.soft.move_delta(old + (course, section), new + (course, section))
+        return added - removed
+
+    def remove(self, meeting_time: int, room: int, instructor: int, course: int, section: int) -> None:
+        """Remove a previously added class and the conflicts it caused."""
+        room_key = (meeting_time, section, room)
+        instructor_key = (meeting_time, section, instructor)
+        room_count = self._room_slots.pop(room_key) - 1
+        instructor_count = self._instructor_slots.pop(instructor_key) - 1
+        if room_count:
+            self._room_slots[room_key] = room_count
+        if instructor_count:
+            self._instructor_slots[instructor_key] = instructor_count
+        self.conflicts -= room_count + instructor_count + self._capacity_conflicts(room, course)
+        if self.soft is not None:
+            self.soft.remove(meeting_time, room, instructor, course, section)
+
+    def copy(self) -> 'ConflictCounter':
+        """Return an independent copy of the bucket state."""
+        counter = ConflictCounter.__new__(ConflictCounter)
+        counter._room_capacities = self._room_capacities
+        counter._course_max_students = self._course_max_students
+        counter._room_slots = self._room_slots.copy()
+        counter._instructor_slots = self._instructor_slots.copy()
+        counter.conflicts = self.conflicts
+        counter.soft = self.soft.copy() if self.soft is not None else None
+        return counter
+
+
+_EMPTY_GENES = np.empty(0, dtype=GENE_DTYPE)
+_EMPTY_GENES.flags.writeable = False
+
+
+class Schedule:
+    """
+    Represents a single schedule solution.
+    
+    Gene i is a class described by the i-th entry of the parallel arrays
+    meeting_time_idx, room_idx, instructor_idx, course_idx, section_idx and
+    its class id is its position. course_idx and section_idx are the
+    read-only arrays of the Data's gene template and are shared by every
+    schedule. Random initialization draws from rng, the generator of the
+    run the schedule belongs to.
+    
+    The assignment arrays are copy-on-write: copy() shares them with the
+    copy and marks them read-only, and a schedule takes private copies
+    before its first edit (set_gene, assign_genes). Schedules can therefore
+    share genes freely, e.g. elites kept by reference across generations,
+    without one schedule's edits reaching another or its cached fitness.
+    """
+    
+    def __init__(self, data: Data, rng: Optional[np.random.Generator] = None):
         self._data = data
-        self._classes: List[Class] = []
+        self._rng = rng
+        self._owns_genes = False
+        self.meeting_time_idx = _EMPTY_GENES
+        self.room_idx = _EMPTY_GENES
+        self.instructor_idx = _EMPTY_GENES
+        self.course_idx = _EMPTY_GENES
+        self.section_idx = _EMPTY_GENES
         self._number_of_conflicts = 0
+        self._soft_penalty = 0.0
         self._fitness = -1
-        self._class_numb = 0
         self._is_fitness_changed = True
+        self._conflict_counter: Optional[ConflictCounter] = None
 
-    def get_classes(self) -> List[Class]:
-        self._is_fitness_changed = True
-        return self._classes
+    def get_numb_of_classes(self) -> int:
+        return len(self.course_idx)
+
+    def get_rng(self) -> np.random.Generator:
+        """Random generator of this schedule (a fresh unseeded one if none was given)."""
+        if self._rng is None:
+            self._rng = np.random.default_rng()
+        return self._rng
 
     def get_numb_of_conflicts(self) -> int:
         return self._number_of_conflicts
 
+    def get_soft_penalty(self) -> float:
+        """Weighted soft-constraint penalty (0 when the snapshot has no soft constraints)."""
+        return self._soft_penalty
+
     def get_fitness(self) -> float:
         if self._is_fitness_changed:
             self._fitness = self.calculate_fitness()
             self._is_fitness_changed = False
         return self._fitness
 
+    def needs_evaluation(self) -> bool:
+        """Whether the cached fitness is stale and has no incremental counter to read from."""
+        return self._is_fitness_changed and self._conflict_counter is None
+
+    def set_numb_of_conflicts(self, conflicts: int, soft_penalty: float = 0.0) -> None:
+        """Store a conflict count (and soft penalty) computed externally (e.g. by evaluate_population)."""
+        self._number_of_conflicts = conflicts
+        self._soft_penalty = soft_penalty
+        self._fitness = fitness_of(conflicts, soft_penalty)
+        self._is_fitness_changed = False
+
+    def genes_changed(self) -> None:
+        """Invalidate cached fitness after the gene arrays were modified in bulk."""
+        self._conflict_counter = None
+        self._is_fitness_changed = True
+
+    def set_gene(self, index: int, meeting_time: int, room: int, instructor: int) -> None:
+        """
+        Reassign one class, updating the conflict count incrementally.
+        
+        The first edit builds a ConflictCounter for the schedule; later edits
+        only remove the old gene's conflicts and add the new gene's.
+        """
+        if self._conflict_counter is None:
+            self._conflict_counter = self._build_conflict_counter()
+        self._own_genes()
+        course = int(self.course_idx[index])
+        section = int(self.section_idx[index])
+        self._conflict_counter.remove(int(self.meeting_time_idx[index]), int(self.room_idx[index]),
+                                      int(self.instructor_idx[index]), course, section)
+        self.meeting_time_idx[index] = meeting_time
+        self.room_idx[index] = room
+        self.instructor_idx[index] = instructor
+        self._conflict_counter.add(meeting_time, room, instructor, course, section)
+        self._is_fitness_changed = True
+
+    def assign_genes(self, indices: np.ndarray, meeting_times: np.ndarray,
+                     rooms: np.ndarray, instructors: np.ndarray) -> None:
+        """Reassign several classes at once; the fitness is recomputed on the next read."""
+        self._own_genes()
+        self.meeting_time_idx[indices] = meeting_times
+        self.room_idx[indices] = rooms
+        self.instructor_idx[indices] = instructors
+        self.genes_changed()
+
+    def _own_genes(self) -> None:
+        """Copy-on-write: replace shared assignment arrays with private, writable copies."""
+        if not self._owns_genes:
+            self.meeting_time_idx = self.meeting_time_idx.copy()
+            self.room_idx = self.room_idx.copy()
+            self.instructor_idx = self.instructor_idx.copy()
+            self._owns_genes = True
+
+    def conflicting_genes(self) -> np.ndarray:
+        """Boolean mask of the classes involved in at least one conflict."""
+        data = self._data
+        in_conflict = self.room_idx != NONE_INDEX
+        in_conflict[in_conflict] = (data.get_room_capacities()[self.room_idx[in_conflict]]
+                                    < data.get_course_max_students()[self.course_idx[in_conflict]])
+        slot = ((self.meeting_time_idx.astype(np.int64) + 1) * (len(data.get_section_ids()) + 1)
+                + self.section_idx)
+        for assignment, assignment_range in ((self.room_idx, len(data.get_rooms()) + 1),
+                                             (self.instructor_idx, len(data.get_instructors()) + 1)):
+            _, inverse, counts = np.unique(slot * assignment_range + assignment + 1,
+                                           return_inverse=True, return_counts=True)
+            in_conflict |= counts[inverse.reshape(-1)] > 1
+        return in_conflict
+
+    def move_delta(self, index: int, meeting_time: int, room: int, instructor: int) -> float:
+        """Change in conflicts (plus soft penalty) set_gene(index, ...) would cause, in O(1)."""
+        if self._conflict_counter is None:
+            self._conflict_counter = self._build_conflict_counter()
+        return self._conflict_counter.move_delta(
+            (int(self.meeting_time_idx[index]), int(self.room_idx[index]),
+             int(self.instructor_idx[index])),
+            (meeting_time, room, instructor),
+            int(self.course_idx[index]), int(self.section_idx[index])
+        )
+
+    def copy(self) -> 'Schedule':
+        """Return an independent schedule sharing this one's assignment arrays until either is edited."""
+        for genes in (self.meeting_time_idx, self.room_idx, self.instructor_idx):
+            genes.flags.writeable = False
+        self._owns_genes = False
+        schedule = Schedule(self._data, self._rng)
+        schedule.meeting_time_idx = self.meeting_time_idx
+        schedule.room_idx = self.room_idx
+        schedule.instructor_idx = self.instructor_idx
+        schedule.course_idx = self.course_idx
+        schedule.section_idx = self.section_idx
+        schedule._number_of_conflicts = self._number_of_conflicts
+        schedule._soft_penalty = self._soft_penalty
+        schedule._fitness = self._fitness
+        schedule._is_fitness_changed = self._is_fitness_changed
+        if self._conflict_counter is not None:
+            schedule._conflict_counter = self._conflict_counter.copy()
+        return schedule
+
+    def child(self, meeting_time_idx: np.ndarray, room_idx: np.ndarray,
+              instructor_idx: np.ndarray) -> 'Schedule':
+        """New unevaluated schedule with the given assignment arrays and this schedule's classes."""
+        schedule = Schedule(self._data, self._rng)
+        schedule.meeting_time_idx = meeting_time_idx
+        schedule.room_idx = room_idx
+        schedule.instructor_idx = instructor_idx
+        schedule.course_idx = self.course_idx
+        schedule.section_idx = self.section_idx
+        schedule._owns_genes = True
+        return schedule
+
     def initialize(self) -> 'Schedule':
-        """Initialize schedule with random assignments."""
-        sections = Section.objects.all()
-        meeting_times = self._data.get_meetingTimes()
-        rooms = self._data.get_rooms()
+        """Initialize schedule with random assignments drawn from the gene template."""
+        template = self._data.get_gene_template()
+        rng = self.get_rng()
+        size = len(template)
+        self.course_idx = template.course_idx
+        self.section_idx = template.section_idx
+        self.meeting_time_idx = _random_indices(rng, size, len(self._data.get_meetingTimes()))
+        self.room_idx = self._data.random_rooms(rng, self.course_idx)
+        self.instructor_idx = template.random_instructors(rng)
+        self._owns_genes = True
+        self.genes_changed()
+        return self
+
+    def initialize_greedy(self, randomness: float = GREEDY_RANDOMNESS) -> 'Schedule':
+        """
+        Initialize schedule with a constraint-propagating greedy constructor.
         
-        for section in sections:
-            dept = section.department
-            n = section.num_class_in_week
-            
-            courses = list(dept.courses.all())
-            if not courses:
-                continue
-            
-            for course in courses:
-                num_classes = n // len(courses) if len(courses) > 0 else n
-                course_instructors = list(course.instructors.all())
-                
-                if not course_instructors:
-                    continue
+        Classes are placed most constrained first (fewest rooms large enough
+        for the course, then fewest candidate instructors, ties broken at
+        random). Each class takes the first meeting time, in random order,
+        where the smallest fitting room and one of its instructors are both
+        still free for its section; if no such slot exists the least
+        conflicting one is used. With probability randomness a class is
+        placed at random instead, so repeated calls give different schedules.
+        """
+        data = self._data
+        template = data.get_gene_template()
+        rng = self.get_rng()
+        size = len(template)
+        self.course_idx = template.course_idx
+        self.section_idx = template.section_idx
+        num_meeting_times = len(data.get_meetingTimes())
+        self.meeting_time_idx = _random_indices(rng, size, num_meeting_times)
+        self.room_idx = data.random_rooms(rng, self.course_idx)
+        self.instructor_idx = template.random_instructors(rng)
+        self._owns_genes = True
+        
+        # Rooms by ascending capacity; rooms[first_fit[c]:] fit course c
+        rooms = data.get_rooms_by_capacity().tolist()
+        first_fit = data.get_first_eligible_room().tolist()
+        course_idx = self.course_idx.tolist()
+        fitting = np.array([len(rooms) - first_fit[course] for course in course_idx], dtype=np.int64)
+        order = np.lexsort((rng.random(size), template.instructor_counts, fitting))
+        placed = (rng.random(size) >= randomness).tolist()
+        meeting_times = list(range(num_meeting_times)) or [NONE_INDEX]
+        
+        busy_rooms = set()
+        busy_instructors = set()
+        for i in order.tolist():
+            if placed[i]:
+                section = int(self.section_idx[i])
+                room_candidates = rooms[first_fit[course_idx[i]]:] or rooms[-1:] or [NONE_INDEX]
+                offset = int(template.instructor_offsets[i])
+                instructor_candidates = template.instructor_candidates[
+                    offset:offset + int(template.instructor_counts[i])].tolist()
+                rng.shuffle(meeting_times)
                 
-                for i in range(num_classes):
-                    new_class = Class(self._class_numb, dept, section.section_id, course)
-                    self._class_numb += 1
-                    
-                    # Random meeting time
-                    if meeting_times:
-                        new_class.set_meetingTime(
-                            meeting_times[rnd.randrange(0, len(meeting_times))]
-                        )
-                    
-                    # Random room
-                    if rooms:
-                        new_class.set_room(rooms[rnd.randrange(0, len(rooms))])
-                    
-                    # Random instructor
-                    if course_instructors:
-                        new_class.set_instructor(
-                            course_instructors[rnd.randrange(0, len(course_instructors))]
-                        )
-                    
-                    self._classes.append(new_class)
+                best = None
+                for meeting_time in meeting_times:
+                    room = next((r for r in room_candidates
+                                 if (meeting_time, section, r) not in busy_rooms), None)
+                    instructor = next((inst for inst in instructor_candidates
+                                       if (meeting_time, section, inst) not in busy_instructors), None)
+                    conflicts = (room is None) + (instructor is None)
+                    if best is None or conflicts < best[0]:
+                        best = (conflicts, meeting_time,
+                                room_candidates[0] if room is None else room,
+                                instructor_candidates[0] if instructor is None else instructor)
+                        if conflicts == 0:
+                            break
+                _, self.meeting_time_idx[i], self.room_idx[i], self.instructor_idx[i] = best
+            
+            key = (int(self.meeting_time_idx[i]), int(self.section_idx[i]))
+            busy_rooms.add(key + (int(self.room_idx[i]),))
+            busy_instructors.add(key + (int(self.instructor_idx[i]),))
         
+        self.genes_changed()
         return self
 
+    def initialize_from(self, assignments: List[Dict[str, Any]],
+                        randomness: float = 0.0) -> 'Schedule':
+        """
+        Initialize schedule from a previous timetable (warm start).
+        
+        assignments are timetable rows as produced by serialize() (section,
+        course_number, meeting_time_id, room_number, instructor_uid). Each
+        class takes the next unused row of its section and course. Classes
+        without a row, values whose entity no longer exists (or an instructor
+        who no longer teaches the course) and, with probability randomness,
+        any class keep a random assignment instead.
+        """
+        self.initialize()
+        kept = self.get_rng().random(self.get_numb_of_classes()) >= randomness
+        for genes, restored in zip((self.meeting_time_idx, self.room_idx, self.instructor_idx),
+                                   decode_timetable(self._data, assignments)):
+            np.copyto(genes, restored, where=kept & (restored != NONE_INDEX))
+        
+        self.genes_changed()
+        return self
+
+    def _build_conflict_counter(self) -> ConflictCounter:
+        counter = ConflictCounter(self._data)
+        for gene in zip(self.meeting_time_idx.tolist(), self.room_idx.tolist(),
+                        self.instructor_idx.tolist(), self.course_idx.tolist(),
+                        self.section_idx.tolist()):
+            counter.add(*gene)
+        return counter
+
     def calculate_fitness(self) -> float:
         """Calculate fitness score (higher is better)."""
-        self._number_of_conflicts = 0
-        classes = self.get_classes()
+        if self._conflict_counter is not None:
+            self._number_of_conflicts = self._conflict_counter.conflicts
+            soft = self._conflict_counter.soft
+            self._soft_penalty = soft.penalty if soft is not None else 0.0
+        else:
+            genes = (self.meeting_time_idx, self.room_idx, self.instructor_idx,
+                     self.course_idx, self.section_idx)
+            self._number_of_conflicts = count_conflicts(self._data, *genes)
+            soft_constraints = self._data.get_soft_constraints()
+            self._soft_penalty = (float(soft_constraints.penalties(
+                *genes, np.zeros(len(self.course_idx), dtype=np.int64), 1)[0])
+                if soft_constraints else 0.0)
         
-        for i in range(len(classes)):
-            # Check room capacity
-            if classes[i].room and classes[i].course:
-                try:
-                    max_students = int(classes[i].course.max_numb_students)
-                    if classes[i].room.seating_capacity < max_students:
-                        self._number_of_conflicts += 1
-                except (ValueError, TypeError):
-                    pass
-            
-            # Check conflicts with other classes
-            for j in range(i + 1, len(classes)):
-                if (classes[i].meeting_time == classes[j].meeting_time and
-                    classes[i].section_id != classes[j].section_id and
-                    classes[i].section == classes[j].section):
-                    
-                    # Same room conflict
-                    if classes[i].room == classes[j].room:
-                        self._number_of_conflicts += 1
-                    
-                    # Same instructor conflict
-                    if classes[i].instructor == classes[j].instructor:
-                        self._number_of_conflicts += 1
+        return fitness_of(self._number_of_conflicts, self._soft_penalty)
+
+    def serialize(self) -> List[Dict[str, Any]]:
+        """Decode the gene arrays back into serializable class dictionaries."""
+        data = self._data
+        rooms = data.get_rooms()
+        instructors = data.get_instructors()
+        meeting_times = data.get_meetingTimes()
+        courses = data.get_courses()
+        section_ids = data.get_section_ids()
         
-        return 1 / (1.0 * self._number_of_conflicts + 1)
+        result = []
+        for class_id, (mt_idx, room_idx, inst_idx, course_idx, section_idx) in enumerate(zip(
+                self.meeting_time_idx.tolist(), self.room_idx.tolist(),
+                self.instructor_idx.tolist(), self.course_idx.tolist(),
+                self.section_idx.tolist())):
+            course = courses[course_idx]
+            room = rooms[room_idx] if room_idx != NONE_INDEX else None
+            instructor = instructors[inst_idx] if inst_idx != NONE_INDEX else None
+            meeting_time = meeting_times[mt_idx] if mt_idx != NONE_INDEX else None
+            result.append({
+                'section_id': class_id,
+                'section': section_ids[section_idx],
+                'department': data.get_section_dept(section_idx).dept_name,
+                'course_number': course.course_number,
+                'course_name': course.course_name,
+                'max_students': course.max_numb_students,
+                'room_number': room.r_number if room else None,
+                'room_capacity': room.seating_capacity if room else None,
+                'instructor_uid': instructor.uid if instructor else None,
+                'instructor_name': instructor.name if instructor else None,
+                'meeting_time_id': meeting_time.pid if meeting_time else None,
+                'meeting_day': meeting_time.day if meeting_time else None,
+                'meeting_time': meeting_time.time if meeting_time else None,
+            })
+        return result
 
 
 class Population:
     """Represents a population of schedules."""
     
-    def __init__(self, size: int, data: Data):
+    def __init__(self, size: int, data: Data, seeded: int = 0,
+                 warm_start: Optional[List[Dict[str, Any]]] = None,
+                 rng: Optional[np.random.Generator] = None):
         self._size = size
         self._data = data
-        self._schedules = [Schedule(data).initialize() for _ in range(size)]
+        self._schedules = []
+        self.evaluated = 0
+        if not size:
+            return
+        if rng is None:
+            rng = np.random.default_rng()
+        if warm_start:
+            warm = max(1, round(size * WARM_START_RATIO))
+            self._schedules.append(Schedule(data, rng).initialize_from(warm_start))
+            self._schedules.extend(Schedule(data, rng).initialize_from(warm_start, WARM_START_RANDOMNESS)
+                                   for _ in range(warm - 1))
+        seeded = min(seeded, size - len(self._schedules))
+        self._schedules.extend(Schedule(data, rng).initialize_greedy() for _ in range(seeded))
+        self._schedules.extend(Schedule(data, rng).initialize() for _ in range(size - len(self._schedules)))
 
     def get_schedules(self) -> List[Schedule]:
         return self._schedules
 
+    def evaluate(self) -> 'Population':
+        """Score all stale schedules with one vectorized pass (their number is kept in evaluated)."""
+        self.evaluated = evaluate_population(self._data, self._schedules)
+        return self
+
 
 class GeneticAlgorithm:
     """Genetic algorithm implementation for schedule evolution."""
@@ -202,22 +957,37 @@ class GeneticAlgorithm:
     def __init__(self, population_size: int = POPULATION_SIZE,
                  num_elite: int = NUMB_OF_ELITE_SCHEDULES,
                  tournament_size: int = TOURNAMENT_SELECTION_SIZE,
-                 mutation_rate: float = MUTATION_RATE):
+                 mutation_rate: float = MUTATION_RATE,
+                 rng: Optional[np.random.Generator] = None):
         self.population_size = population_size
         self.num_elite = num_elite
         self.tournament_size = tournament_size
         self.mutation_rate = mutation_rate
+        self._rng = rng if rng is not None else np.random.default_rng()
+        self.evaluations = 0
 
-    def evolve(self, population: Population) -> Population:
-        """Evolve population through crossover and mutation."""
-        return self._mutate_population(self._crossover_population(population))
+    def evolve(self, population: Population, profiler: NullProfiler = NULL_PROFILER) -> Population:
+        """Evolve population through crossover and mutation, counting the schedules scored."""
+        with profiler.phase(PHASE_SELECTION):
+            population = self._mutate_population(self._crossover_population(population))
+        with profiler.phase(PHASE_EVALUATION):
+            population.evaluate()
+        self.evaluations += population.evaluated
+        return population
+
+    def adapt_mutation_rate(self, stagnant_generations: int) -> None:
+        """Lower the mutation rate after an improvement, raise it while the best stagnates."""
+        if stagnant_generations == 0:
+            self.mutation_rate = max(MIN_MUTATION_RATE, self.mutation_rate / ADAPTIVE_MUTATION_FACTOR)
+        elif stagnant_generations % ADAPTIVE_MUTATION_PATIENCE == 0:
+            self.mutation_rate = min(MAX_MUTATION_RATE, self.mutation_rate * ADAPTIVE_MUTATION_FACTOR)
 
     def _crossover_population(self, pop: Population) -> Population:
         """Perform crossover operation on population."""
         data = pop._data
         crossover_pop = Population(0, data)
         
-        # Keep elite schedules
+        # Keep elite schedules (by reference: children never write to their parents)
         schedules = pop.get_schedules()
         schedules.sort(key=lambda x: x.get_fitness(), reverse=True)
         
@@ -248,30 +1018,37 @@ class GeneticAlgorithm:
         return population
 
     def _crossover_schedule(self, schedule1: Schedule, schedule2: Schedule, data: Data) -> Schedule:
-        """Create new schedule by crossing over two parent schedules."""
-        crossover_schedule = Schedule(data).initialize()
-        classes1 = schedule1.get_classes()
-        classes2 = schedule2.get_classes()
-        crossover_classes = crossover_schedule.get_classes()
-        
-        for i in range(min(len(crossover_classes), len(classes1), len(classes2))):
-            if rnd.random() > 0.5:
-                crossover_classes[i] = classes1[i] if i < len(classes1) else crossover_classes[i]
-            else:
-                crossover_classes[i] = classes2[i] if i < len(classes2) else crossover_classes[i]
+        """Create new schedule by taking each gene from either parent with equal odds."""
+        from_second = self._rng.random(schedule1.get_numb_of_classes()) <= 0.5
         
-        return crossover_schedule
+        # The child's arrays are built straight from the parents' genes
+        return schedule1.child(
+            np.where(from_second, schedule2.meeting_time_idx, schedule1.meeting_time_idx),
+            np.where(from_second, schedule2.room_idx, schedule1.room_idx),
+            np.where(from_second, schedule2.instructor_idx, schedule1.instructor_idx),
+        )
 
     def _mutate_schedule(self, mutate_schedule: Schedule, data: Data) -> Schedule:
-        """Mutate a schedule by randomly changing some classes."""
-        new_schedule = Schedule(data).initialize()
-        mutate_classes = mutate_schedule.get_classes()
-        new_classes = new_schedule.get_classes()
+        """
+        Mutate a schedule by redrawing the assignment of some classes
+        (rooms among those large enough for the class's course).
+        
+        Each class mutates with probability mutation_rate; the number of
+        mutated classes is drawn first, so random values are only drawn for
+        those classes instead of for a whole new schedule.
+        """
+        n = mutate_schedule.get_numb_of_classes()
+        count = int(self._rng.binomial(n, self.mutation_rate)) if n else 0
+        if count == 0:
+            return mutate_schedule
+        mutated = self._rng.choice(n, size=count, replace=False)
         
-        for i in range(len(mutate_classes)):
-            if self.mutation_rate > rnd.random():
-                if i < len(new_classes):
-                    mutate_classes[i] = new_classes[i]
+        mutate_schedule.assign_genes(
+            mutated,
+            _random_indices(self._rng, count, len(data.get_meetingTimes())),
+            data.random_rooms(self._rng, mutate_schedule.course_idx[mutated]),
+            data.get_gene_template().random_instructors(self._rng, mutated),
+        )
         
         return mutate_schedule
 
@@ -281,11 +1058,9 @@ class GeneticAlgorithm:
         tournament_pop = Population(0, data)
         schedules = pop.get_schedules()
         
-        for _ in range(self.tournament_size):
-            if schedules:
-                tournament_pop.get_schedules().append(
-                    schedules[rnd.randrange(0, len(schedules))]
-                )
+        if schedules:
+            for pick in self._rng.integers(0, len(schedules), size=self.tournament_size).tolist():
+                tournament_pop.get_schedules().append(schedules[pick])
         
         tournament_pop.get_schedules().sort(key=lambda x: x.get_fitness(), reverse=True)
         return tournament_pop
@@ -295,80 +1070,182 @@ class GeneticAlgorithmStrategy(BaseGenerationStrategy):
     """
     Genetic Algorithm strategy implementation.
     Following Strategy Pattern - can be swapped with other strategies.
+    
+    Evolution stops at the first of: a conflict-free schedule (without soft
+    penalty when soft_constraints are configured), the best
+    schedule reaching target_conflicts, stagnation_generations generations
+    without improvement, time_limit_seconds of wall-clock time,
+    max_generations, or cancellation. The reason is returned as stop_reason.
+    The clock is read once per generation, so a run overshoots its time
+    limit by at most one generation and then returns the best schedule so
+    far with timed_out=True.
     """
     
     def __init__(self, population_size: int = POPULATION_SIZE,
                  num_elite: int = NUMB_OF_ELITE_SCHEDULES,
                  tournament_size: int = TOURNAMENT_SELECTION_SIZE,
                  mutation_rate: float = MUTATION_RATE,
-                 max_generations: int = 1000):
+                 max_generations: int = 1000,
+                 greedy_seed_ratio: float = GREEDY_SEED_RATIO,
+                 seed: Optional[int] = None,
+                 target_conflicts: int = 0,
+                 stagnation_generations: Optional[int] = None,
+                 time_limit_seconds: Optional[float] = None,
+                 adaptive_mutation: bool = False,
+                 soft_constraints: Optional[Dict[str, Dict[str, Any]]] = None):
         self.population_size = population_size
         self.num_elite = num_elite
         self.tournament_size = tournament_size
         self.mutation_rate = mutation_rate
         self.max_generations = max_generations
-    
+        self.greedy_seed_ratio = greedy_seed_ratio
+        self.seed = seed
+        self.target_conflicts = target_conflicts
+        self.stagnation_generations = stagnation_generations
+        self.time_limit_seconds = time_limit_seconds
+        self.adaptive_mutation = adaptive_mutation
+        self.soft_constraints = soft_constraints
+
     def generate(self, **kwargs) -> Dict[str, Any]:
         """
         Generate routine using genetic algorithm.
         
+        Args:
+            data: Preloaded Data snapshot (loaded from the database if omitted)
+            progress_callback: Called after generations with a dict of
+                generation, best_fitness, mean_fitness, conflicts and elapsed_ms
+            progress_interval: Minimum seconds between two progress_callback
+                calls (default 0, every generation); the last generation is
+                always reported
+            cancel_event: threading.Event; when set, evolution stops and the
+                best schedule so far is returned with cancelled=True
+            warm_start: Timetable rows of a previous schedule to seed part of
+                the initial population from
+            profiler: GenerationProfiler recording the run's phases
+                (database load, initialization, evaluation, selection and
+                serialization) and counters
+        
         Returns:
-            Dictionary with generated schedule data
+            Dictionary with generated schedule data, plus the seed the run
+            used (the same seed and data reproduce the same schedule) and
+            the stop_reason, timed_out and evaluations (schedules scored);
+            with soft constraints also the best schedule's soft_penalty and
+            soft_violations per constraint, and with a profiler its profile
         """
         try:
-            data = Data()
-            population = Population(self.population_size, data)
+            profiler = kwargs.get('profiler') or NULL_PROFILER
+            data = kwargs.get('data')
+            if data is None:
+                with profiler.phase(PHASE_DB_LOAD):
+                    data = Data()
+                profiler.count('db_collection_reads', data.get_load_stats().get('collections', 0))
+            soft_constraints = build_soft_constraints(self.soft_constraints)
+            if soft_constraints:
+                data = data.with_soft_constraints(soft_constraints)
+            progress_callback = kwargs.get('progress_callback')
+            progress_interval = kwargs.get('progress_interval') or 0.0
+            cancel_event = kwargs.get('cancel_event')
+            seed = self.seed if self.seed is not None else random_seed()
+            rng = np.random.default_rng(seed)
+            started = time.perf_counter()
+            last_report = started
+            with profiler.phase(PHASE_INITIALIZATION):
+                population = Population(
+                    self.population_size, data,
+                    seeded=round(self.population_size * self.greedy_seed_ratio),
+                    warm_start=kwargs.get('warm_start'),
+                    rng=rng
+                )
+            with profiler.phase(PHASE_EVALUATION):
+                population.evaluate()
             genetic_algorithm = GeneticAlgorithm(
                 population_size=self.population_size,
                 num_elite=self.num_elite,
                 tournament_size=self.tournament_size,
-                mutation_rate=self.mutation_rate
+                mutation_rate=self.mutation_rate,
+                rng=rng
             )
             
+            initial_evaluations = population.evaluated
             generation_num = 0
             schedules = population.get_schedules()
             schedules.sort(key=lambda x: x.get_fitness(), reverse=True)
+            best_fitness = schedules[0].get_fitness()
+            stagnant = 0
             
-            # Evolve until perfect fitness or max generations
-            while (generation_num < self.max_generations and
-                   schedules[0].get_fitness() != 1.0):
+            # Evolve until a termination criterion is met
+            stop_reason = self._stop_reason(generation_num, schedules[0], stagnant, started)
+            while stop_reason is None:
+                if cancel_event is not None and cancel_event.is_set():
+                    stop_reason = STOP_CANCELLED
+                    break
                 generation_num += 1
-                population = genetic_algorithm.evolve(population)
+                population = genetic_algorithm.evolve(population, profiler)
                 schedules = population.get_schedules()
                 schedules.sort(key=lambda x: x.get_fitness(), reverse=True)
+                if schedules[0].get_fitness() > best_fitness:
+                    best_fitness = schedules[0].get_fitness()
+                    stagnant = 0
+                else:
+                    stagnant += 1
+                if self.adaptive_mutation:
+                    genetic_algorithm.adapt_mutation_rate(stagnant)
+                stop_reason = self._stop_reason(generation_num, schedules[0], stagnant, started)
+                if progress_callback is not None:
+                    now = time.perf_counter()
+                    if stop_reason is not None or now - last_report >= progress_interval:
+                        last_report = now
+                        progress_callback(self._progress(generation_num, schedules, started))
             
             best_schedule = schedules[0]
-            classes = best_schedule.get_classes()
-            
-            # Convert to serializable format
-            result = []
-            for cls in classes:
-                result.append({
-                    'section_id': cls.section_id,
-                    'section': cls.section,
-                    'department': cls.department.dept_name,
-                    'course_number': cls.course.course_number,
-                    'course_name': cls.course.course_name,
-                    'max_students': cls.course.max_numb_students,
-                    'room_number': cls.room.r_number if cls.room else None,
-                    'room_capacity': cls.room.seating_capacity if cls.room else None,
-                    'instructor_uid': cls.instructor.uid if cls.instructor else None,
-                    'instructor_name': cls.instructor.name if cls.instructor else None,
-                    'meeting_time_id': cls.meeting_time.pid if cls.meeting_time else None,
-                    'meeting_day': cls.meeting_time.day if cls.meeting_time else None,
-                    'meeting_time': cls.meeting_time.time if cls.meeting_time else None,
-                })
+            with profiler.phase(PHASE_SERIALIZATION):
+                rows = best_schedule.serialize()
             
-            return {
-                'schedule': result,
+            result = {
+                'schedule': rows,
                 'fitness': best_schedule.get_fitness(),
                 'conflicts': best_schedule.get_numb_of_conflicts(),
                 'generations': generation_num,
+                'cancelled': stop_reason == STOP_CANCELLED,
+                'seed': seed,
+                'stop_reason': stop_reason,
+                'timed_out': stop_reason == STOP_TIME_LIMIT,
+                'evaluations': initial_evaluations + genetic_algorithm.evaluations,
+                **soft_constraint_report(best_schedule),
             }
+            if profiler.enabled:
+                profiler.count('evaluations', result['evaluations'])
+                result['profile'] = profiler.report()
+            return result
         except Exception as e:
             raise RoutineGenerationError(f"Error generating routine: {str(e)}")
-    
+
+    def _stop_reason(self, generation_num: int, best: Schedule, stagnant: int,
+                     started: float) -> Optional[str]:
+        """Termination criterion met after generation_num generations, if any."""
+        reached = reached_target(best.get_numb_of_conflicts(), best.get_soft_penalty(),
+                                 self.target_conflicts)
+        if reached is not None:
+            return reached
+        if generation_num >= self.max_generations:
+            return STOP_MAX_GENERATIONS
+        if self.stagnation_generations and stagnant >= self.stagnation_generations:
+            return STOP_STAGNATION
+        if self.time_limit_seconds is not None and time.perf_counter() - started >= self.time_limit_seconds:
+            return STOP_TIME_LIMIT
+        return None
+
+    @staticmethod
+    def _progress(generation_num: int, schedules: List[Schedule], started: float) -> Dict[str, Any]:
+        """Build the progress report for a sorted population."""
+        return {
+            'generation': generation_num,
+            'best_fitness': schedules[0].get_fitness(),
+            'mean_fitness': sum(schedule.get_fitness() for schedule in schedules) / len(schedules),
+            'conflicts': schedules[0].get_numb_of_conflicts(),
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 3),
+        }
+
     def get_fitness(self, schedule: Schedule) -> float:
         """Calculate fitness for a schedule."""
         return schedule.get_fitness()
-
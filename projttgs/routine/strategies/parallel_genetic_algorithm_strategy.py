@@ -0,0 +1,504 @@
+"""
+Island-model parallel Genetic Algorithm strategy for routine generation.
+Runs several independent GA populations on separate CPU cores.
+"""
+import multiprocessing
+import os
+import pickle
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from routine.strategies.base_strategy import (
+    BaseGenerationStrategy, STOP_STAGNATION, STOP_TIME_LIMIT, STOP_MAX_GENERATIONS, STOP_CANCELLED
+)
+from routine.strategies.genetic_algorithm_strategy import (
+    Data, Schedule, Population, GeneticAlgorithm, GENE_DTYPE,
+    POPULATION_SIZE, NUMB_OF_ELITE_SCHEDULES, TOURNAMENT_SELECTION_SIZE, MUTATION_RATE,
+    GREEDY_SEED_RATIO, fitness_of, random_seed, reached_target, soft_constraint_report
+)
+from routine.strategies.profiling import (
+    NULL_PROFILER, PHASE_DB_LOAD, PHASE_ISLANDS, PHASE_MIGRATION, PHASE_SERIALIZATION
+)
+from routine.strategies.soft_constraints import build_soft_constraints
+from core.exceptions import RoutineGenerationError
+
+
+# Island model constants
+MIGRATION_INTERVAL = 10
+NUMB_OF_MIGRANTS = 1
+
+# Seconds between two cancel checks while islands evolve
+CANCEL_POLL_INTERVAL = 0.1
+# Seconds islands may take to return after the time limit or a cancel
+# before their epoch is abandoned (e.g. worker processes still starting)
+STOP_GRACE_SECONDS = 0.5
+
+# Island pools accept this many concurrent runs (one stop flag each)
+MAX_CONCURRENT_RUNS = 32
+
+# (meeting_time_idx, room_idx, instructor_idx) of one schedule
+Genes = Tuple[np.ndarray, np.ndarray, np.ndarray]
+# Genes of one schedule with its conflicts and soft penalty, so it is not scored again
+Member = Tuple[Genes, int, float]
+
+# Per-process island state, set by _init_island and _island_data in every worker
+_island_stop = None
+_island_snapshot: Tuple[Optional[str], Optional[Data]] = (None, None)
+
+# Island pools of this process by number of islands
+_island_pools: Dict[int, '_IslandPool'] = {}
+_island_pools_lock = threading.Lock()
+
+
+def _init_island(stop_flags: Any) -> None:
+    """Worker initializer: keep the pool's shared stop flags."""
+    global _island_stop
+    _island_stop = stop_flags
+
+
+def _island_data(snapshot: Tuple[str, bytes]) -> Data:
+    """Problem snapshot of a run, unpickled once per worker process and run."""
+    global _island_snapshot
+    key, pickled = snapshot
+    if _island_snapshot[0] != key:
+        _island_snapshot = (key, pickle.loads(pickled))
+    return _island_snapshot[1]
+
+
+def _schedule_from_member(data: Data, member: Member) -> Schedule:
+    genes, conflicts, soft_penalty = member
+    schedule = Schedule(data)
+    template = data.get_gene_template()
+    schedule.course_idx = template.course_idx
+    schedule.section_idx = template.section_idx
+    schedule.meeting_time_idx, schedule.room_idx, schedule.instructor_idx = (
+        np.array(gene, dtype=GENE_DTYPE) for gene in genes
+    )
+    schedule.set_numb_of_conflicts(conflicts, soft_penalty)
+    return schedule
+
+
+def _evolve_island(snapshot: Tuple[str, bytes], stop_slot: int, members: Optional[List[Member]],
+                   params: Dict[str, Any], seeded: int,
+                   warm_start: Optional[List[Dict[str, Any]]],
+                   generations: int, seed: Tuple[int, ...], target_conflicts: int = 0,
+                   adaptive_mutation: bool = False, stagnant: int = 0,
+                   deadline: Optional[float] = None) -> Tuple[List[Member], int, float, int, int]:
+    """
+    Evolve one island for up to `generations` generations.
+    
+    Args:
+        snapshot: Key of the run and its pickled Data snapshot
+        stop_slot: The run's flag in the pool's stop flags
+        members: Island population with its scores (None to start from a
+            random one)
+        params: GeneticAlgorithm parameters
+        seeded: Greedy-built schedules in a new island population
+        warm_start: Timetable rows seeding a new island population
+        generations: Generations to run before returning for migration
+        seed: Entropy for this island and epoch: (run seed, generation, island)
+        target_conflicts: Stop every island once one has this few conflicts
+            (see reached_target)
+        adaptive_mutation: Adapt the island's mutation rate to its progress
+        stagnant: Generations the island's best has not improved so far
+        deadline: time.monotonic() at which the run's time limit expires (the
+            system-wide clock every worker shares); the island stops after
+            the generation that passes it
+    
+    Returns:
+        Island population with its scores sorted best first, generations
+        actually run, the island's mutation rate and stagnant count for the
+        next epoch, and the number of schedules it scored
+    """
+    data = _island_data(snapshot)
+    # Every island and epoch draws from its own stream, no global RNG state is shared
+    rng = np.random.default_rng(seed)
+    
+    if members is None:
+        population = Population(params['population_size'], data, seeded=seeded,
+                                warm_start=warm_start, rng=rng)
+    else:
+        population = Population(0, data)
+        population.get_schedules().extend(_schedule_from_member(data, member) for member in members)
+    evaluations = population.evaluate().evaluated
+    genetic_algorithm = GeneticAlgorithm(rng=rng, **params)
+    
+    schedules = population.get_schedules()
+    schedules.sort(key=lambda x: x.get_fitness(), reverse=True)
+    best_fitness = schedules[0].get_fitness()
+    run = 0
+    while run < generations and reached_target(schedules[0].get_numb_of_conflicts(),
+                                               schedules[0].get_soft_penalty(), target_conflicts) is None:
+        # Another island reached the target, or the run was cancelled
+        if _island_stop[stop_slot]:
+            break
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+        run += 1
+        population = genetic_algorithm.evolve(population)
+        schedules = population.get_schedules()
+        schedules.sort(key=lambda x: x.get_fitness(), reverse=True)
+        if schedules[0].get_fitness() > best_fitness:
+            best_fitness = schedules[0].get_fitness()
+            stagnant = 0
+        else:
+            stagnant += 1
+        if adaptive_mutation:
+            genetic_algorithm.adapt_mutation_rate(stagnant)
+    
+    if reached_target(schedules[0].get_numb_of_conflicts(), schedules[0].get_soft_penalty(),
+                      target_conflicts) is not None:
+        _island_stop[stop_slot] = 1
+    members = [((s.meeting_time_idx, s.room_idx, s.instructor_idx), s.get_numb_of_conflicts(), s.get_soft_penalty())
+               for s in schedules]
+    return members, run, genetic_algorithm.mutation_rate, stagnant, evaluations + genetic_algorithm.evaluations
+
+
+class _IslandPool:
+    """
+    Spawn process pool shared by the runs with the same number of islands.
+    
+    Starting the worker processes takes a second or more, so the pool
+    outlives runs; concurrent runs queue for its workers. A run stops its
+    islands through its slot of the shared stop flags, which is reused only
+    once every island task of the run has returned.
+    """
+    
+    def __init__(self, num_islands: int):
+        # spawn: workers must not inherit the server's threads or sockets
+        context = multiprocessing.get_context('spawn')
+        self.stop_flags = context.RawArray('b', MAX_CONCURRENT_RUNS)
+        self.executor = ProcessPoolExecutor(max_workers=num_islands, mp_context=context,
+                                            initializer=_init_island, initargs=(self.stop_flags,))
+        self._free_slots = list(range(MAX_CONCURRENT_RUNS))
+        self._lock = threading.Lock()
+    
+    def acquire_slot(self) -> int:
+        """Stop flag slot for a new run."""
+        with self._lock:
+            if not self._free_slots:
+                raise RoutineGenerationError(f"More than {MAX_CONCURRENT_RUNS} concurrent island model runs")
+            slot = self._free_slots.pop()
+        self.stop_flags[slot] = 0
+        return slot
+    
+    def release_slot(self, slot: int, futures: List[Future]) -> None:
+        """Stop a finished run's islands and free its slot once its tasks have returned."""
+        self.stop_flags[slot] = 1
+        for future in futures:
+            future.cancel()
+        pending = [future for future in futures if not future.done()]
+        if not pending:
+            with self._lock:
+                self._free_slots.append(slot)
+            return
+        remaining = [len(pending)]
+        
+        def on_done(_: Future) -> None:
+            with self._lock:
+                remaining[0] -= 1
+                if remaining[0] == 0:
+                    self._free_slots.append(slot)
+        
+        for future in pending:
+            future.add_done_callback(on_done)
+
+
+def _island_pool(num_islands: int) -> _IslandPool:
+    """This process's island pool for num_islands islands, started on first use."""
+    with _island_pools_lock:
+        pool = _island_pools.get(num_islands)
+        if pool is None:
+            pool = _island_pools[num_islands] = _IslandPool(num_islands)
+        return pool
+
+
+def _discard_island_pool(num_islands: int, pool: _IslandPool) -> None:
+    """Forget a broken pool, so the next run starts a fresh one."""
+    with _island_pools_lock:
+        if _island_pools.get(num_islands) is pool:
+            del _island_pools[num_islands]
+    pool.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ParallelGeneticAlgorithmStrategy(BaseGenerationStrategy):
+    """
+    Island-model Genetic Algorithm strategy.
+    
+    Islands run on a spawn ProcessPoolExecutor shared by the runs of this
+    process (see _IslandPool); a run's problem snapshot is pickled once and
+    unpickled once per worker. Islands send their populations back with
+    the scores, so nothing is scored twice. Each island evolves its own population for
+    migration_interval generations per epoch; between epochs the best
+    num_migrants schedules of every island replace the worst of the next
+    island (ring topology). The run stops as soon as any island reaches
+    target_conflicts (a conflict-free schedule without soft penalty by
+    default), or between epochs after stagnation_generations generations
+    without improvement, after time_limit_seconds, at max_generations, or
+    when cancelled.
+    """
+    
+    def __init__(self, population_size: int = POPULATION_SIZE,
+                 num_elite: int = NUMB_OF_ELITE_SCHEDULES,
+                 tournament_size: int = TOURNAMENT_SELECTION_SIZE,
+                 mutation_rate: float = MUTATION_RATE,
+                 max_generations: int = 1000,
+                 num_islands: Optional[int] = None,
+                 migration_interval: int = MIGRATION_INTERVAL,
+                 num_migrants: int = NUMB_OF_MIGRANTS,
+                 greedy_seed_ratio: float = GREEDY_SEED_RATIO,
+                 seed: Optional[int] = None,
+                 target_conflicts: int = 0,
+                 stagnation_generations: Optional[int] = None,
+                 time_limit_seconds: Optional[float] = None,
+                 adaptive_mutation: bool = False,
+                 soft_constraints: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.population_size = population_size
+        self.num_elite = num_elite
+        self.tournament_size = tournament_size
+        self.mutation_rate = mutation_rate
+        self.max_generations = max_generations
+        self.num_islands = num_islands or os.cpu_count() or 1
+        self.migration_interval = max(1, migration_interval)
+        self.num_migrants = min(num_migrants, max(0, population_size - 1))
+        self.greedy_seed_ratio = greedy_seed_ratio
+        self.seed = seed
+        self.target_conflicts = target_conflicts
+        self.stagnation_generations = stagnation_generations
+        self.time_limit_seconds = time_limit_seconds
+        self.adaptive_mutation = adaptive_mutation
+        self.soft_constraints = soft_constraints
+    
+    def generate(self, **kwargs) -> Dict[str, Any]:
+        """
+        Generate routine using island-model genetic algorithm.
+        
+        Args:
+            data: Preloaded Data snapshot (loaded from the database if omitted)
+            progress_callback: Called after migration epochs with a dict of
+                generation, best_fitness, mean_fitness (over every island's
+                population), conflicts and elapsed_ms
+            progress_interval: Minimum seconds between two progress_callback
+                calls (default 0, every epoch); the last epoch is always
+                reported
+            cancel_event: threading.Event; when set, every island stops after
+                its current generation and the best schedule so far is
+                returned with cancelled=True
+            warm_start: Timetable rows of a previous schedule to seed part of
+                every island's initial population from
+            profiler: GenerationProfiler recording the run's phases
+                (database load, island epochs, migration and serialization)
+                and counters
+        
+        Returns:
+            Dictionary with generated schedule data, plus the seed the run
+            used (the same seed and data reproduce the same schedule unless
+            an island reaches the target or the run is cancelled mid-epoch)
+            and the stop_reason, timed_out and evaluations (schedules scored
+            on all islands); with soft constraints also the best schedule's
+            soft_penalty and soft_violations per constraint, and with a
+            profiler its profile
+        """
+        try:
+            profiler = kwargs.get('profiler') or NULL_PROFILER
+            data = kwargs.get('data')
+            if data is None:
+                with profiler.phase(PHASE_DB_LOAD):
+                    data = Data()
+                profiler.count('db_collection_reads', data.get_load_stats().get('collections', 0))
+            soft_constraints = build_soft_constraints(self.soft_constraints)
+            if soft_constraints:
+                data = data.with_soft_constraints(soft_constraints)
+            progress_callback = kwargs.get('progress_callback')
+            progress_interval = kwargs.get('progress_interval') or 0.0
+            cancel_event = kwargs.get('cancel_event')
+            warm_start = kwargs.get('warm_start')
+            started = time.perf_counter()
+            last_report = started
+            # Absolute, so worker processes compare against the same instant; taken before
+            # any worker is reached, so pool start-up and queueing count against the limit
+            deadline = None if self.time_limit_seconds is None else time.monotonic() + self.time_limit_seconds
+            params = {
+                'population_size': self.population_size,
+                'num_elite': self.num_elite,
+                'tournament_size': self.tournament_size,
+                'mutation_rate': self.mutation_rate,
+            }
+            seed = self.seed if self.seed is not None else random_seed()
+            seeded = round(self.population_size * self.greedy_seed_ratio)
+            
+            snapshot = (uuid.uuid4().hex, pickle.dumps(data))
+            islands: List[Optional[List[Member]]] = [None] * self.num_islands
+            mutation_rates = [self.mutation_rate] * self.num_islands
+            island_stagnant = [0] * self.num_islands
+            generation_num = 0
+            evaluations = 0
+            best_fitness = None
+            stagnant = 0
+            stop_reason = None
+            
+            pool = _island_pool(self.num_islands)
+            slot = pool.acquire_slot()
+            futures: List[Future] = []
+            try:
+                while True:
+                    stop_reason = self._epoch_stop_reason(generation_num, stagnant, deadline)
+                    if stop_reason is None and cancel_event is not None and cancel_event.is_set():
+                        stop_reason = STOP_CANCELLED
+                    if stop_reason is not None:
+                        break
+                    epoch = min(self.migration_interval, self.max_generations - generation_num)
+                    with profiler.phase(PHASE_ISLANDS):
+                        futures = [
+                            pool.executor.submit(_evolve_island, snapshot, slot, members,
+                                                 dict(params, mutation_rate=mutation_rates[i]),
+                                                 seeded, warm_start if members is None else None, epoch,
+                                                 (seed, generation_num, i), self.target_conflicts,
+                                                 self.adaptive_mutation, island_stagnant[i], deadline)
+                            for i, members in enumerate(islands)
+                        ]
+                        finished = self._wait_for_islands(futures, cancel_event, pool.stop_flags, slot,
+                                                          deadline)
+                    if not finished:
+                        # Keep the previous epoch's populations rather than overrun the limit
+                        stop_reason = (STOP_CANCELLED if cancel_event is not None and cancel_event.is_set()
+                                       else STOP_TIME_LIMIT)
+                        break
+                    results = [future.result() for future in futures]
+                    islands = [members for members, _, _, _, _ in results]
+                    mutation_rates = [rate for _, _, rate, _, _ in results]
+                    island_stagnant = [count for _, _, _, count, _ in results]
+                    run = max(run for _, run, _, _, _ in results)
+                    generation_num += run
+                    evaluations += sum(count for _, _, _, _, count in results)
+                    
+                    best = self._best_schedules(data, islands)
+                    if best_fitness is None or best[0].get_fitness() > best_fitness:
+                        best_fitness = best[0].get_fitness()
+                        stagnant = 0
+                    else:
+                        stagnant += run
+                    stop_reason = reached_target(best[0].get_numb_of_conflicts(),
+                                                 best[0].get_soft_penalty(), self.target_conflicts)
+                    if stop_reason is None and cancel_event is not None and cancel_event.is_set():
+                        stop_reason = STOP_CANCELLED
+                    if stop_reason is None:
+                        stop_reason = self._epoch_stop_reason(generation_num, stagnant, deadline)
+                    if progress_callback is not None:
+                        now = time.perf_counter()
+                        if stop_reason is not None or now - last_report >= progress_interval:
+                            last_report = now
+                            progress_callback({
+                                'generation': generation_num,
+                                'best_fitness': best[0].get_fitness(),
+                                'mean_fitness': self._mean_fitness(islands),
+                                'conflicts': best[0].get_numb_of_conflicts(),
+                                'elapsed_ms': round((time.perf_counter() - started) * 1000, 3),
+                            })
+                    if stop_reason is not None:
+                        break
+                    with profiler.phase(PHASE_MIGRATION):
+                        self._migrate(islands)
+            except BrokenProcessPool:
+                # A worker died (e.g. killed for memory): the next run starts a fresh pool
+                _discard_island_pool(self.num_islands, pool)
+                raise
+            finally:
+                # Islands still busy (or not started) see the stop flag and return
+                pool.release_slot(slot, futures)
+            
+            if islands[0] is None:
+                # Stopped before the first epoch: nothing evolved yet, but the best of an
+                # island's initial population is still no worse than its warm start
+                population = Population(self.population_size, data, seeded=seeded, warm_start=warm_start,
+                                        rng=np.random.default_rng(seed))
+                best_schedule = population.evaluate().get_schedules()[0]
+                evaluations += population.evaluated
+            else:
+                best_schedule = self._best_schedules(data, islands)[0]
+            with profiler.phase(PHASE_SERIALIZATION):
+                rows = best_schedule.serialize()
+            
+            result = {
+                'schedule': rows,
+                'fitness': best_schedule.get_fitness(),
+                'conflicts': best_schedule.get_numb_of_conflicts(),
+                'generations': generation_num,
+                'cancelled': stop_reason == STOP_CANCELLED,
+                'seed': seed,
+                'stop_reason': stop_reason,
+                'timed_out': stop_reason == STOP_TIME_LIMIT,
+                'evaluations': evaluations,
+                **soft_constraint_report(best_schedule),
+            }
+            if profiler.enabled:
+                profiler.count('evaluations', evaluations)
+                result['profile'] = profiler.report()
+            return result
+        except Exception as e:
+            raise RoutineGenerationError(f"Error generating routine: {str(e)}")
+    
+    def _epoch_stop_reason(self, generation_num: int, stagnant: int,
+                           deadline: Optional[float]) -> Optional[str]:
+        """Termination criterion checked between epochs, if one is met."""
+        if generation_num >= self.max_generations:
+            return STOP_MAX_GENERATIONS
+        if self.stagnation_generations and stagnant >= self.stagnation_generations:
+            return STOP_STAGNATION
+        if deadline is not None and time.monotonic() >= deadline:
+            return STOP_TIME_LIMIT
+        return None
+    
+    @staticmethod
+    def _wait_for_islands(futures: List[Future], cancel_event: Any, stop_flags: Any, stop_slot: int,
+                          deadline: Optional[float]) -> bool:
+        """
+        Wait for an epoch of every island, telling them to stop once the run is cancelled.
+        
+        Returns:
+            False if islands are still busy STOP_GRACE_SECONDS after the
+            deadline or the cancel, True once every island returned
+        """
+        give_up = None if deadline is None else deadline + STOP_GRACE_SECONDS
+        cancelled = False
+        while wait(futures, timeout=CANCEL_POLL_INTERVAL).not_done:
+            if not cancelled and cancel_event is not None and cancel_event.is_set():
+                cancelled = True
+                stop_flags[stop_slot] = 1
+                give_up = min(give_up or float('inf'), time.monotonic() + STOP_GRACE_SECONDS)
+            if give_up is not None and time.monotonic() >= give_up:
+                stop_flags[stop_slot] = 1
+                return False
+        return True
+    
+    @staticmethod
+    def _best_schedules(data: Data, islands: List[List[Member]]) -> List[Schedule]:
+        """Best schedule of every island, best first (scored by the islands)."""
+        schedules = [_schedule_from_member(data, members[0]) for members in islands]
+        schedules.sort(key=lambda x: x.get_fitness(), reverse=True)
+        return schedules
+    
+    @staticmethod
+    def _mean_fitness(islands: List[List[Member]]) -> float:
+        """Mean fitness of every island's population."""
+        fitness = [fitness_of(conflicts, soft_penalty) for members in islands
+                   for _, conflicts, soft_penalty in members]
+        return sum(fitness) / len(fitness)
+    
+    def _migrate(self, islands: List[List[Member]]) -> None:
+        """Replace each island's worst schedules with the best of the previous island."""
+        if len(islands) < 2 or self.num_migrants == 0:
+            return
+        migrants = [members[:self.num_migrants] for members in islands]
+        for i, members in enumerate(islands):
+            members[-self.num_migrants:] = migrants[i - 1]
+    
+    def get_fitness(self, schedule: Schedule) -> float:
+        """Calculate fitness for a schedule."""
+        return schedule.get_fitness()
@@ -0,0 +1,124 @@
+"""
+Generation profiling.
+Opt-in per-phase wall times and counters of a generation run.
+"""
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Any, ContextManager, Dict, Iterator, Optional
+
+# Phases of a generation run, in report order
+PHASE_DB_LOAD = 'db_load'
+PHASE_INITIALIZATION = 'initialization'
+PHASE_EVALUATION = 'evaluation'
+PHASE_SELECTION = 'selection'  # Selection and variation (crossover, mutation)
+PHASE_ISLANDS = 'islands'  # Island epochs in worker processes (parallel genetic algorithm)
+PHASE_MIGRATION = 'migration'
+PHASE_SERIALIZATION = 'serialization'
+PHASES = (PHASE_DB_LOAD, PHASE_INITIALIZATION, PHASE_EVALUATION, PHASE_SELECTION,
+          PHASE_ISLANDS, PHASE_MIGRATION, PHASE_SERIALIZATION)
+
+
+class NullProfiler:
+    """
+    Profiler that records nothing.
+    
+    The default of instrumented code, so an unprofiled run pays one no-op
+    context manager per phase entry and nothing else.
+    """
+    
+    enabled = False
+    _context = nullcontext()
+    
+    def phase(self, name: str) -> ContextManager[None]:
+        """Context manager timing one entry into a phase."""
+        return self._context
+    
+    def count(self, name: str, value: int = 1) -> None:
+        """Add value to a counter."""
+    
+    def report(self) -> Optional[Dict[str, Any]]:
+        """Profile block of a generation result (None when not profiling)."""
+        return None
+    
+    def stop(self) -> None:
+        """Release resources held while profiling."""
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class GenerationProfiler(NullProfiler):
+    """
+    Per-phase wall times and counters of one generation run.
+    
+    A phase can be entered any number of times (evaluation and selection
+    once per generation); its time and entries add up. Phases must not
+    nest. With trace_allocations, tracemalloc also records the most memory
+    a phase allocated on top of what was live when it was entered. Tracing
+    is process-wide and slows Python-heavy phases down several times, so
+    it is a separate opt-in and its timings are not comparable to untraced
+    runs.
+    """
+    
+    enabled = True
+    
+    def __init__(self, trace_allocations: bool = False):
+        self.trace_allocations = trace_allocations
+        self._started = time.perf_counter()
+        self._seconds: Dict[str, float] = {}
+        self._entries: Dict[str, int] = {}
+        self._allocated: Dict[str, int] = {}
+        self._counters: Dict[str, int] = {}
+        self._owns_tracing = trace_allocations and not tracemalloc.is_tracing()
+        if self._owns_tracing:
+            tracemalloc.start()
+    
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Context manager timing one entry into a phase."""
+        if self.trace_allocations:
+            live = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._seconds[name] = self._seconds.get(name, 0.0) + time.perf_counter() - started
+            self._entries[name] = self._entries.get(name, 0) + 1
+            if self.trace_allocations:
+                allocated = max(tracemalloc.get_traced_memory()[1] - live, 0)
+                self._allocated[name] = max(self._allocated.get(name, 0), allocated)
+    
+    def count(self, name: str, value: int = 1) -> None:
+        """Add value to a counter."""
+        self._counters[name] = self._counters.get(name, 0) + value
+    
+    def report(self) -> Dict[str, Any]:
+        """
+        Profile block of a generation result.
+        
+        Returns:
+            Dictionary with total_ms, per phase its ms and entries (and
+            peak_allocated_kb when tracing allocations), other_ms not spent
+            in any phase, and the counters
+        """
+        total = time.perf_counter() - self._started
+        order = {name: i for i, name in enumerate(PHASES)}
+        phases = {}
+        for name in sorted(self._seconds, key=lambda name: order.get(name, len(PHASES))):
+            phases[name] = {'ms': round(self._seconds[name] * 1000, 3), 'entries': self._entries[name]}
+            if self.trace_allocations:
+                phases[name]['peak_allocated_kb'] = round(self._allocated[name] / 1024, 1)
+        return {
+            'total_ms': round(total * 1000, 3),
+            'phases': phases,
+            'other_ms': round(max(total - sum(self._seconds.values()), 0.0) * 1000, 3),
+            'counters': dict(self._counters),
+        }
+    
+    def stop(self) -> None:
+        """Stop allocation tracing if this profiler started it."""
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
@@ -0,0 +1,219 @@
+"""
+Repair strategy for routine generation.
+Re-solves only the classes affected by a data change, keeping the rest of a timetable.
+"""
+import random as rnd
+import time
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+from routine.strategies.base_strategy import (
+    BaseGenerationStrategy, STOP_SOLVED, STOP_TIME_LIMIT, STOP_MAX_GENERATIONS, STOP_CANCELLED
+)
+from routine.strategies.genetic_algorithm_strategy import (
+    Data, Schedule, decode_timetable, random_seed, NONE_INDEX
+)
+from core.exceptions import RoutineGenerationError, ValidationError
+
+
+# Repair Constants
+MAX_REPAIR_ROUNDS = 20
+
+
+class RepairStrategy(BaseGenerationStrategy):
+    """
+    Incremental repair strategy implementation.
+    Following Strategy Pattern - can be swapped with other strategies.
+    
+    Starts from an existing timetable (base) and frees only the classes that
+    have no usable assignment anymore (new classes, deleted rooms, meeting
+    times or instructors, instructors no longer teaching the course), that
+    use one of the changed entities, or that are in conflict. Every other
+    class is frozen. Free classes are then moved with min-conflicts steps:
+    each takes the meeting time, room and instructor with the lowest O(1)
+    conflict delta, keeping its current values on ties so the diff against
+    the base stays minimal. Classes that end up in conflict with a moved
+    class are freed for the next round, and the assignment with the fewest
+    conflicts over all rounds is returned.
+    """
+    
+    def __init__(self, max_rounds: int = MAX_REPAIR_ROUNDS, seed: Optional[int] = None,
+                 time_limit_seconds: Optional[float] = None, **kwargs):
+        """
+        Initialize strategy parameters.
+        
+        Args:
+            max_rounds: Maximum number of passes over the free classes
+            seed: Seed of the run's random generators (a fresh one if omitted)
+            time_limit_seconds: Wall-clock budget, checked once per round
+            **kwargs: Parameters of the genetic strategies, accepted and
+                ignored so strategies stay interchangeable
+        """
+        self.max_rounds = max_rounds
+        self.seed = seed
+        self.time_limit_seconds = time_limit_seconds
+    
+    def generate(self, **kwargs) -> Dict[str, Any]:
+        """
+        Repair a timetable.
+        
+        Args:
+            data: Preloaded Data snapshot (loaded from the database if omitted)
+            base: Timetable rows to repair (as in a generation result)
+            changed: Dict with optional 'rooms' (r_number), 'instructors'
+                (uid) and 'meeting_times' (pid) lists of changed entities
+            progress_callback: Called after every round with a dict of
+                generation, best_fitness, mean_fitness, conflicts and elapsed_ms
+            cancel_event: threading.Event; when set, repair stops after the
+                current round and cancelled=True is returned
+        
+        Returns:
+            Dictionary with generated schedule data, the seed the run used,
+            stop_reason, timed_out, evaluations (moves priced) and
+            changed_classes (number of classes whose assignment differs from
+            the base)
+        """
+        try:
+            data = kwargs.get('data')
+            if data is None:
+                data = Data()
+            base = kwargs.get('base')
+            if not base:
+                raise ValidationError("Repair needs a base timetable")
+            changed = kwargs.get('changed') or {}
+            progress_callback = kwargs.get('progress_callback')
+            cancel_event = kwargs.get('cancel_event')
+            seed = self.seed if self.seed is not None else random_seed()
+            random = rnd.Random(seed)
+            started = time.perf_counter()
+            
+            schedule = Schedule(data, np.random.default_rng(seed)).initialize()
+            decoded = decode_timetable(data, base)
+            missing = np.zeros(schedule.get_numb_of_classes(), dtype=bool)
+            free = np.zeros(schedule.get_numb_of_classes(), dtype=bool)
+            for genes, restored, entities, key, field in (
+                (schedule.meeting_time_idx, decoded[0], data.get_meetingTimes(), 'pid', 'meeting_times'),
+                (schedule.room_idx, decoded[1], data.get_rooms(), 'r_number', 'rooms'),
+                (schedule.instructor_idx, decoded[2], data.get_instructors(), 'uid', 'instructors'),
+            ):
+                if entities:
+                    missing |= restored == NONE_INDEX
+                np.copyto(genes, restored, where=restored != NONE_INDEX)
+                changed_keys = set(changed.get(field) or ())
+                changed_idx = [i for i, entity in enumerate(entities) if getattr(entity, key) in changed_keys]
+                free |= np.isin(genes, changed_idx)
+            schedule.genes_changed()
+            free |= missing | schedule.conflicting_genes()
+            base_genes = self._genes(schedule)
+            
+            rounds = 0
+            evaluations = 1  # the starting schedule
+            stop_reason = None
+            schedule.get_fitness()
+            best_conflicts = schedule.get_numb_of_conflicts()
+            best_genes = self._genes(schedule)
+            while rounds < self.max_rounds and best_conflicts > 0 and free.any():
+                if cancel_event is not None and cancel_event.is_set():
+                    stop_reason = STOP_CANCELLED
+                    break
+                if (self.time_limit_seconds is not None and
+                        time.perf_counter() - started >= self.time_limit_seconds):
+                    stop_reason = STOP_TIME_LIMIT
+                    break
+                rounds += 1
+                # Improving moves first, so sideways moves only hand on conflicts no class can remove
+                for index in np.flatnonzero(free).tolist():
+                    evaluations += self._move_to_best(schedule, data, index)
+                for index in np.flatnonzero(free & schedule.conflicting_genes()).tolist():
+                    evaluations += self._move_to_best(schedule, data, index, random)
+                schedule.get_fitness()
+                # Classes that now clash with a moved one join the search
+                free |= schedule.conflicting_genes()
+                if schedule.get_numb_of_conflicts() < best_conflicts:
+                    best_conflicts = schedule.get_numb_of_conflicts()
+                    best_genes = self._genes(schedule)
+                if progress_callback is not None:
+                    progress_callback({
+                        'generation': rounds,
+                        'best_fitness': 1 / (1.0 * best_conflicts + 1),
+                        'mean_fitness': schedule.get_fitness(),
+                        'conflicts': best_conflicts,
+                        'elapsed_ms': round((time.perf_counter() - started) * 1000, 3),
+                    })
+            
+            # Sideways moves that did not pay off are dropped with the rest of the round
+            schedule.meeting_time_idx, schedule.room_idx, schedule.instructor_idx = best_genes
+            schedule.genes_changed()
+            schedule.set_numb_of_conflicts(best_conflicts)
+            moved = np.zeros(schedule.get_numb_of_classes(), dtype=bool)
+            for genes, original in zip(best_genes, base_genes):
+                moved |= genes != original
+            
+            return {
+                'schedule': schedule.serialize(),
+                'fitness': schedule.get_fitness(),
+                'conflicts': schedule.get_numb_of_conflicts(),
+                'generations': rounds,
+                'cancelled': stop_reason == STOP_CANCELLED,
+                'stop_reason': stop_reason or (STOP_SOLVED if best_conflicts == 0 else STOP_MAX_GENERATIONS),
+                'timed_out': stop_reason == STOP_TIME_LIMIT,
+                'changed_classes': int((moved | missing).sum()),
+                'evaluations': evaluations,
+                'seed': seed,
+            }
+        except Exception as e:
+            raise RoutineGenerationError(f"Error repairing routine: {getattr(e, 'message', str(e))}")
+    
+    @staticmethod
+    def _move_to_best(schedule: Schedule, data: Data, index: int,
+                      sideways: Optional[rnd.Random] = None) -> int:
+        """
+        Give one class its lowest-conflict assignment.
+        
+        Room and instructor conflicts add up independently for a given meeting
+        time, so each meeting time costs one pass over the rooms and one over
+        the candidate instructors instead of their product; only rooms large
+        enough for the course are tried. A class in conflict with no
+        improving move takes an equal-cost one drawn from the sideways
+        generator instead, which hands the conflict to the class it
+        displaces so that class is freed in the next round. Returns the
+        number of moves priced.
+        """
+        template = data.get_gene_template()
+        offset = int(template.instructor_offsets[index])
+        instructors = template.instructor_candidates[
+            offset:offset + int(template.instructor_counts[index])].tolist()
+        rooms = (data.get_eligible_rooms(int(schedule.course_idx[index])).tolist() or
+                 data.get_rooms_by_capacity()[-1:].tolist() or [NONE_INDEX])
+        meeting_times = list(range(len(data.get_meetingTimes()))) or [NONE_INDEX]
+        current = (int(schedule.meeting_time_idx[index]), int(schedule.room_idx[index]),
+                   int(schedule.instructor_idx[index]))
+        
+        best_delta, best = 0, [current]
+        for meeting_time in meeting_times:
+            room = min(rooms, key=lambda r: (
+                schedule.move_delta(index, meeting_time, r, current[2]), r != current[1]))
+            instructor = min(instructors, key=lambda inst: (
+                schedule.move_delta(index, meeting_time, room, inst), inst != current[2]))
+            gene = (meeting_time, room, instructor)
+            delta = schedule.move_delta(index, *gene)
+            if delta < best_delta:
+                best_delta, best = delta, [gene]
+            elif delta == best_delta and gene != current:
+                best.append(gene)
+        if best_delta < 0:
+            schedule.set_gene(index, *best[0])
+        elif sideways is not None and len(best) > 1:
+            schedule.set_gene(index, *sideways.choice(best[1:]))
+        return len(meeting_times) * (len(rooms) + len(instructors) + 1)
+    
+    @staticmethod
+    def _genes(schedule: Schedule):
+        """Copy of the assignment arrays of a schedule."""
+        return (schedule.meeting_time_idx.copy(), schedule.room_idx.copy(),
+                schedule.instructor_idx.copy())
+    
+    def get_fitness(self, schedule: Schedule) -> float:
+        """Calculate fitness for a schedule."""
+        return schedule.get_fitness()
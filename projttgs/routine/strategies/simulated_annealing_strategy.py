@@ -0,0 +1,255 @@
+"""
+Simulated Annealing strategy for routine generation.
+Local search over single-gene moves, scored with O(1) conflict deltas.
+"""
+import math
+import random as rnd
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from routine.strategies.base_strategy import (
+    BaseGenerationStrategy, STOP_STAGNATION, STOP_TIME_LIMIT, STOP_MAX_GENERATIONS, STOP_CANCELLED
+)
+from routine.strategies.genetic_algorithm_strategy import (
+    Data, Schedule, random_seed, reached_target, soft_constraint_report
+)
+from routine.strategies.soft_constraints import build_soft_constraints
+from core.exceptions import RoutineGenerationError
+
+
+# Simulated Annealing Constants
+INITIAL_TEMPERATURE = 0.5
+COOLING_RATE = 0.97
+MIN_TEMPERATURE = 0.01
+
+# (index, meeting_time, room, instructor) of a class before an accepted move
+Move = Tuple[int, int, int, int]
+
+
+class SimulatedAnnealingStrategy(BaseGenerationStrategy):
+    """
+    Simulated Annealing strategy implementation.
+    Following Strategy Pattern - can be swapped with other strategies.
+    
+    Starts from one greedy-built (or warm-start) schedule and repeatedly
+    moves a single class to another meeting time, room or instructor. Each
+    move is scored with Schedule.move_delta in O(1); improving and equal
+    moves are always accepted, worsening moves with probability
+    exp(-delta / temperature). With soft constraints the delta includes the
+    weighted soft penalty, and the search only stops early once both
+    conflicts and penalty are zero (or target_conflicts is met). One
+    generation is a sweep of as many moves as there are classes, after
+    which the temperature is multiplied by cooling_rate. The best schedule
+    is kept as a log of the moves accepted since it was found, so an
+    improvement costs O(1) instead of a copy of every gene.
+    """
+    
+    def __init__(self, max_generations: int = 1000,
+                 initial_temperature: float = INITIAL_TEMPERATURE,
+                 cooling_rate: float = COOLING_RATE,
+                 seed: Optional[int] = None,
+                 target_conflicts: int = 0,
+                 stagnation_generations: Optional[int] = None,
+                 time_limit_seconds: Optional[float] = None,
+                 soft_constraints: Optional[Dict[str, Dict[str, Any]]] = None,
+                 **kwargs):
+        """
+        Initialize strategy parameters.
+        
+        Args:
+            max_generations: Maximum number of sweeps
+            initial_temperature: Starting temperature
+            cooling_rate: Temperature multiplier applied after every sweep
+            seed: Seed of the run's random generators (a fresh one if omitted)
+            target_conflicts: Stop once the best schedule has this few
+                conflicts (see reached_target)
+            stagnation_generations: Stop after this many sweeps without a
+                better schedule
+            time_limit_seconds: Wall-clock budget, checked once per sweep
+            soft_constraints: Soft constraint parameters by name (see
+                build_soft_constraints)
+            **kwargs: Population parameters of the genetic strategies
+                (population_size, mutation_rate, ...), accepted and ignored so
+                strategies stay interchangeable
+        """
+        self.max_generations = max_generations
+        self.initial_temperature = initial_temperature
+        self.cooling_rate = cooling_rate
+        self.seed = seed
+        self.target_conflicts = target_conflicts
+        self.stagnation_generations = stagnation_generations
+        self.time_limit_seconds = time_limit_seconds
+        self.soft_constraints = soft_constraints
+    
+    def generate(self, **kwargs) -> Dict[str, Any]:
+        """
+        Generate routine using simulated annealing.
+        
+        Args:
+            data: Preloaded Data snapshot (loaded from the database if omitted)
+            progress_callback: Called after sweeps with a dict of generation,
+                best_fitness, mean_fitness, conflicts and elapsed_ms
+            progress_interval: Minimum seconds between two progress_callback calls
+            cancel_event: threading.Event; when set, the search stops and the
+                best schedule so far is returned with cancelled=True
+            warm_start: Timetable rows of a previous schedule to start from
+                instead of a greedy one
+        
+        Returns:
+            Dictionary with generated schedule data, plus the seed the run
+            used, the stop_reason, timed_out and evaluations (moves priced);
+            with soft constraints also the best schedule's soft_penalty and
+            soft_violations per constraint
+        """
+        try:
+            data = kwargs.get('data')
+            if data is None:
+                data = Data()
+            soft_constraints = build_soft_constraints(self.soft_constraints)
+            if soft_constraints:
+                data = data.with_soft_constraints(soft_constraints)
+            progress_callback = kwargs.get('progress_callback')
+            progress_interval = kwargs.get('progress_interval') or 0.0
+            cancel_event = kwargs.get('cancel_event')
+            seed = self.seed if self.seed is not None else random_seed()
+            # Scalar draws in the move loop are much cheaper from random.Random
+            random = rnd.Random(seed)
+            started = time.perf_counter()
+            last_report = started
+            
+            warm_start = kwargs.get('warm_start')
+            if warm_start:
+                current = Schedule(data, np.random.default_rng(seed)).initialize_from(warm_start)
+            else:
+                current = Schedule(data, np.random.default_rng(seed)).initialize_greedy()
+            best_fitness = current.get_fitness()
+            best_conflicts = current.get_numb_of_conflicts()
+            best_penalty = current.get_soft_penalty()
+            n = current.get_numb_of_classes()
+            num_meeting_times = len(data.get_meetingTimes())
+            # Room moves stay among the rooms large enough for the class's course
+            rooms_by_capacity = data.get_rooms_by_capacity().tolist()
+            num_rooms = len(rooms_by_capacity)
+            first_room = np.minimum(data.get_first_eligible_room()[current.course_idx],
+                                    max(num_rooms - 1, 0)).tolist()
+            template = data.get_gene_template()
+            temperature = self.initial_temperature
+            
+            generation_num = 0
+            evaluations = 1  # the starting schedule
+            stagnant = 0
+            # The best schedule is current with the moves accepted since it undone; once
+            # that log outgrows a snapshot, the best is copied once and the log dropped
+            undo: List[Move] = []
+            best_genes = None
+            stop_reason = self._stop_reason(generation_num, best_conflicts, best_penalty, stagnant, started)
+            while stop_reason is None:
+                if cancel_event is not None and cancel_event.is_set():
+                    stop_reason = STOP_CANCELLED
+                    break
+                generation_num += 1
+                improved = False
+                
+                for move_num in range(1, n + 1):
+                    index = random.randrange(n)
+                    before = (index, int(current.meeting_time_idx[index]), int(current.room_idx[index]),
+                              int(current.instructor_idx[index]))
+                    _, meeting_time, room, instructor = before
+                    move = random.randrange(3)
+                    if move == 0 and num_meeting_times:
+                        meeting_time = random.randrange(num_meeting_times)
+                    elif move == 1 and num_rooms:
+                        room = rooms_by_capacity[random.randrange(first_room[index], num_rooms)]
+                    else:
+                        instructor = int(template.instructor_candidates[
+                            template.instructor_offsets[index] +
+                            random.randrange(template.instructor_counts[index])
+                        ])
+                    
+                    delta = current.move_delta(index, meeting_time, room, instructor)
+                    if delta <= 0 or random.random() < math.exp(-delta / temperature):
+                        current.set_gene(index, meeting_time, room, instructor)
+                        if current.get_fitness() > best_fitness:
+                            best_fitness = current.get_fitness()
+                            best_conflicts = current.get_numb_of_conflicts()
+                            best_penalty = current.get_soft_penalty()
+                            improved = True
+                            undo.clear()
+                            best_genes = None
+                            if reached_target(best_conflicts, best_penalty, self.target_conflicts) is not None:
+                                break
+                        elif best_genes is None:
+                            undo.append(before)
+                            if len(undo) > n:
+                                best_genes = self._undone_genes(current, undo)
+                                undo.clear()
+                evaluations += move_num if n else 0
+                
+                stagnant = 0 if improved else stagnant + 1
+                temperature = max(MIN_TEMPERATURE, temperature * self.cooling_rate)
+                stop_reason = self._stop_reason(generation_num, best_conflicts, best_penalty, stagnant, started)
+                if progress_callback is not None:
+                    now = time.perf_counter()
+                    if stop_reason is not None or now - last_report >= progress_interval:
+                        last_report = now
+                        progress_callback({
+                            'generation': generation_num,
+                            'best_fitness': best_fitness,
+                            'mean_fitness': current.get_fitness(),
+                            'conflicts': best_conflicts,
+                            'elapsed_ms': round((now - started) * 1000, 3),
+                        })
+            
+            best = current.copy()
+            best.meeting_time_idx, best.room_idx, best.instructor_idx = (
+                best_genes if best_genes is not None else self._undone_genes(current, undo)
+            )
+            best.genes_changed()
+            best.set_numb_of_conflicts(best_conflicts, best_penalty)
+            
+            return {
+                'schedule': best.serialize(),
+                'fitness': best.get_fitness(),
+                'conflicts': best.get_numb_of_conflicts(),
+                'generations': generation_num,
+                'cancelled': stop_reason == STOP_CANCELLED,
+                'seed': seed,
+                'stop_reason': stop_reason,
+                'timed_out': stop_reason == STOP_TIME_LIMIT,
+                'evaluations': evaluations,
+                **soft_constraint_report(best),
+            }
+        except Exception as e:
+            raise RoutineGenerationError(f"Error generating routine: {str(e)}")
+    
+    def _stop_reason(self, generation_num: int, conflicts: int, soft_penalty: float,
+                     stagnant: int, started: float) -> Optional[str]:
+        """Termination criterion met after generation_num sweeps, if any."""
+        reached = reached_target(conflicts, soft_penalty, self.target_conflicts)
+        if reached is not None:
+            return reached
+        if generation_num >= self.max_generations:
+            return STOP_MAX_GENERATIONS
+        if self.stagnation_generations and stagnant >= self.stagnation_generations:
+            return STOP_STAGNATION
+        if self.time_limit_seconds is not None and time.perf_counter() - started >= self.time_limit_seconds:
+            return STOP_TIME_LIMIT
+        return None
+    
+    @staticmethod
+    def _undone_genes(schedule: Schedule, undo: List[Move]):
+        """Copy of the assignment arrays of a schedule with the logged moves undone."""
+        meeting_time_idx, room_idx, instructor_idx = (
+            schedule.meeting_time_idx.copy(), schedule.room_idx.copy(), schedule.instructor_idx.copy()
+        )
+        for index, meeting_time, room, instructor in reversed(undo):
+            meeting_time_idx[index] = meeting_time
+            room_idx[index] = room
+            instructor_idx[index] = instructor
+        return meeting_time_idx, room_idx, instructor_idx
+    
+    def get_fitness(self, schedule: Schedule) -> float:
+        """Calculate fitness for a schedule."""
+        return schedule.get_fitness()
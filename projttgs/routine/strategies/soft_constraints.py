@@ -0,0 +1,427 @@
+"""
+Soft constraints for routine generation.
+Weighted preferences scored over the integer gene encoding, next to the hard conflicts.
+"""
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Optional, Tuple, Hashable, Type
+
+import numpy as np
+
+from routine.models import TIME_SLOTS, DAYS_OF_WEEK
+from core.exceptions import ValidationError
+
+
+# Soft constraint constants
+DEFAULT_SOFT_WEIGHT = 0.1
+MAX_CLASSES_PER_DAY = 4
+
+# Same sentinel as the gene encoding's NONE_INDEX
+_NONE = -1
+# Groups are counted with a dense bincount while there are at most this many
+# groups per class scored, and by sorting the keys beyond that
+DENSE_GROUPS_PER_CLASS = 8
+
+# (meeting_time, room, instructor, course, section) of one class
+Gene = Tuple[int, int, int, int, int]
+# (bucket key, item) a class falls into, or None when the constraint ignores it
+Bucket = Optional[Tuple[Hashable, int]]
+
+
+class SoftConstraint(ABC):
+    """
+    A weighted soft constraint over the gene encoding.
+    
+    Every constraint is written twice over the same bucket model: classes
+    fall into buckets (bucket()) and a bucket's violations only depend on
+    the items in it (cost()). violations() scores whole populations with a
+    handful of NumPy calls; SoftPenaltyCounter uses bucket() and cost() to
+    price single-class moves in O(1), like ConflictCounter does for
+    conflicts. compile() runs once per snapshot and turns entity attributes
+    into lookup arrays.
+    """
+    
+    name = ''
+    
+    def __init__(self, weight: float = DEFAULT_SOFT_WEIGHT):
+        if weight < 0:
+            raise ValidationError(f"Soft constraint {self.name} needs a non-negative weight")
+        self.weight = float(weight)
+        self.day_of: np.ndarray = np.empty(0, dtype=np.int64)
+        self.slot_of: np.ndarray = np.empty(0, dtype=np.int64)
+        self._days: List[int] = []
+        self._slots: List[int] = []
+    
+    def compile(self, data: Any) -> None:
+        """Resolve the day and time slot of every meeting time, once per snapshot."""
+        days = {day: i for i, (day, _) in enumerate(DAYS_OF_WEEK)}
+        slots = {slot: i for i, (slot, _) in enumerate(TIME_SLOTS)}
+        meeting_times = data.get_meetingTimes()
+        # A trailing entry maps NONE_INDEX (unassigned) to no day
+        self._days = [days.get(mt.day, _NONE) for mt in meeting_times] + [_NONE]
+        self._slots = [slots.get(mt.time, _NONE) for mt in meeting_times] + [_NONE]
+        self.day_of = np.array(self._days, dtype=np.int64)
+        self.slot_of = np.array(self._slots, dtype=np.int64)
+    
+    @abstractmethod
+    def violations(self, meeting_time_idx: np.ndarray, room_idx: np.ndarray,
+                   instructor_idx: np.ndarray, course_idx: np.ndarray, section_idx: np.ndarray,
+                   individual: np.ndarray, n_individuals: int) -> np.ndarray:
+        """Unweighted violations of many encoded schedules (as in _conflicts_per_individual)."""
+        pass
+    
+    @abstractmethod
+    def bucket(self, meeting_time: int, room: int, instructor: int, course: int, section: int) -> Bucket:
+        """Bucket key and item of one class."""
+        pass
+    
+    @abstractmethod
+    def cost(self, items: Dict[int, int]) -> float:
+        """Violations of one bucket, given how many of its classes hold each item."""
+        pass
+
+
+def _dense(num_groups: int, num_keys: int) -> bool:
+    return num_groups <= DENSE_GROUPS_PER_CLASS * max(num_keys, 1)
+
+
+def _group_counts(keys: np.ndarray, group_size: int, n_individuals: int, cost) -> np.ndarray:
+    """
+    Sum cost(counts) over the groups of equal keys, per individual
+    (keys // group_size). cost(0) must be 0.
+    """
+    if _dense(n_individuals * group_size, len(keys)):
+        counts = np.bincount(keys, minlength=n_individuals * group_size)
+        return cost(counts).reshape(n_individuals, group_size).sum(axis=1).astype(np.float64)
+    keys, counts = np.unique(keys, return_counts=True)
+    return np.bincount(keys // group_size, weights=cost(counts),
+                       minlength=n_individuals).astype(np.float64)
+
+
+class InstructorDailyLoad(SoftConstraint):
+    """An instructor teaches at most max_per_day classes a day; each extra class is a violation."""
+    
+    name = 'instructor_daily_load'
+    
+    def __init__(self, weight: float = DEFAULT_SOFT_WEIGHT, max_per_day: int = MAX_CLASSES_PER_DAY):
+        super().__init__(weight)
+        self.max_per_day = int(max_per_day)
+        self._num_instructors = 0
+    
+    def compile(self, data: Any) -> None:
+        super().compile(data)
+        self._num_instructors = len(data.get_instructors())
+    
+    def violations(self, meeting_time_idx, room_idx, instructor_idx, course_idx, section_idx,
+                   individual, n_individuals):
+        day = self.day_of[meeting_time_idx]
+        counted = (day != _NONE) & (instructor_idx != _NONE)
+        group_size = max(1, self._num_instructors * len(DAYS_OF_WEEK))
+        keys = individual * group_size + instructor_idx.astype(np.int64) * len(DAYS_OF_WEEK) + day
+        return _group_counts(keys[counted], group_size, n_individuals,
+                             lambda counts: np.maximum(counts - self.max_per_day, 0))
+    
+    def bucket(self, meeting_time, room, instructor, course, section):
+        day = self._days[meeting_time]
+        if day == _NONE or instructor == _NONE:
+            return None
+        return (instructor, day), 0
+    
+    def cost(self, items):
+        return max(items.get(0, 0) - self.max_per_day, 0)
+
+
+class SectionGaps(SoftConstraint):
+    """A section's classes on a day are back to back; every free slot between two classes is a violation."""
+    
+    name = 'section_gaps'
+    
+    def __init__(self, weight: float = DEFAULT_SOFT_WEIGHT):
+        super().__init__(weight)
+        self._num_sections = 0
+    
+    def compile(self, data: Any) -> None:
+        super().compile(data)
+        self._num_sections = len(data.get_section_ids())
+    
+    def violations(self, meeting_time_idx, room_idx, instructor_idx, course_idx, section_idx,
+                   individual, n_individuals):
+        day = self.day_of[meeting_time_idx]
+        slot = self.slot_of[meeting_time_idx]
+        counted = (day != _NONE) & (slot != _NONE)
+        group_size = max(1, self._num_sections * len(DAYS_OF_WEEK))
+        keys = ((individual * group_size + section_idx.astype(np.int64) * len(DAYS_OF_WEEK) + day)
+                * len(TIME_SLOTS) + slot)[counted]
+        if _dense(n_individuals * group_size * len(TIME_SLOTS), len(keys)):
+            # One row of occupied slots per (individual, section, day)
+            occupied = np.bincount(keys, minlength=n_individuals * group_size * len(TIME_SLOTS)).reshape(
+                n_individuals * group_size, len(TIME_SLOTS)) > 0
+            used = occupied.sum(axis=1)
+            first = occupied.argmax(axis=1)
+            last = len(TIME_SLOTS) - 1 - occupied[:, ::-1].argmax(axis=1)
+            gaps = np.where(used > 0, last - first + 1 - used, 0)
+            return gaps.reshape(n_individuals, group_size).sum(axis=1).astype(np.float64)
+        # Distinct occupied slots, sorted by (section day, slot)
+        occupied = np.unique(keys)
+        groups, first, counts = np.unique(occupied // len(TIME_SLOTS), return_index=True,
+                                          return_counts=True)
+        span = occupied[first + counts - 1] - occupied[first] + 1
+        return np.bincount(groups // group_size, weights=span - counts,
+                           minlength=n_individuals).astype(np.float64)
+    
+    def bucket(self, meeting_time, room, instructor, course, section):
+        day = self._days[meeting_time]
+        slot = self._slots[meeting_time]
+        if day == _NONE or slot == _NONE:
+            return None
+        return (section, day), slot
+    
+    def cost(self, items):
+        if not items:
+            return 0
+        return max(items) - min(items) + 1 - len(items)
+
+
+class PreferredTimes(SoftConstraint):
+    """Classes meet within the preferred time slots; each class outside them is a violation."""
+    
+    name = 'preferred_times'
+    
+    def __init__(self, weight: float = DEFAULT_SOFT_WEIGHT, times: Optional[List[str]] = None,
+                 days: Optional[List[str]] = None):
+        super().__init__(weight)
+        known_times = [slot for slot, _ in TIME_SLOTS]
+        known_days = [day for day, _ in DAYS_OF_WEEK]
+        for value, known in ((times, known_times), (days, known_days)):
+            unknown = set(value or ()) - set(known)
+            if unknown:
+                raise ValidationError(f"Unknown preferred value(s): {', '.join(sorted(unknown))}")
+        self.times = list(times) if times else known_times
+        self.days = list(days) if days else known_days
+        self._outside: List[bool] = []
+        self.outside = np.zeros(0, dtype=bool)
+    
+    def compile(self, data: Any) -> None:
+        super().compile(data)
+        times, days = set(self.times), set(self.days)
+        self._outside = [mt.time not in times or mt.day not in days
+                         for mt in data.get_meetingTimes()] + [False]
+        self.outside = np.array(self._outside, dtype=bool)
+    
+    def violations(self, meeting_time_idx, room_idx, instructor_idx, course_idx, section_idx,
+                   individual, n_individuals):
+        return np.bincount(individual[self.outside[meeting_time_idx]],
+                           minlength=n_individuals).astype(np.float64)
+    
+    def bucket(self, meeting_time, room, instructor, course, section):
+        if not self._outside[meeting_time]:
+            return None
+        return meeting_time, 0
+    
+    def cost(self, items):
+        return items.get(0, 0)
+
+
+class DaySpread(SoftConstraint):
+    """A section's classes of one course fall on different days; each pair sharing a day is a violation."""
+    
+    name = 'day_spread'
+    
+    def __init__(self, weight: float = DEFAULT_SOFT_WEIGHT):
+        super().__init__(weight)
+        self._num_sections = 0
+        self._num_courses = 0
+    
+    def compile(self, data: Any) -> None:
+        super().compile(data)
+        self._num_sections = len(data.get_section_ids())
+        self._num_courses = len(data.get_courses())
+    
+    def violations(self, meeting_time_idx, room_idx, instructor_idx, course_idx, section_idx,
+                   individual, n_individuals):
+        day = self.day_of[meeting_time_idx]
+        counted = day != _NONE
+        group_size = max(1, self._num_sections * self._num_courses * len(DAYS_OF_WEEK))
+        keys = (individual * group_size
+                + (section_idx.astype(np.int64) * self._num_courses + course_idx) * len(DAYS_OF_WEEK)
+                + day)
+        return _group_counts(keys[counted], group_size, n_individuals,
+                             lambda counts: counts * (counts - 1) // 2)
+    
+    def bucket(self, meeting_time, room, instructor, course, section):
+        day = self._days[meeting_time]
+        if day == _NONE:
+            return None
+        return (section, course, day), 0
+    
+    def cost(self, items):
+        count = items.get(0, 0)
+        return count * (count - 1) // 2
+
+
+# Registered soft constraints by name
+SOFT_CONSTRAINTS: Dict[str, Type[SoftConstraint]] = {
+    constraint.name: constraint
+    for constraint in (InstructorDailyLoad, SectionGaps, PreferredTimes, DaySpread)
+}
+
+
+def register_soft_constraint(constraint: Type[SoftConstraint]) -> Type[SoftConstraint]:
+    """Register a soft constraint class under its name (usable as a class decorator)."""
+    SOFT_CONSTRAINTS[constraint.name] = constraint
+    return constraint
+
+
+class SoftConstraints:
+    """
+    Weighted set of soft constraints compiled against one snapshot.
+    
+    The penalty of a schedule is the weighted sum of the violations of
+    every constraint; a weight of 1 makes a violation as bad as a hard
+    conflict.
+    """
+    
+    def __init__(self, constraints: List[SoftConstraint]):
+        self.constraints = list(constraints)
+    
+    def __bool__(self) -> bool:
+        return bool(self.constraints)
+    
+    def compile(self, data: Any) -> 'SoftConstraints':
+        for constraint in self.constraints:
+            constraint.compile(data)
+        return self
+    
+    def penalties(self, meeting_time_idx: np.ndarray, room_idx: np.ndarray,
+                  instructor_idx: np.ndarray, course_idx: np.ndarray, section_idx: np.ndarray,
+                  individual: np.ndarray, n_individuals: int) -> np.ndarray:
+        """Weighted penalty of many encoded schedules in one vectorized pass per constraint."""
+        penalties = np.zeros(n_individuals, dtype=np.float64)
+        if individual.size == 0:
+            return penalties
+        individual = individual.astype(np.int64)
+        for constraint in self.constraints:
+            penalties += constraint.weight * constraint.violations(
+                meeting_time_idx, room_idx, instructor_idx, course_idx, section_idx,
+                individual, n_individuals)
+        return penalties
+    
+    def breakdown(self, meeting_time_idx: np.ndarray, room_idx: np.ndarray,
+                  instructor_idx: np.ndarray, course_idx: np.ndarray,
+                  section_idx: np.ndarray) -> Dict[str, float]:
+        """Unweighted violations of one encoded schedule per constraint name."""
+        individual = np.zeros(len(course_idx), dtype=np.int64)
+        return {
+            constraint.name: float(constraint.violations(
+                meeting_time_idx, room_idx, instructor_idx, course_idx, section_idx,
+                individual, 1)[0])
+            for constraint in self.constraints
+        }
+
+
+class SoftPenaltyCounter:
+    """
+    Incrementally maintained soft penalty for single-gene edits.
+    
+    Keeps, per constraint, how many classes of every bucket hold each item;
+    adding, removing or pricing the move of a class only recomputes the cost
+    of the one or two buckets it leaves and joins. Violations are counted as
+    integers and only weighted when read, so the penalty does not drift.
+    """
+    
+    def __init__(self, soft_constraints: SoftConstraints):
+        self._constraints = soft_constraints.constraints
+        self._buckets: List[Dict[Hashable, Dict[int, int]]] = [{} for _ in self._constraints]
+        self._violations = [0] * len(self._constraints)
+    
+    @property
+    def penalty(self) -> float:
+        return float(sum(constraint.weight * violations
+                         for constraint, violations in zip(self._constraints, self._violations)))
+    
+    def _step(self, gene: Gene, step: int) -> None:
+        for i, (constraint, buckets) in enumerate(zip(self._constraints, self._buckets)):
+            bucket = constraint.bucket(*gene)
+            if bucket is None:
+                continue
+            key, item = bucket
+            items = buckets.setdefault(key, {})
+            before = constraint.cost(items)
+            count = items.get(item, 0) + step
+            if count:
+                items[item] = count
+            else:
+                del items[item]
+            self._violations[i] += constraint.cost(items) - before
+            if not items:
+                del buckets[key]
+    
+    def add(self, *gene: int) -> None:
+        """Add a class to the buckets it falls into."""
+        self._step(gene, 1)
+    
+    def remove(self, *gene: int) -> None:
+        """Remove a previously added class."""
+        self._step(gene, -1)
+    
+    def move_delta(self, old: Gene, new: Gene) -> float:
+        """Change in penalty if a counted class moved from old to new, without applying the move."""
+        delta = 0.0
+        for constraint, buckets in zip(self._constraints, self._buckets):
+            old_bucket = constraint.bucket(*old)
+            new_bucket = constraint.bucket(*new)
+            if old_bucket == new_bucket:
+                continue
+            moved: Dict[Hashable, Dict[int, int]] = {}
+            for bucket, step in ((old_bucket, -1), (new_bucket, 1)):
+                if bucket is None:
+                    continue
+                key, item = bucket
+                items = moved.setdefault(key, dict(buckets.get(key, {})))
+                count = items.get(item, 0) + step
+                if count:
+                    items[item] = count
+                else:
+                    del items[item]
+            delta += constraint.weight * sum(
+                constraint.cost(items) - constraint.cost(buckets.get(key, {}))
+                for key, items in moved.items()
+            )
+        return delta
+    
+    def copy(self) -> 'SoftPenaltyCounter':
+        """Return an independent copy of the bucket state."""
+        counter = SoftPenaltyCounter.__new__(SoftPenaltyCounter)
+        counter._constraints = self._constraints
+        counter._buckets = [{key: dict(items) for key, items in buckets.items()}
+                            for buckets in self._buckets]
+        counter._violations = list(self._violations)
+        return counter
+
+
+def build_soft_constraints(config: Optional[Dict[str, Dict[str, Any]]]) -> Optional[SoftConstraints]:
+    """
+    Build soft constraints from a request's configuration.
+    
+    Args:
+        config: Parameters (weight and constraint-specific ones) by
+            registered constraint name, e.g.
+            {'instructor_daily_load': {'weight': 0.5, 'max_per_day': 3}}
+    
+    Returns:
+        The constraints, or None when none are configured
+    
+    Raises:
+        ValidationError: If a name is not registered or its parameters are invalid
+    """
+    if not config:
+        return None
+    constraints = []
+    for name, params in config.items():
+        constraint = SOFT_CONSTRAINTS.get(name)
+        if constraint is None:
+            raise ValidationError(f"Unknown soft constraint: {name}")
+        try:
+            constraints.append(constraint(**(params or {})))
+        except (TypeError, ValueError) as e:
+            raise ValidationError(f"Invalid parameters for soft constraint {name}: {e}")
+    return SoftConstraints(constraints)
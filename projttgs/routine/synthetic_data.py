@@ -0,0 +1,180 @@
+"""
+Synthetic scheduling data.
+Builds reproducible problem instances of any size, for benchmarks and load tests.
+"""
+import random
+from datetime import datetime
+from typing import Any, Dict, List
+
+from bson import ObjectId
+
+from routine.models import (
+    Room, Instructor, MeetingTime, Course, Department, Section, TIME_SLOTS, DAYS_OF_WEEK
+)
+from routine.repositories.snapshot_repository import resolve_references
+from core.exceptions import ValidationError
+
+# Default instance size (a small faculty)
+DEPARTMENTS = 4
+SECTIONS_PER_DEPARTMENT = 5
+COURSES_PER_DEPARTMENT = 8
+CLASSES_PER_COURSE = 2
+ROOMS = 12
+INSTRUCTORS = 24
+DAYS = len(DAYS_OF_WEEK)
+SLOTS_PER_DAY = len(TIME_SLOTS)
+
+# Instance size arguments of the builders and their defaults
+SIZE_OPTIONS = {
+    'departments': DEPARTMENTS,
+    'sections_per_department': SECTIONS_PER_DEPARTMENT,
+    'courses_per_department': COURSES_PER_DEPARTMENT,
+    'classes_per_course': CLASSES_PER_COURSE,
+    'rooms': ROOMS,
+    'instructors': INSTRUCTORS,
+    'days': DAYS,
+    'slots_per_day': SLOTS_PER_DAY,
+}
+
+# Instance shape
+ROOM_CAPACITIES = (30, 40, 50, 60, 80, 120)
+CLASS_SIZES = (20, 25, 30, 40, 50, 60, 75)
+INSTRUCTORS_PER_COURSE = (1, 3)
+
+# Document class of every entity list, in insertion order (referenced documents first)
+SYNTHETIC_DOCUMENTS = {
+    'rooms': Room,
+    'meeting_times': MeetingTime,
+    'instructors': Instructor,
+    'courses': Course,
+    'depts': Department,
+    'sections': Section,
+}
+
+
+def _object_id(rng: random.Random) -> ObjectId:
+    """ObjectId drawn from the instance's generator, so ids are reproducible too."""
+    return ObjectId(rng.getrandbits(96).to_bytes(12, 'big'))
+
+
+def _check_identifier(document: type, field: str, longest: str) -> None:
+    """Raise ValidationError if the longest generated identifier does not fit its field."""
+    max_length = document._fields[field].max_length
+    if len(longest) > max_length:
+        raise ValidationError(
+            f"Instance too large: {document.__name__}.{field} '{longest}' exceeds {max_length} characters"
+        )
+
+
+def build_synthetic_records(departments: int = DEPARTMENTS,
+                            sections_per_department: int = SECTIONS_PER_DEPARTMENT,
+                            courses_per_department: int = COURSES_PER_DEPARTMENT,
+                            classes_per_course: int = CLASSES_PER_COURSE,
+                            rooms: int = ROOMS,
+                            instructors: int = INSTRUCTORS,
+                            days: int = DAYS,
+                            slots_per_day: int = SLOTS_PER_DAY,
+                            seed: int = 0) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Build a scheduling instance as raw MongoDB documents.
+    
+    Documents are plain dicts in their stored layout (as produced by
+    to_mongo()), with primary keys assigned up front so references are
+    plain ids: they can be written with insert_many directly, and building
+    them costs a fraction of constructing model instances. Every course is
+    taught by 1-3 instructors, every section takes each course of its
+    department classes_per_course times a week, and class sizes mostly fit
+    the larger rooms.
+    
+    Args:
+        departments: Number of departments
+        sections_per_department: Sections of every department
+        courses_per_department: Courses offered by every department
+        classes_per_course: Weekly classes of a course in a section
+        rooms: Number of rooms
+        instructors: Number of instructors
+        days: Teaching days per week (at most the model's days)
+        slots_per_day: Time slots per day (at most the model's slots)
+        seed: Seed of the generator; the same arguments build the same instance
+    
+    Returns:
+        Dictionary with rooms, meeting_times, instructors, courses, depts and
+        sections lists of documents
+    
+    Raises:
+        ValidationError: If generated identifiers exceed the model field lengths
+    """
+    _check_identifier(Room, 'r_number', f'R{rooms - 1}')
+    _check_identifier(Instructor, 'uid', f'I{instructors - 1}')
+    _check_identifier(Course, 'course_number', f'D{departments - 1}C{courses_per_department - 1}')
+    _check_identifier(Section, 'section_id', f'D{departments - 1}S{sections_per_department - 1}')
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    
+    room_docs = [
+        {'_id': _object_id(rng), 'r_number': f'R{i}', 'seating_capacity': rng.choice(ROOM_CAPACITIES),
+         'created_at': now, 'updated_at': now}
+        for i in range(rooms)
+    ]
+    instructor_docs = [
+        {'_id': _object_id(rng), 'uid': f'I{i}', 'name': f'Instructor {i}', 'created_at': now, 'updated_at': now}
+        for i in range(instructors)
+    ]
+    meeting_time_docs = [
+        {'_id': f'P{d}{s}', 'time': TIME_SLOTS[s][0], 'day': DAYS_OF_WEEK[d][0], 'created_at': now, 'updated_at': now}
+        for d in range(min(days, len(DAYS_OF_WEEK)))
+        for s in range(min(slots_per_day, len(TIME_SLOTS)))
+    ]
+    
+    course_docs = []
+    dept_docs = []
+    section_docs = []
+    for d in range(departments):
+        courses = []
+        for c in range(courses_per_department):
+            teaching = rng.sample(instructor_docs, min(rng.randint(*INSTRUCTORS_PER_COURSE), instructors))
+            courses.append({
+                '_id': f'D{d}C{c}', 'course_name': f'Course {c} of department {d}',
+                'max_numb_students': str(rng.choice(CLASS_SIZES)),
+                'instructors': [instructor['_id'] for instructor in teaching],
+                'created_at': now, 'updated_at': now,
+            })
+        dept = {'_id': _object_id(rng), 'dept_name': f'Department {d}',
+                'courses': [course['_id'] for course in courses], 'created_at': now, 'updated_at': now}
+        course_docs.extend(courses)
+        dept_docs.append(dept)
+        section_docs.extend(
+            {'_id': f'D{d}S{s}', 'department': dept['_id'],
+             'num_class_in_week': classes_per_course * courses_per_department,
+             'created_at': now, 'updated_at': now}
+            for s in range(sections_per_department)
+        )
+    
+    return {
+        'rooms': room_docs,
+        'meeting_times': meeting_time_docs,
+        'instructors': instructor_docs,
+        'courses': course_docs,
+        'depts': dept_docs,
+        'sections': section_docs,
+    }
+
+
+def build_synthetic_entities(seed: int = 0, **size: int) -> Dict[str, List[Any]]:
+    """
+    Build an unsaved scheduling instance as model instances.
+    
+    Args:
+        seed: Seed of the generator
+        **size: Instance size (see build_synthetic_records)
+    
+    Returns:
+        Dictionary with rooms, meeting_times, instructors, courses, depts and
+        sections lists with references resolved, shaped like
+        SnapshotRepository.load()
+    """
+    records = build_synthetic_records(seed=seed, **size)
+    return resolve_references({
+        name: [document._from_son(record, _auto_dereference=False) for record in records[name]]
+        for name, document in SYNTHETIC_DOCUMENTS.items()
+    })
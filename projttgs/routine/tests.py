@@ -1,4 +1,1229 @@
-from django.test import TestCase
+import json
+import pickle
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from io import StringIO
+from unittest import skipUnless
+from unittest.mock import patch
 
+import mongoengine
+import numpy as np
+from bson import ObjectId
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
 
-# Create your tests here.
+from routine.models import (
+    Room, Instructor, MeetingTime, Course, Department, Section, GenerationHistory, GenerationJob, DatasetVersion,
+    TIME_SLOTS
+)
+from routine.strategies.genetic_algorithm_strategy import (
+    Data, Schedule, count_conflicts, evaluate_population, GENE_DTYPE, NONE_INDEX
+)
+from routine.strategies.constraint_programming_strategy import ConstraintProgrammingStrategy, cp_model
+from routine.strategies.repair_strategy import RepairStrategy
+from routine.strategies.genetic_algorithm_strategy import (
+    GeneticAlgorithm, GeneticAlgorithmStrategy, MIN_MUTATION_RATE, MAX_MUTATION_RATE,
+    ADAPTIVE_MUTATION_PATIENCE
+)
+from routine.strategies.parallel_genetic_algorithm_strategy import (
+    ParallelGeneticAlgorithmStrategy, MAX_CONCURRENT_RUNS, _init_island, _evolve_island, _island_pools,
+    _schedule_from_member
+)
+from routine.strategies.simulated_annealing_strategy import SimulatedAnnealingStrategy
+from routine.strategies.profiling import GenerationProfiler
+from routine.strategies.soft_constraints import SoftConstraint, build_soft_constraints
+from routine.synthetic_data import build_synthetic_entities, build_synthetic_records, SYNTHETIC_DOCUMENTS
+from routine.services.routine_generation_service import RoutineGenerationService
+from routine.services.generation_job_service import GenerationJobService
+from routine.services.warm_start_service import WarmStartService
+from routine.repositories import SnapshotRepository, DatasetVersionRepository
+from routine.services.snapshot_cache_service import SnapshotCacheService, SNAPSHOT_DATASET
+from core.management.commands.benchmark_generation import run_benchmark
+from core.exceptions import NotFoundError, RoutineGenerationError, ValidationError
+
+try:
+    import mongomock
+except ImportError:  # Database-backed tests need an in-memory MongoDB
+    mongomock = None
+
+
+def pairwise_conflicts(classes):
+    """Reference O(n^2) conflict count over decoded classes."""
+    conflicts = 0
+    for i in range(len(classes)):
+        if classes[i]['room'] and classes[i]['course']:
+            try:
+                if classes[i]['room'].seating_capacity < int(classes[i]['course'].max_numb_students):
+                    conflicts += 1
+            except (ValueError, TypeError):
+                pass
+        for j in range(i + 1, len(classes)):
+            if (classes[i]['meeting_time'] == classes[j]['meeting_time'] and
+                classes[i]['id'] != classes[j]['id'] and
+                classes[i]['section'] == classes[j]['section']):
+                if classes[i]['room'] == classes[j]['room']:
+                    conflicts += 1
+                if classes[i]['instructor'] == classes[j]['instructor']:
+                    conflicts += 1
+    return conflicts
+
+
+def random_data(rng):
+    """Build a small entity pool so collisions are frequent."""
+    return Data(
+        rooms=[Room(id=ObjectId(), r_number=f'R{i}', seating_capacity=rng.choice([20, 40, 60]))
+               for i in range(3)],
+        meeting_times=[MeetingTime(pid=f'M{i}', day='Sunday') for i in range(4)],
+        instructors=[Instructor(id=ObjectId(), uid=f'I{i}', name=f'I{i}') for i in range(3)],
+        courses=[Course(course_number=f'C{i}', course_name=f'C{i}',
+                        max_numb_students=rng.choice(['25', '45', 'n/a'])) for i in range(3)],
+        depts=[],
+        sections=[],
+    )
+
+
+def random_schedule(rng, data, size):
+    """Build a schedule with random (possibly unassigned) genes over two sections."""
+    dept = Department(dept_name='CSE')
+    sections = [data.section_index(Section(section_id=s, department=dept)) for s in ('S1', 'S2')]
+    schedule = Schedule(data)
+    schedule.meeting_time_idx = np.array(
+        [rng.randrange(-1, len(data.get_meetingTimes())) for _ in range(size)], dtype=GENE_DTYPE)
+    schedule.room_idx = np.array(
+        [rng.randrange(-1, len(data.get_rooms())) for _ in range(size)], dtype=GENE_DTYPE)
+    schedule.instructor_idx = np.array(
+        [rng.randrange(-1, len(data.get_instructors())) for _ in range(size)], dtype=GENE_DTYPE)
+    schedule.course_idx = np.array(
+        [rng.randrange(len(data.get_courses())) for _ in range(size)], dtype=GENE_DTYPE)
+    schedule.section_idx = np.array([rng.choice(sections) for _ in range(size)], dtype=GENE_DTYPE)
+    return schedule
+
+
+def decode(schedule, data):
+    """Turn encoded genes back into the documents the original loop compared."""
+    def lookup(entities, index):
+        return entities[index] if index != NONE_INDEX else None
+    return [{
+        'id': i,
+        'meeting_time': lookup(data.get_meetingTimes(), int(schedule.meeting_time_idx[i])),
+        'room': lookup(data.get_rooms(), int(schedule.room_idx[i])),
+        'instructor': lookup(data.get_instructors(), int(schedule.instructor_idx[i])),
+        'course': data.get_courses()[int(schedule.course_idx[i])],
+        'section': data.get_section_ids()[int(schedule.section_idx[i])],
+    } for i in range(schedule.get_numb_of_classes())]
+
+
+@skipUnless(mongomock, 'mongomock is not installed')
+class MongoTestCase(SimpleTestCase):
+    """Test case whose default mongoengine connection is an empty in-memory MongoDB."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        mongoengine.disconnect()
+        mongoengine.connect('routine_tests', mongo_client_class=mongomock.MongoClient)
+
+    @classmethod
+    def tearDownClass(cls):
+        mongoengine.disconnect()
+        super().tearDownClass()
+
+    def setUp(self):
+        for document in (*SYNTHETIC_DOCUMENTS.values(), GenerationHistory, GenerationJob, DatasetVersion):
+            document.drop_collection()
+
+    def insert_synthetic(self, **size):
+        """Store a synthetic instance, returning its raw records."""
+        records = build_synthetic_records(**size)
+        for name, document in SYNTHETIC_DOCUMENTS.items():
+            document._get_collection().insert_many(records[name])
+        return records
+
+
+class ConflictCountingTests(SimpleTestCase):
+    """Parity between the encoded conflict counters and the pairwise loop."""
+
+    def test_matches_pairwise_count_on_random_schedules(self):
+        rng = random.Random(1234)
+        for _ in range(200):
+            data = random_data(rng)
+            schedule = random_schedule(rng, data, rng.randrange(0, 40))
+            self.assertEqual(
+                count_conflicts(data, schedule.meeting_time_idx, schedule.room_idx,
+                                schedule.instructor_idx, schedule.course_idx, schedule.section_idx),
+                pairwise_conflicts(decode(schedule, data))
+            )
+
+    def test_delta_updates_match_full_recount(self):
+        rng = random.Random(99)
+        for _ in range(50):
+            data = random_data(rng)
+            schedule = random_schedule(rng, data, 30)
+            schedule.get_fitness()
+            child = schedule.copy()
+            for _ in range(10):
+                child.set_gene(rng.randrange(30), rng.randrange(-1, 4), rng.randrange(-1, 3),
+                               rng.randrange(-1, 3))
+            child.get_fitness()
+            self.assertEqual(child.get_numb_of_conflicts(), pairwise_conflicts(decode(child, data)))
+            self.assertEqual(schedule.calculate_fitness(), schedule.get_fitness())
+            self.assertEqual(schedule.get_numb_of_conflicts(), pairwise_conflicts(decode(schedule, data)))
+
+    def test_move_delta_matches_applied_move(self):
+        rng = random.Random(42)
+        for _ in range(50):
+            data = random_data(rng)
+            schedule = random_schedule(rng, data, 30)
+            for _ in range(20):
+                index = rng.randrange(30)
+                gene = (rng.randrange(-1, 4), rng.randrange(-1, 3), rng.randrange(-1, 3))
+                before = pairwise_conflicts(decode(schedule, data))
+                delta = schedule.move_delta(index, *gene)
+                schedule.set_gene(index, *gene)
+                self.assertEqual(pairwise_conflicts(decode(schedule, data)) - before, delta)
+
+    def test_conflicting_genes_marks_classes_in_a_conflict(self):
+        rng = random.Random(5)
+        for _ in range(50):
+            data = random_data(rng)
+            schedule = random_schedule(rng, data, rng.randrange(0, 30))
+            classes = decode(schedule, data)
+            expected = [pairwise_conflicts([c]) > 0 or any(
+                pairwise_conflicts([c, other]) > pairwise_conflicts([other])
+                for other in classes if other is not c
+            ) for c in classes]
+            self.assertEqual(schedule.conflicting_genes().tolist(), expected)
+
+    def test_population_evaluation_matches_single_schedules(self):
+        rng = random.Random(7)
+        data = random_data(rng)
+        schedules = [random_schedule(rng, data, rng.randrange(0, 40)) for _ in range(25)]
+        evaluate_population(data, schedules)
+        for schedule in schedules:
+            self.assertEqual(schedule.get_numb_of_conflicts(), pairwise_conflicts(decode(schedule, data)))
+
+
+class GeneTemplateTests(SimpleTestCase):
+    """Schedules are built from the template without database access."""
+
+    def test_initialize_uses_resolved_template(self):
+        rng = random.Random(5)
+        instructors = [Instructor(id=ObjectId(), uid=f'I{i}', name=f'I{i}') for i in range(4)]
+        courses = [
+            Course(course_number='C0', course_name='C0', max_numb_students='30',
+                   instructors=instructors[:2]),
+            Course(course_number='C1', course_name='C1', max_numb_students='30',
+                   instructors=instructors[2:3]),
+            Course(course_number='C2', course_name='C2', max_numb_students='30', instructors=[]),
+        ]
+        dept = Department(id=ObjectId(), dept_name='CSE', courses=courses)
+        sections = [Section(section_id=f'S{i}', department=dept, num_class_in_week=6) for i in range(2)]
+        data = Data(rooms=random_data(rng).get_rooms(), meeting_times=[], instructors=instructors,
+                    courses=courses, depts=[dept], sections=sections)
+
+        schedule = Schedule(data).initialize()
+
+        # 6 weekly classes split over 3 courses, the instructor-less course is skipped.
+        self.assertEqual(schedule.get_numb_of_classes(), 8)
+        self.assertTrue((schedule.meeting_time_idx == NONE_INDEX).all())
+        for course, instructor in zip(schedule.course_idx.tolist(), schedule.instructor_idx.tolist()):
+            self.assertIn(data.get_instructors()[instructor], courses[course].instructors)
+        self.assertIs(Schedule(data).initialize().course_idx, schedule.course_idx)
+
+    def test_warm_start_restores_previous_timetable(self):
+        data = section_data(3, [30, 60], [('20', ['A', 'B']), ('50', ['B']), ('20', ['A'])])
+        previous = Schedule(data).initialize()
+        rows = previous.serialize()
+
+        restored = Schedule(data).initialize_from(rows)
+        for genes in ('meeting_time_idx', 'room_idx', 'instructor_idx'):
+            self.assertEqual(getattr(restored, genes).tolist(), getattr(previous, genes).tolist())
+
+        # A room that no longer exists is redrawn, everything else is kept
+        rows[0]['room_number'] = 'gone'
+        restored = Schedule(data).initialize_from(rows)
+        self.assertEqual(restored.meeting_time_idx.tolist(), previous.meeting_time_idx.tolist())
+        self.assertEqual(restored.room_idx.tolist()[1:], previous.room_idx.tolist()[1:])
+
+    def test_greedy_constructor_avoids_conflicts_when_possible(self):
+        rooms = [Room(id=ObjectId(), r_number=f'R{i}', seating_capacity=capacity)
+                 for i, capacity in enumerate([60, 20, 40])]
+        instructors = [Instructor(id=ObjectId(), uid=f'I{i}', name=f'I{i}') for i in range(3)]
+        courses = [Course(id=ObjectId(), course_number=f'C{i}', course_name=f'C{i}',
+                          max_numb_students=students, instructors=instructors[i:i + 1])
+                   for i, students in enumerate(['35', '50', '10'])]
+        dept = Department(id=ObjectId(), dept_name='CSE', courses=courses)
+        sections = [Section(section_id=f'S{i}', department=dept, num_class_in_week=6) for i in range(3)]
+        data = Data(rooms=rooms, meeting_times=[MeetingTime(pid=f'M{i}') for i in range(3)],
+                    instructors=instructors, courses=courses, depts=[dept], sections=sections)
+
+        schedule = Schedule(data).initialize_greedy(randomness=0.0)
+
+        self.assertEqual(schedule.calculate_fitness(), 1.0)
+        self.assertEqual(pairwise_conflicts(decode(schedule, data)), 0)
+        # Smallest room that fits: 40 seats for 35 students, 60 for 50, 20 for 10
+        fitted = {course: rooms[room].seating_capacity
+                  for course, room in zip(schedule.course_idx.tolist(), schedule.room_idx.tolist())}
+        self.assertEqual(fitted, {0: 40, 1: 60, 2: 20})
+
+
+def reference_soft_violations(classes, max_per_day, preferred):
+    """Reference soft-constraint violations over decoded classes, with plain dicts."""
+    slots = [slot for slot, _ in TIME_SLOTS]
+    loads, days, spread = Counter(), {}, Counter()
+    outside = 0
+    for c in classes:
+        mt = c['meeting_time']
+        if mt is None:
+            continue
+        outside += mt.time not in preferred
+        if c['instructor'] is not None:
+            loads[c['instructor'].uid, mt.day] += 1
+        days.setdefault((c['section'], mt.day), set()).add(slots.index(mt.time))
+        spread[c['section'], c['course'].course_number, mt.day] += 1
+    return {
+        'instructor_daily_load': sum(max(0, n - max_per_day) for n in loads.values()),
+        'section_gaps': sum(max(used) - min(used) + 1 - len(used) for used in days.values()),
+        'preferred_times': outside,
+        'day_spread': sum(n * (n - 1) // 2 for n in spread.values()),
+    }
+
+
+class SoftConstraintTests(SimpleTestCase):
+    """Vectorized and incremental soft-constraint scoring agree with a plain loop."""
+
+    config = {
+        'instructor_daily_load': {'weight': 0.5, 'max_per_day': 2},
+        'section_gaps': {'weight': 0.25},
+        'preferred_times': {'weight': 1, 'times': ['9:00 - 10:00', '10:00 - 11:00']},
+        'day_spread': {},
+    }
+
+    def soft_data(self, rng):
+        data = random_data(rng)
+        meeting_times = [MeetingTime(pid=f'M{day}{slot}', day=day, time=TIME_SLOTS[slot][0])
+                         for day in ('Sunday', 'Monday') for slot in (0, 1, 3)]
+        data = Data(rooms=data.get_rooms(), meeting_times=meeting_times,
+                    instructors=data.get_instructors(), courses=data.get_courses(), depts=[], sections=[])
+        genes = random_schedule(rng, data, 30)
+        data = data.with_soft_constraints(build_soft_constraints(self.config))
+        schedule = Schedule(data)
+        for name in ('meeting_time_idx', 'room_idx', 'instructor_idx', 'course_idx', 'section_idx'):
+            setattr(schedule, name, getattr(genes, name))
+        return data, schedule
+
+    def expected_penalty(self, schedule, data):
+        violations = reference_soft_violations(decode(schedule, data), 2, self.config['preferred_times']['times'])
+        weights = {constraint.name: constraint.weight for constraint in data.get_soft_constraints().constraints}
+        return violations, sum(weights[name] * count for name, count in violations.items())
+
+    def test_vectorized_and_incremental_penalties_match_reference(self):
+        rng = random.Random(21)
+        for _ in range(50):
+            data, schedule = self.soft_data(rng)
+            violations, penalty = self.expected_penalty(schedule, data)
+            evaluate_population(data, [schedule])
+            self.assertAlmostEqual(schedule.get_soft_penalty(), penalty)
+            self.assertEqual(data.get_soft_constraints().breakdown(
+                schedule.meeting_time_idx, schedule.room_idx, schedule.instructor_idx,
+                schedule.course_idx, schedule.section_idx), violations)
+
+            for _ in range(10):
+                index = rng.randrange(30)
+                gene = (rng.randrange(-1, 6), rng.randrange(-1, 3), rng.randrange(-1, 3))
+                before = schedule.get_numb_of_conflicts() + schedule.get_soft_penalty()
+                delta = schedule.move_delta(index, *gene)
+                schedule.set_gene(index, *gene)
+                schedule.get_fitness()
+                self.assertAlmostEqual(schedule.get_numb_of_conflicts() + schedule.get_soft_penalty() - before,
+                                       delta)
+            self.assertAlmostEqual(schedule.get_soft_penalty(), self.expected_penalty(schedule, data)[1])
+
+    def test_sorted_and_dense_grouping_agree(self):
+        rng = random.Random(8)
+        for _ in range(20):
+            data, schedule = self.soft_data(rng)
+            genes = (schedule.meeting_time_idx, schedule.room_idx, schedule.instructor_idx,
+                     schedule.course_idx, schedule.section_idx)
+            dense = data.get_soft_constraints().breakdown(*genes)
+            with patch('routine.strategies.soft_constraints.DENSE_GROUPS_PER_CLASS', 0):
+                self.assertEqual(data.get_soft_constraints().breakdown(*genes), dense)
+
+    def test_strategies_report_soft_penalty(self):
+        data = section_data(3, [30, 60], [('20', ['A', 'B']), ('50', ['B'])])
+        for strategy in (GeneticAlgorithmStrategy(max_generations=20, seed=1, soft_constraints=self.config),
+                         SimulatedAnnealingStrategy(max_generations=20, seed=1, soft_constraints=self.config)):
+            result = strategy.generate(data=data)
+            self.assertEqual(set(result['soft_violations']), set(self.config))
+            self.assertAlmostEqual(result['fitness'], 1 / (1 + result['conflicts'] + result['soft_penalty']))
+        self.assertNotIn('soft_penalty', GeneticAlgorithmStrategy(max_generations=1, seed=1).generate(data=data))
+
+    def test_unknown_constraints_and_parameters_are_rejected(self):
+        for config in ({'lunch_break': {}}, {'day_spread': {'max_per_day': 2}},
+                       {'preferred_times': {'times': ['8:00 - 9:00']}}, {'section_gaps': {'weight': -1}}):
+            with self.assertRaises(ValidationError):
+                build_soft_constraints(config)
+        self.assertIsNone(build_soft_constraints({}))
+
+    def test_incomplete_constraint_cannot_be_instantiated(self):
+        class VectorizedOnly(SoftConstraint):
+            name = 'vectorized_only'
+
+            def violations(self, *genes):
+                return np.zeros(genes[-1])
+
+        with self.assertRaises(TypeError):
+            VectorizedOnly()
+
+
+class RoomEligibilityTests(SimpleTestCase):
+    """Rooms are drawn only among those large enough for the course."""
+
+    def test_eligible_rooms_are_sorted_and_fit(self):
+        data = section_data(2, [60, 20, 40, 'n/a'], [('30', ['A']), ('50', ['A']), ('99', ['A'])])
+        capacities = data.get_room_capacities()
+        self.assertEqual(capacities[data.get_rooms_by_capacity()].tolist(), sorted(capacities.tolist()))
+        self.assertEqual(sorted(data.get_eligible_rooms(0).tolist()), [0, 2, 3])
+        self.assertEqual(sorted(data.get_eligible_rooms(1).tolist()), [0, 3])
+        self.assertEqual(data.get_eligible_rooms(2).tolist(), [3])
+
+    def test_initialization_and_mutation_draw_fitting_rooms(self):
+        data = section_data(4, [20, 60, 40], [('30', ['A']), ('50', ['B']), ('10', ['C']), ('99', ['C'])])
+        rng = np.random.default_rng(3)
+        for _ in range(20):
+            schedule = Schedule(data, rng).initialize()
+            GeneticAlgorithm(mutation_rate=1.0, rng=rng)._mutate_schedule(schedule, data)
+            fits = (data.get_room_capacities()[schedule.room_idx]
+                    >= data.get_course_max_students()[schedule.course_idx])
+            # Only the course no room seats gets the largest one
+            self.assertEqual(fits.tolist(), [True, True, True, False])
+            self.assertEqual(int(schedule.room_idx[3]), 1)
+
+
+def section_data(num_meeting_times, capacities, course_specs):
+    """One section whose department offers one class per (max_numb_students, instructors) spec."""
+    instructors = {}
+    courses = []
+    for i, (students, uids) in enumerate(course_specs):
+        for uid in uids:
+            instructors.setdefault(uid, Instructor(id=ObjectId(), uid=uid, name=uid))
+        courses.append(Course(id=ObjectId(), course_number=f'C{i}', course_name=f'C{i}',
+                              max_numb_students=students,
+                              instructors=[instructors[uid] for uid in uids]))
+    dept = Department(id=ObjectId(), dept_name='CSE', courses=courses)
+    return Data(
+        rooms=[Room(id=ObjectId(), r_number=f'R{i}', seating_capacity=capacity)
+               for i, capacity in enumerate(capacities)],
+        meeting_times=[MeetingTime(id=ObjectId(), pid=f'M{i}') for i in range(num_meeting_times)],
+        instructors=list(instructors.values()), courses=courses, depts=[dept],
+        sections=[Section(section_id='S1', department=dept, num_class_in_week=len(courses))],
+    )
+
+
+class ConstraintProgrammingTests(SimpleTestCase):
+    """The backtracking solver finds conflict-free schedules or proves there are none."""
+
+    def solve(self, data):
+        return ConstraintProgrammingStrategy(use_cp_sat=False).generate(data=data)
+
+    def test_finds_conflict_free_schedule(self):
+        data = section_data(2, [30, 60], [('50', ['A']), ('50', ['A', 'B']), ('20', ['B']),
+                                          ('20', ['A', 'B'])])
+        result = self.solve(data)
+        self.assertEqual(result['conflicts'], 0)
+        self.assertEqual(result['infeasible_sections'], [])
+
+    def test_counting_bound_rejects_without_search(self):
+        # Three classes need the single 60-seat room but there are two meeting times
+        data = section_data(2, [30, 60], [('50', ['A']), ('50', ['B']), ('50', ['C'])])
+        result = self.solve(data)
+        self.assertEqual(len(result['infeasible_sections']), 1)
+        self.assertIn('room slots', result['infeasible_sections'][0]['reason'])
+
+    def test_search_proves_infeasibility(self):
+        # Counting bounds pass, but three classes share the two instructors A and B
+        data = section_data(1, [30, 30, 30, 30], [('10', ['A', 'B'])] * 3 + [('10', ['C', 'D'])])
+        result = self.solve(data)
+        self.assertEqual(result['infeasible_sections'],
+                         [{'section': 'S1', 'reason': 'no conflict-free assignment exists'}])
+        self.assertGreater(result['conflicts'], 0)
+
+    def test_result_reports_the_progress_counter(self):
+        data = section_data(2, [30, 60], [('50', ['A']), ('20', ['B'])])
+        progress = []
+        result = ConstraintProgrammingStrategy(use_cp_sat=False, seed=3).generate(
+            data=data, progress_callback=progress.append)
+        self.assertEqual(result['generations'], progress[-1]['generation'])
+        self.assertEqual((result['generations'], result['seed'], result['evaluations']), (1, 3, 1))
+
+    def test_unsolved_sections_are_reproducible(self):
+        data = Data(**build_synthetic_entities(seed=7, departments=1, courses_per_department=4,
+                                               rooms=2, days=1, slots_per_day=3))
+        first = ConstraintProgrammingStrategy(use_cp_sat=False, seed=7).generate(data=data)
+        again = ConstraintProgrammingStrategy(use_cp_sat=False, seed=7).generate(data=data)
+        self.assertTrue(first['infeasible_sections'])
+        self.assertEqual(again['schedule'], first['schedule'])
+        self.assertEqual(again['conflicts'], first['conflicts'])
+
+    @skipUnless(cp_model, 'OR-Tools is not installed')
+    def test_cp_sat_solves_and_proves_infeasibility(self):
+        data = section_data(2, [30, 60], [('50', ['A']), ('50', ['A', 'B']), ('20', ['B']),
+                                          ('20', ['A', 'B'])])
+        result = ConstraintProgrammingStrategy().generate(data=data)
+        self.assertEqual((result['conflicts'], result['infeasible_sections']), (0, []))
+        # Counting bounds pass, but three classes share the two instructors A and B
+        data = section_data(1, [30, 30, 30, 30], [('10', ['A', 'B'])] * 3 + [('10', ['C', 'D'])])
+        result = ConstraintProgrammingStrategy().generate(data=data)
+        self.assertEqual(result['infeasible_sections'],
+                         [{'section': 'S1', 'reason': 'no conflict-free assignment exists'}])
+
+
+class RepairTests(SimpleTestCase):
+    """Repair re-solves the classes a change affects and keeps the rest."""
+
+    specs = [('20', ['A']), ('20', ['B']), ('50', ['A']), ('20', ['B', 'C'])]
+
+    def repair(self, num_meeting_times):
+        base = ConstraintProgrammingStrategy(use_cp_sat=False).generate(
+            data=section_data(num_meeting_times, [30, 60, 60], self.specs))['schedule']
+        # R1 shrinks below the 50 students of C2, which the solver placed there
+        data = section_data(num_meeting_times, [30, 30, 60], self.specs)
+        result = RepairStrategy().generate(data=data, base=base, changed={'rooms': ['R1']})
+
+        def assignment(row):
+            return row['course_number'], row['meeting_time_id'], row['room_number'], row['instructor_uid']
+        before = [assignment(row) for row in base]
+        after = [assignment(row) for row in result['schedule']]
+        self.assertEqual(before[2][2], 'R1')
+        self.assertEqual(result['conflicts'], 0)
+        self.assertEqual(pairwise_conflicts(decode(Schedule(data).initialize_from(result['schedule']), data)), 0)
+        self.assertEqual(result['changed_classes'], sum(old != new for old, new in zip(before, after)))
+        return before, after, result
+
+    def test_repair_moves_only_affected_classes(self):
+        before, after, result = self.repair(3)
+        self.assertEqual(result['changed_classes'], 1)
+        self.assertEqual(after[2][2], 'R2')
+        self.assertEqual(before[:2] + before[3:], after[:2] + after[3:])
+
+    def test_repair_displaces_frozen_classes_when_needed(self):
+        # C2 needs R2, which C3 holds while A teaches C0 at the other meeting time
+        before, after, result = self.repair(2)
+        self.assertEqual(result['changed_classes'], 2)
+
+    def test_repair_needs_a_base(self):
+        data = section_data(1, [30], [('20', ['A'])])
+        with self.assertRaises(RoutineGenerationError):
+            RepairStrategy().generate(data=data, base=[])
+
+
+class SeedTests(SimpleTestCase):
+    """A seed and the data fully determine a run."""
+
+    def test_same_seed_reproduces_run(self):
+        data = section_data(2, [20, 40, 60], [('25', ['A', 'B']), ('45', ['A']), ('10', ['B', 'C']),
+                                              ('45', ['C']), ('25', ['A', 'C'])])
+        for strategy in (GeneticAlgorithmStrategy(max_generations=30, greedy_seed_ratio=0.0, seed=11),
+                         SimulatedAnnealingStrategy(max_generations=30, seed=11)):
+            first = strategy.generate(data=data)
+            second = strategy.generate(data=data)
+            self.assertEqual(first['seed'], 11)
+            self.assertEqual(first['schedule'], second['schedule'])
+            self.assertEqual(first['generations'], second['generations'])
+
+    def test_unseeded_run_reports_its_seed(self):
+        data = section_data(2, [30], [('20', ['A']), ('20', ['B'])])
+        first = GeneticAlgorithmStrategy(max_generations=5).generate(data=data)
+        second = GeneticAlgorithmStrategy(max_generations=5, seed=first['seed']).generate(data=data)
+        self.assertEqual(first['schedule'], second['schedule'])
+
+
+class ProfilingTests(SimpleTestCase):
+    """Opt-in phase timings and counters of a generation run."""
+
+    class CachedSnapshot:
+        """Snapshot cache double that always hits."""
+
+        def __init__(self, data):
+            self.data = data
+            self.last_load_stats = {}
+
+        def get_data(self):
+            return self.data
+
+    def setUp(self):
+        self.data = section_data(3, [20, 40, 60], [('25', ['A', 'B']), ('45', ['A']), ('10', ['B', 'C']),
+                                                   ('45', ['C']), ('25', ['A', 'C'])])
+
+    def test_strategy_reports_phases_and_counters(self):
+        # One room and meeting time for two classes: never solved, so every generation runs
+        data = section_data(1, [30], [('20', ['A']), ('20', ['B'])])
+        strategy = GeneticAlgorithmStrategy(max_generations=8, seed=2)
+        self.assertNotIn('profile', strategy.generate(data=data))
+
+        result = strategy.generate(data=data, profiler=GenerationProfiler())
+        self.assertEqual(result['generations'], 8)
+        profile = result['profile']
+        self.assertEqual(list(profile['phases']), ['initialization', 'evaluation', 'selection', 'serialization'])
+        self.assertEqual(profile['phases']['selection']['entries'], result['generations'])
+        self.assertEqual(profile['phases']['evaluation']['entries'], result['generations'] + 1)
+        self.assertEqual(profile['counters'], {'evaluations': result['evaluations']})
+        self.assertLessEqual(sum(phase['ms'] for phase in profile['phases'].values()), profile['total_ms'])
+
+    def test_service_adds_load_phase_and_traces_allocations(self):
+        service = RoutineGenerationService(snapshot_cache=self.CachedSnapshot(self.data))
+        self.assertNotIn('profile', service.generate_routine(max_generations=3, seed=2))
+
+        profile = service.generate_routine(max_generations=3, seed=2, profile_allocations=True)['profile']
+        self.assertIn('db_load', profile['phases'])
+        self.assertEqual(profile['counters']['db_collection_reads'], 0)
+        self.assertEqual(profile['counters']['snapshot_cache_hits'], 1)
+        self.assertIn('peak_allocated_kb', profile['phases']['initialization'])
+
+        profile = service.generate_routine('simulated_annealing', max_generations=3, seed=2, profile=True)['profile']
+        self.assertEqual(list(profile['phases']), ['db_load'])
+        self.assertGreater(profile['counters']['evaluations'], 0)
+
+
+class TerminationTests(SimpleTestCase):
+    """The genetic algorithm stops at the first criterion met and reports it."""
+
+    def infeasible(self):
+        # Five classes, one meeting time and two rooms: conflicts cannot reach zero
+        return section_data(1, [30, 30], [('20', ['A', 'B'])] * 5)
+
+    def test_stops_on_stagnation(self):
+        result = GeneticAlgorithmStrategy(max_generations=1000, stagnation_generations=5,
+                                          seed=1).generate(data=self.infeasible())
+        self.assertEqual(result['stop_reason'], 'stagnation')
+        self.assertLess(result['generations'], 1000)
+
+    def test_stops_at_target_conflicts(self):
+        result = GeneticAlgorithmStrategy(target_conflicts=100, seed=1).generate(data=self.infeasible())
+        self.assertEqual(result['stop_reason'], 'target_conflicts')
+        self.assertEqual(result['generations'], 0)
+
+    def test_stops_at_time_limit_and_max_generations(self):
+        data = self.infeasible()
+        result = GeneticAlgorithmStrategy(time_limit_seconds=0, seed=1).generate(data=data)
+        self.assertEqual((result['stop_reason'], result['generations']), ('time_limit', 0))
+        self.assertTrue(result['timed_out'])
+        self.assertEqual(len(result['schedule']), 5)
+        result = GeneticAlgorithmStrategy(max_generations=3, seed=1).generate(data=data)
+        self.assertEqual((result['stop_reason'], result['generations']), ('max_generations', 3))
+
+    def test_other_strategies_honour_time_limit(self):
+        data = self.infeasible()
+        result = SimulatedAnnealingStrategy(time_limit_seconds=0, seed=1).generate(data=data)
+        self.assertEqual((result['timed_out'], result['generations']), (True, 0))
+        result = ConstraintProgrammingStrategy(time_limit_seconds=0, use_cp_sat=False).generate(data=data)
+        self.assertTrue(result['timed_out'])
+        self.assertEqual(result['infeasible_sections'],
+                         [{'section': 'S1', 'reason': 'not decided within the time limit'}])
+
+    def test_simulated_annealing_honours_target_and_stagnation(self):
+        data = self.infeasible()
+        result = SimulatedAnnealingStrategy(target_conflicts=100, seed=1).generate(data=data)
+        self.assertEqual((result['stop_reason'], result['generations']), ('target_conflicts', 0))
+        result = SimulatedAnnealingStrategy(max_generations=1000, stagnation_generations=5,
+                                            seed=1).generate(data=data)
+        self.assertEqual(result['stop_reason'], 'stagnation')
+        self.assertLess(result['generations'], 1000)
+
+    def test_simulated_annealing_returns_its_best_schedule(self):
+        # Hot enough to accept many worsening moves after the best, so its move log is replaced by a copy
+        data = Data(**build_synthetic_entities(departments=1, sections_per_department=3, courses_per_department=3,
+                                               rooms=2, instructors=2, days=1, slots_per_day=3, seed=2))
+        progress = []
+        result = SimulatedAnnealingStrategy(max_generations=40, initial_temperature=5, cooling_rate=0.9,
+                                            seed=3).generate(data=data, progress_callback=progress.append)
+        self.assertEqual(result['conflicts'], min(report['conflicts'] for report in progress))
+        self.assertGreater(progress[-1]['mean_fitness'], 0)
+        rebuilt = Schedule(data).initialize_from(result['schedule'])
+        self.assertEqual(rebuilt.get_fitness(), result['fitness'])
+        self.assertEqual(rebuilt.get_numb_of_conflicts(), result['conflicts'])
+
+    def test_adaptive_mutation_rate_stays_in_bounds(self):
+        genetic_algorithm = GeneticAlgorithm(mutation_rate=0.1)
+        genetic_algorithm.adapt_mutation_rate(ADAPTIVE_MUTATION_PATIENCE)
+        self.assertGreater(genetic_algorithm.mutation_rate, 0.1)
+        genetic_algorithm.adapt_mutation_rate(1)
+        self.assertGreater(genetic_algorithm.mutation_rate, 0.1)
+        for _ in range(50):
+            genetic_algorithm.adapt_mutation_rate(ADAPTIVE_MUTATION_PATIENCE)
+        self.assertEqual(genetic_algorithm.mutation_rate, MAX_MUTATION_RATE)
+        for _ in range(50):
+            genetic_algorithm.adapt_mutation_rate(0)
+        self.assertEqual(genetic_algorithm.mutation_rate, MIN_MUTATION_RATE)
+
+
+
+class ParallelGeneticAlgorithmTests(SimpleTestCase):
+    """Island model on a small spawn pool."""
+
+    def infeasible(self):
+        # Five classes, one meeting time and two rooms: no island ever reaches the target
+        return section_data(1, [30, 30], [('20', ['A', 'B'])] * 5)
+
+    def strategy(self, **kwargs):
+        params = dict(num_islands=2, population_size=6, migration_interval=3, seed=5)
+        params.update(kwargs)
+        return ParallelGeneticAlgorithmStrategy(**params)
+
+    def test_seeded_run_is_reproducible_and_reports_epochs(self):
+        data = self.infeasible()
+        progress = []
+        result = self.strategy(max_generations=7).generate(data=data, progress_callback=progress.append)
+        self.assertEqual((result['generations'], result['stop_reason']), (7, 'max_generations'))
+        self.assertEqual([report['generation'] for report in progress], [3, 6, 7])
+        self.assertEqual(progress[-1]['best_fitness'], result['fitness'])
+        self.assertLess(progress[-1]['mean_fitness'], progress[-1]['best_fitness'])
+
+        progress = []
+        again = self.strategy(max_generations=7).generate(data=data, progress_callback=progress.append,
+                                                          progress_interval=3600, profiler=GenerationProfiler())
+        self.assertEqual([report['generation'] for report in progress], [7])
+        for key in ('schedule', 'fitness', 'conflicts', 'evaluations'):
+            self.assertEqual(again[key], result[key])
+        self.assertEqual(list(again['profile']['phases']), ['islands', 'migration', 'serialization'])
+        self.assertEqual(again['profile']['phases']['islands']['entries'], 3)
+        self.assertEqual(again['profile']['counters'], {'evaluations': again['evaluations']})
+
+    def test_migration_replaces_worst_schedules_of_next_island(self):
+        strategy = self.strategy(num_islands=3, num_migrants=2)
+        # Island i holds schedules (i, 0) best ... (i, 5) worst
+        islands = [[(np.array([i]), np.array([rank]), np.array([0])) for rank in range(6)] for i in range(3)]
+        strategy._migrate(islands)
+        for i, genes in enumerate(islands):
+            self.assertEqual([(int(g[0][0]), int(g[1][0])) for g in genes],
+                             [(i, 0), (i, 1), (i, 2), (i, 3), ((i - 1) % 3, 0), ((i - 1) % 3, 1)])
+
+    def test_cancel_stops_islands_mid_epoch(self):
+        cancel_event = threading.Event()
+        timer = threading.Timer(3, cancel_event.set)
+        timer.start()
+        started = time.monotonic()
+        try:
+            result = self.strategy(max_generations=10 ** 7, migration_interval=10 ** 7).generate(
+                data=self.infeasible(), cancel_event=cancel_event)
+        finally:
+            timer.cancel()
+        self.assertLess(time.monotonic() - started, 10)
+        self.assertEqual(result['stop_reason'], 'cancelled')
+        self.assertTrue(result['cancelled'])
+        self.assertLess(result['generations'], 10 ** 7)
+        self.assertEqual(len(result['schedule']), 5)
+
+    def test_islands_adapt_their_own_mutation_rate(self):
+        _init_island([0])
+        snapshot = ('adapt', pickle.dumps(self.infeasible()))
+        params = {'population_size': 6, 'mutation_rate': 0.1}
+        members, run, rate, stagnant, evaluations = _evolve_island(snapshot, 0, None, params, 0, None, 30,
+                                                                   (1, 0, 0), adaptive_mutation=True)
+        self.assertEqual((len(members), run), (6, 30))
+        self.assertNotEqual(rate, 0.1)
+        self.assertTrue(MIN_MUTATION_RATE <= rate <= MAX_MUTATION_RATE)
+        self.assertGreater(evaluations, 6)
+        _, _, fixed_rate, _, _ = _evolve_island(snapshot, 0, members, params, 0, None, 30, (1, 30, 0),
+                                                stagnant=stagnant)
+        self.assertEqual(fixed_rate, 0.1)
+
+    def test_islands_return_scores_and_do_not_rescore_them(self):
+        _init_island([0])
+        data = self.infeasible()
+        snapshot = ('scores', pickle.dumps(data))
+        params = {'population_size': 6, 'mutation_rate': 0.1}
+        members, _, _, _, _ = _evolve_island(snapshot, 0, None, params, 0, None, 3, (1, 0, 0))
+        rescored = [_schedule_from_member(data, member) for member in members]
+        for schedule in rescored:
+            schedule.genes_changed()
+        evaluate_population(data, rescored)
+        self.assertEqual([(conflicts, penalty) for _, conflicts, penalty in members],
+                         [(s.get_numb_of_conflicts(), s.get_soft_penalty()) for s in rescored])
+        # No generation to run: the shipped population is taken as scored
+        _, run, _, _, evaluations = _evolve_island(snapshot, 0, members, params, 0, None, 0, (1, 3, 0))
+        self.assertEqual((run, evaluations), (0, 0))
+
+    def test_run_stopped_before_the_first_epoch_keeps_its_warm_start(self):
+        data = Data(**build_synthetic_entities(seed=3))
+        base = ConstraintProgrammingStrategy(use_cp_sat=False).generate(data=data)
+        result = self.strategy(time_limit_seconds=0).generate(data=data, warm_start=base['schedule'])
+        self.assertEqual((result['stop_reason'], result['generations']), ('time_limit', 0))
+        self.assertLessEqual(result['conflicts'], base['conflicts'])
+
+    def test_runs_share_the_island_pool(self):
+        self.strategy(max_generations=1).generate(data=self.infeasible())
+        pool = _island_pools[2]
+        self.strategy(max_generations=1).generate(data=self.infeasible())
+        self.assertIs(_island_pools[2], pool)
+        self.assertEqual(len(pool._free_slots), MAX_CONCURRENT_RUNS)
+
+    def test_time_limit_counts_pool_start_up(self):
+        started = time.monotonic()
+        result = self.strategy(max_generations=10 ** 7, migration_interval=10 ** 7,
+                               time_limit_seconds=0.5).generate(data=self.infeasible())
+        # Limit, grace for busy islands and the in-process fallback population
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual((result['stop_reason'], result['timed_out']), ('time_limit', True))
+        self.assertEqual(len(result['schedule']), 5)
+
+
+class OperatorTests(SimpleTestCase):
+    """Crossover and mutation only touch the genes they produce."""
+
+    def setUp(self):
+        self.data = section_data(4, [30, 60], [('20', ['A', 'B']), ('50', ['B']), ('20', ['C'])] * 4)
+        self.rng = np.random.default_rng(8)
+        self.parents = [Schedule(self.data, self.rng).initialize() for _ in range(2)]
+
+    def genes(self, schedule):
+        return [getattr(schedule, name).tolist() for name in ('meeting_time_idx', 'room_idx', 'instructor_idx')]
+
+    def test_crossover_takes_every_gene_from_a_parent(self):
+        before = [self.genes(parent) for parent in self.parents]
+        child = GeneticAlgorithm(rng=self.rng)._crossover_schedule(*self.parents, self.data)
+        self.assertEqual([self.genes(parent) for parent in self.parents], before)
+        for i in range(child.get_numb_of_classes()):
+            self.assertIn([genes[i] for genes in self.genes(child)],
+                          [[genes[i] for genes in parent] for parent in before])
+        self.assertFalse(np.shares_memory(child.room_idx, self.parents[0].room_idx))
+
+    def test_mutation_redraws_only_mutated_genes(self):
+        schedule = self.parents[0]
+        before = self.genes(schedule)
+        GeneticAlgorithm(mutation_rate=0.0, rng=self.rng)._mutate_schedule(schedule, self.data)
+        self.assertEqual(self.genes(schedule), before)
+
+        GeneticAlgorithm(mutation_rate=1.0, rng=self.rng)._mutate_schedule(schedule, self.data)
+        self.assertNotEqual(self.genes(schedule), before)
+        courses = self.data.get_courses()
+        instructors = self.data.get_instructors()
+        for course, instructor in zip(schedule.course_idx.tolist(), schedule.instructor_idx.tolist()):
+            self.assertIn(instructors[instructor], courses[course].instructors)
+
+
+    def test_copies_share_genes_until_edited(self):
+        schedule = self.parents[0]
+        fitness = schedule.get_fitness()
+        before = self.genes(schedule)
+        copy = schedule.copy()
+        self.assertTrue(np.shares_memory(copy.room_idx, schedule.room_idx))
+        self.assertFalse(schedule.room_idx.flags.writeable)
+
+        GeneticAlgorithm(mutation_rate=1.0, rng=self.rng)._mutate_schedule(copy, self.data)
+        copy.set_gene(0, 1, 1, int(copy.instructor_idx[0]))
+        self.assertEqual(self.genes(schedule), before)
+        self.assertEqual(schedule.get_fitness(), fitness)
+        self.assertFalse(np.shares_memory(copy.room_idx, schedule.room_idx))
+
+        schedule.set_gene(0, 0, 0, int(schedule.instructor_idx[0]))
+        fresh = schedule.child(*(np.array(genes, dtype=schedule.room_idx.dtype) for genes in self.genes(schedule)))
+        self.assertEqual(schedule.get_fitness(), fresh.get_fitness())
+
+
+class SyntheticDataTests(SimpleTestCase):
+    """Synthetic instances and the benchmark_generation command."""
+
+    @staticmethod
+    def fields(doc):
+        """Stored fields of a document, without its timestamps."""
+        return {key: value for key, value in doc.to_mongo().items() if key not in ('created_at', 'updated_at')}
+
+    def test_instances_are_reproducible(self):
+        entities = build_synthetic_entities(departments=3, sections_per_department=2, courses_per_department=4,
+                                            rooms=5, instructors=6, days=2, slots_per_day=3, seed=7)
+        self.assertEqual([len(entities[name]) for name in ('depts', 'sections', 'courses', 'rooms',
+                                                           'instructors', 'meeting_times')],
+                         [3, 6, 12, 5, 6, 6])
+        again = build_synthetic_entities(departments=3, sections_per_department=2, courses_per_department=4,
+                                         rooms=5, instructors=6, days=2, slots_per_day=3, seed=7)
+        for name in entities:
+            self.assertEqual([self.fields(doc) for doc in entities[name]], [self.fields(doc) for doc in again[name]])
+        for course in entities['courses']:
+            self.assertTrue(1 <= len(course.instructors) <= 3)
+
+        data = Data(**entities)
+        self.assertEqual(len(Schedule(data).initialize().serialize()), 6 * 2 * 4)
+
+    def test_records_are_valid_documents(self):
+        records = build_synthetic_records(departments=2, rooms=99999, seed=3)
+        for name, document in SYNTHETIC_DOCUMENTS.items():
+            for record in records[name][:50]:
+                document._from_son(record, _auto_dereference=False).validate()
+        ids = {name: {record['_id'] for record in records[name]} for name in records}
+        for course in records['courses']:
+            self.assertTrue(set(course['instructors']) <= ids['instructors'])
+        for dept in records['depts']:
+            self.assertTrue(set(dept['courses']) <= ids['courses'])
+        self.assertTrue({section['department'] for section in records['sections']} <= ids['depts'])
+
+        with self.assertRaises(ValidationError):
+            build_synthetic_records(rooms=100001)
+
+    def test_benchmark_reports_every_run(self):
+        out = StringIO()
+        call_command('benchmark_generation', '--departments', '2', '--sections-per-department', '2',
+                     '--scales', '1', '2', '--strategies', 'genetic_algorithm', 'simulated_annealing',
+                     '--seeds', '0', '1', '--max-generations', '50', '--in-process',
+                     stdout=out, stderr=StringIO())
+        runs = json.loads(out.getvalue())['runs']
+
+        self.assertEqual(len(runs), 2 * 2 * 2)
+        self.assertEqual(runs[-1]['size']['departments'], 4)
+        for run in runs:
+            self.assertGreater(run['evaluations'], 0)
+            self.assertLessEqual(run['generations'], 50)
+            if run['final_conflicts'] == 0:
+                self.assertLessEqual(run['generations_to_feasibility'], run['generations'])
+
+    def test_benchmark_leaves_out_metrics_a_strategy_cannot_report(self):
+        size = {'departments': 1, 'sections_per_department': 2}
+        run = run_benchmark('constraint_programming', size, 0, {'max_generations': 5})
+        self.assertEqual(run['final_conflicts'], 0)
+        self.assertIsNone(run['generations_to_feasibility'])
+        run = run_benchmark('parallel_genetic_algorithm', size, 0, {'max_generations': 5, 'num_islands': 1})
+        self.assertIsNone(run['peak_child_rss_mb'])
+
+
+class SnapshotRepositoryTests(MongoTestCase):
+    """Projected bulk load of the generation snapshot."""
+
+    def test_projected_load_matches_dereferenced_documents(self):
+        self.insert_synthetic(departments=2, sections_per_department=2, courses_per_department=3,
+                              rooms=4, instructors=5, days=2, slots_per_day=3, seed=5)
+        loaded = Data()
+        plain = Data(rooms=list(Room.objects), meeting_times=list(MeetingTime.objects),
+                     instructors=list(Instructor.objects), courses=list(Course.objects),
+                     depts=list(Department.objects), sections=list(Section.objects))
+
+        self.assertEqual(loaded.get_load_stats()['collections'], 6)
+        self.assertEqual(loaded.get_section_ids(), plain.get_section_ids())
+        for name in ('course_idx', 'section_idx', 'instructor_counts', 'instructor_candidates'):
+            np.testing.assert_array_equal(getattr(loaded.get_gene_template(), name),
+                                          getattr(plain.get_gene_template(), name))
+        np.testing.assert_array_equal(loaded.get_room_capacities(), plain.get_room_capacities())
+        np.testing.assert_array_equal(loaded.get_course_max_students(), plain.get_course_max_students())
+        self.assertEqual(GeneticAlgorithmStrategy(max_generations=5, seed=1).generate(data=loaded)['schedule'],
+                         GeneticAlgorithmStrategy(max_generations=5, seed=1).generate(data=plain)['schedule'])
+
+        # References point at the loaded entities themselves
+        repository = SnapshotRepository()
+        snapshot = repository.load()
+        self.assertIs(snapshot['sections'][0].department, snapshot['depts'][0])
+        self.assertIs(snapshot['depts'][0].courses[0], snapshot['courses'][0])
+        self.assertEqual(repository.last_stats['documents'], 4 + 6 + 5 + 6 + 2 + 4)
+
+
+class SnapshotCacheTests(MongoTestCase):
+    """Reuse and invalidation of the cached generation snapshot."""
+
+    def setUp(self):
+        super().setUp()
+        self.insert_synthetic(departments=1, sections_per_department=2, courses_per_department=2,
+                              rooms=3, instructors=3, days=1, slots_per_day=4)
+        SnapshotCacheService.invalidate()
+        self.cache = SnapshotCacheService()
+
+    def test_unchanged_dataset_hits(self):
+        data = self.cache.get_data()
+        self.assertEqual(self.cache.last_load_stats['collections'], 6)
+        self.assertIs(SnapshotCacheService().get_data(), data)
+        self.assertIs(self.cache.get_data(), data)
+        self.assertEqual(self.cache.last_load_stats, {})
+
+    def test_document_signals_invalidate(self):
+        data = self.cache.get_data()
+        Room(r_number='RNEW', seating_capacity=10).save()
+        changed = self.cache.get_data()
+        self.assertIsNot(changed, data)
+        self.assertEqual(len(changed.get_rooms()), len(data.get_rooms()) + 1)
+
+        Room.objects(r_number='RNEW').first().delete()
+        self.assertEqual(len(self.cache.get_data().get_rooms()), len(data.get_rooms()))
+
+    def test_changes_of_other_processes_invalidate(self):
+        data = self.cache.get_data()
+        # Another process's invalidate() bumps only the shared version
+        Room._get_collection().insert_one({'r_number': 'RNEW', 'seating_capacity': 10})
+        DatasetVersionRepository().bump(SNAPSHOT_DATASET)
+        self.assertEqual(len(self.cache.get_data().get_rooms()), len(data.get_rooms()) + 1)
+
+    def test_snapshot_expires_after_ttl(self):
+        data = self.cache.get_data()
+        # Writes without signals are only picked up once the snapshot expires
+        Room.objects(r_number='R0').update(set__seating_capacity=999)
+        self.assertIs(self.cache.get_data(), data)
+        with override_settings(ROUTINE_SNAPSHOT_CACHE_TTL=0):
+            expired = self.cache.get_data()
+        self.assertIsNot(expired, data)
+        self.assertIn(999, expired.get_room_capacities().tolist())
+
+
+class GenerationJobTests(MongoTestCase):
+    """Background generation jobs: submit, status, cancel and result."""
+
+    def setUp(self):
+        super().setUp()
+        SnapshotCacheService.invalidate()
+        self.service = GenerationJobService()
+
+    def wait_until(self, job_id, *statuses, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            job = self.service.get_job(job_id)
+            if job.status in statuses:
+                return job
+            time.sleep(0.02)
+        self.fail(f'Job {job_id} is still {job.status}')
+
+    def test_job_runs_and_stores_result(self):
+        self.insert_synthetic(departments=1, sections_per_department=2, courses_per_department=2,
+                              rooms=4, instructors=3, days=2, slots_per_day=4)
+        job = self.service.submit('genetic_algorithm', {'max_generations': 50, 'seed': 3}, 'tester')
+        self.assertEqual(job.status, GenerationJob.STATUS_QUEUED)
+
+        job = self.wait_until(job.pk, *GenerationJob.FINISHED_STATUSES)
+        self.assertEqual(job.status, GenerationJob.STATUS_COMPLETED)
+        self.assertEqual(len(job.result['schedule']), 2 * 2 * 2)
+        self.assertEqual(job.progress['conflicts'], job.result['conflicts'])
+        self.assertEqual(job.history.status, 'Success')
+        self.assertEqual(job.history.parameters['seed'], 3)
+        with self.assertRaises(ValidationError):
+            self.service.cancel(str(job.pk))
+
+    def test_cancel_stops_a_running_job_with_its_best_schedule(self):
+        # One room and meeting time for four classes: never solved
+        self.insert_synthetic(departments=1, sections_per_department=2, courses_per_department=2,
+                              classes_per_course=1, rooms=1, instructors=2, days=1, slots_per_day=1)
+        job = self.service.submit('genetic_algorithm', {'max_generations': 10 ** 7, 'seed': 1})
+        self.wait_until(job.pk, GenerationJob.STATUS_RUNNING)
+
+        self.service.cancel(str(job.pk))
+        job = self.wait_until(job.pk, *GenerationJob.FINISHED_STATUSES, timeout=5)
+        self.assertEqual(job.status, GenerationJob.STATUS_CANCELLED)
+        self.assertEqual(job.result['stop_reason'], 'cancelled')
+        self.assertEqual(len(job.result['schedule']), 4)
+
+    def test_queued_job_is_cancelled_at_once_and_never_runs(self):
+        job = GenerationJob(strategy_type='genetic_algorithm', parameters={}).save()
+        self.assertEqual(self.service.cancel(str(job.pk)).status, GenerationJob.STATUS_CANCELLED)
+        self.service._run(job.pk)
+        job.reload()
+        self.assertEqual(job.status, GenerationJob.STATUS_CANCELLED)
+        self.assertIsNone(job.started_at)
+        with self.assertRaises(NotFoundError):
+            self.service.get_job(str(ObjectId()))
+
+    @override_settings(ROUTINE_GENERATION_JOB_TIMEOUT=60)
+    def test_stale_jobs_are_failed(self):
+        long_ago = datetime.utcnow() - timedelta(hours=1)
+        running = GenerationJob(status=GenerationJob.STATUS_RUNNING, started_at=long_ago).save()
+        queued = GenerationJob(created_at=long_ago).save()
+        recent = GenerationJob(status=GenerationJob.STATUS_RUNNING, started_at=datetime.utcnow()).save()
+
+        with self.assertLogs('GenerationJobService', 'WARNING'):
+            job = self.service.get_job(str(running.pk))
+        self.assertEqual(job.status, GenerationJob.STATUS_FAILED)
+        self.assertIn('interrupted', job.error)
+        self.assertEqual(self.service.get_job(str(queued.pk)).status, GenerationJob.STATUS_FAILED)
+        self.assertEqual(self.service.get_job(str(recent.pk)).status, GenerationJob.STATUS_RUNNING)
+        # A stale queued job that reaches a worker thread is not run
+        self.service._run(queued.pk)
+        self.assertIsNone(self.service.get_job(str(queued.pk)).started_at)
+
+
+class GenerationStreamViewTests(MongoTestCase):
+    """Server-Sent Events stream of a generation."""
+
+    def stream(self, query, accept='text/event-stream'):
+        # The view module binds querysets on import, which needs a connection
+        from routine.views import RoutineGenerationStreamView
+        request = APIRequestFactory().get('/api/routine/generate/stream/', query, HTTP_ACCEPT=accept)
+        force_authenticate(request, user=User(username='tester'))
+        return RoutineGenerationStreamView.as_view()(request)
+
+    def events(self, response):
+        events = []
+        for block in b''.join(response.streaming_content).decode().split('\n\n'):
+            if block.startswith('event: '):
+                event, data = block.split('\n')
+                events.append((event[len('event: '):], json.loads(data[len('data: '):])))
+        return events
+
+    @override_settings(ROUTINE_PROGRESS_EVENT_INTERVAL=0)
+    def test_event_source_request_streams_progress_and_result(self):
+        # One room and meeting time for four classes: every generation runs
+        self.insert_synthetic(departments=1, sections_per_department=2, courses_per_department=2,
+                              classes_per_course=1, rooms=1, instructors=2, days=1, slots_per_day=1)
+        SnapshotCacheService.invalidate()
+        response = self.stream({'max_generations': 20, 'seed': 4})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        events = self.events(response)
+        self.assertEqual({event for event, _ in events[:-1]}, {'progress'})
+        self.assertIn('conflicts', events[0][1])
+        event, result = events[-1]
+        self.assertEqual(event, 'result')
+        self.assertEqual(len(result['schedule']), 4)
+        self.assertEqual(events[-2][1]['generation'], result['generations'])
+        self.assertEqual(GenerationHistory.objects.get().status, 'Success')
+
+    @override_settings(ROUTINE_SYNC_TIME_LIMIT=2)
+    def test_stream_time_limit_is_capped(self):
+        self.insert_synthetic(departments=1, sections_per_department=1, courses_per_department=2,
+                              classes_per_course=1, rooms=2, instructors=2)
+        SnapshotCacheService.invalidate()
+        self.events(self.stream({'max_generations': 5, 'time_limit_seconds': 60}))
+        self.assertEqual(GenerationHistory.objects.get().parameters['time_limit_seconds'], 2)
+
+    def test_invalid_parameters_are_an_error_event(self):
+        response = self.stream({'max_generations': -1})
+        self.assertEqual(response.status_code, 400)
+        response.render()
+        self.assertTrue(response.content.startswith(b'event: error\ndata: {"errors": {"max_generations"'))
+
+
+class GenerationViewTests(MongoTestCase):
+    """Request/response generation endpoints run and record the same parameters."""
+
+    def post(self, view_name, data):
+        # The view module binds querysets on import, which needs a connection
+        from routine import views
+        request = APIRequestFactory().post('/api/routine/generate/', data, format='json')
+        force_authenticate(request, user=User(username='tester'))
+        return getattr(views, view_name).as_view()(request)
+
+    def test_json_and_pdf_endpoints_record_the_same_parameters(self):
+        self.insert_synthetic(departments=1, sections_per_department=1, courses_per_department=2,
+                              classes_per_course=1, rooms=2, instructors=2)
+        SnapshotCacheService.invalidate()
+        request = {'max_generations': 5, 'seed': 2, 'profile': True}
+        response = self.post('RoutineGenerationView', request)
+        self.assertEqual(response.status_code, 200)
+        response = self.post('RoutinePDFGenerationView', request)
+        self.assertEqual((response.status_code, response['Content-Type']), (200, 'application/pdf'))
+
+        json_run, pdf_run = GenerationHistory.objects.order_by('timestamp')
+        self.assertEqual(json_run.parameters, pdf_run.parameters)
+        self.assertEqual(pdf_run.parameters['profile'], True)
+        self.assertIn('db_load', pdf_run.profile['phases'])
+
+    def test_unknown_warm_start_job_is_not_found(self):
+        self.insert_synthetic(departments=1, sections_per_department=1, courses_per_department=2,
+                              classes_per_course=1, rooms=2, instructors=2)
+        SnapshotCacheService.invalidate()
+        response = self.post('RoutineGenerationView', {'max_generations': 5, 'warm_start': 'previous',
+                                                       'warm_start_job_id': str(ObjectId())})
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(GenerationHistory.objects.count())
+
+
+class WarmStartTests(MongoTestCase):
+    """Warm-start rows from persisted assignments and previous job results."""
+
+    row = {'section': 'D0S0', 'course_number': 'D0C0', 'meeting_time_id': 'P00',
+           'room_number': 'R0', 'instructor_uid': 'I0'}
+
+    def setUp(self):
+        super().setUp()
+        self.records = self.insert_synthetic(departments=1, sections_per_department=2, courses_per_department=2,
+                                             classes_per_course=1, rooms=2, instructors=2)
+        self.data = Data()
+        self.service = WarmStartService()
+
+    def test_persisted_rows_resolve_section_assignments(self):
+        Section._get_collection().update_one({'_id': 'D0S0'}, {'$set': {
+            'course': 'D0C0', 'meeting_time': 'P00',
+            'room': self.records['rooms'][0]['_id'], 'instructor': self.records['instructors'][0]['_id'],
+        }})
+        # D0S1 has no persisted assignment and is skipped
+        self.assertEqual(self.service.get_assignments('persisted', self.data), [self.row])
+
+    def test_previous_uses_the_latest_or_the_given_job(self):
+        self.assertEqual(self.service.get_assignments('previous', self.data), [])
+        older = GenerationJob(status=GenerationJob.STATUS_COMPLETED, finished_at=datetime(2024, 1, 1),
+                              result={'schedule': [dict(self.row, room_number='R1')]}).save()
+        GenerationJob(status=GenerationJob.STATUS_COMPLETED, finished_at=datetime(2024, 1, 2),
+                      result={'schedule': [self.row]}).save()
+        self.assertEqual(self.service.get_assignments('previous', self.data), [self.row])
+        self.assertEqual(self.service.get_assignments('previous', self.data, job_id=str(older.id)),
+                         [dict(self.row, room_number='R1')])
+
+    def test_job_without_result_is_not_found(self):
+        failed = GenerationJob(status=GenerationJob.STATUS_FAILED).save()
+        for job_id in (str(failed.id), str(ObjectId()), 'not-an-id'):
+            with self.assertRaises(NotFoundError):
+                self.service.get_assignments('previous', self.data, job_id=job_id)
+        with self.assertRaises(ValidationError):
+            self.service.get_assignments('yesterday', self.data)
+
+
+class RepairViewTests(MongoTestCase):
+    """Repair endpoint: re-places the classes a data change affects and keeps the rest."""
+
+    def setUp(self):
+        super().setUp()
+        self.records = self.insert_synthetic(departments=1, sections_per_department=2, courses_per_department=3,
+                                             classes_per_course=1, rooms=6, instructors=4)
+        SnapshotCacheService.invalidate()
+        self.base = ConstraintProgrammingStrategy(use_cp_sat=False).generate(data=Data())['schedule']
+        self.job = GenerationJob(status=GenerationJob.STATUS_COMPLETED, finished_at=datetime.utcnow(),
+                                 result={'schedule': self.base}).save()
+
+    def post(self, data):
+        # The view module binds querysets on import, which needs a connection
+        from routine.views import RoutineRepairView
+        request = APIRequestFactory().post('/api/routine/generate/repair/', data, format='json')
+        force_authenticate(request, user=User(username='tester'))
+        return RoutineRepairView.as_view()(request)
+
+    def assert_only_moved(self, result, affected):
+        before = {(row['section'], row['course_number']): row for row in self.base}
+        moved = 0
+        for row in result['schedule']:
+            old = before[row['section'], row['course_number']]
+            slot = (row['meeting_time_id'], row['room_number'], row['instructor_uid'])
+            if affected(old):
+                self.assertFalse(affected(row))
+            else:
+                self.assertEqual(slot, (old['meeting_time_id'], old['room_number'], old['instructor_uid']))
+            moved += slot != (old['meeting_time_id'], old['room_number'], old['instructor_uid'])
+        self.assertEqual(result['changed_classes'], moved)
+        self.assertGreater(moved, 0)
+
+    def test_without_a_base_timetable_is_a_conflict(self):
+        self.job.delete()
+        response = self.post({'rooms': ['R0']})
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(GenerationHistory.objects.count())
+
+    def test_deleted_room_classes_are_replaced_from_the_job_result(self):
+        room = next(row['room_number'] for row in self.base)
+        Room.objects(r_number=room).delete()
+        SnapshotCacheService.invalidate()
+        response = self.post({'rooms': [room], 'base_job_id': str(self.job.id), 'seed': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['conflicts'], 0)
+        self.assert_only_moved(response.data, lambda row: row['room_number'] == room)
+        history = GenerationHistory.objects.get()
+        self.assertEqual((history.strategy_type, history.status), ('repair', 'Success'))
+
+    def test_classes_of_a_changed_instructor_are_replaced(self):
+        uid = next(row['instructor_uid'] for row in self.base)
+        instructor = next(doc['_id'] for doc in self.records['instructors'] if doc['uid'] == uid)
+        others = [doc['_id'] for doc in self.records['instructors'] if doc['_id'] != instructor]
+        # The instructor stops teaching: each of their courses is handed to another instructor
+        for course in self.records['courses']:
+            if instructor in course['instructors']:
+                Course._get_collection().update_one({'_id': course['_id']}, {'$set': {'instructors': [
+                    *[i for i in course['instructors'] if i != instructor], others[0]]}})
+        SnapshotCacheService.invalidate()
+        result = RoutineGenerationService().repair_routine(changed={'instructors': [uid]}, seed=1)
+        self.assertEqual(result['conflicts'], 0)
+        self.assert_only_moved(result, lambda row: row['instructor_uid'] == uid)
@@ -22,6 +22,11 @@ urlpatterns = [
     path('dashboard/stats/', views.DashboardStatsView.as_view(), name='dashboard-stats'),
     path('dashboard/generation-history/', views.GenerationHistoryView.as_view(), name='generation-history'),
     path('generate/', views.RoutineGenerationView.as_view(), name='generate'),
+    path('generate/stream/', views.RoutineGenerationStreamView.as_view(), name='generate-stream'),
+    path('generate/repair/', views.RoutineRepairView.as_view(), name='generate-repair'),
+    path('generate/jobs/', views.GenerationJobListView.as_view(), name='generation-jobs'),
+    path('generate/jobs/<str:job_id>/', views.GenerationJobDetailView.as_view(), name='generation-job-detail'),
+    path('generate/jobs/<str:job_id>/cancel/', views.GenerationJobCancelView.as_view(), name='generation-job-cancel'),
     path('generate-pdf/', views.RoutinePDFGenerationView.as_view(), name='generate-pdf'),
     path('', include(router.urls)),
 ]
@@ -2,10 +2,13 @@
 DRF views for routine app.
 Following Single Responsibility Principle - views handle HTTP request/response only.
 """
+from django.conf import settings
+from django.http import StreamingHttpResponse
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from mongoengine.errors import NotUniqueError, ValidationError as MongoValidationError
 
@@ -13,8 +16,9 @@ from routine.models import Room, Instructor, MeetingTime, Course, Department, Se
 from routine.serializers import (
     RoomSerializer, InstructorSerializer, MeetingTimeSerializer,
     CourseSerializer, DepartmentSerializer, SectionSerializer,
-    RoutineGenerationSerializer, TimetableSerializer,
-    DashboardStatsSerializer, SectionStatusSerializer, GenerationHistorySerializer
+    RoutineGenerationSerializer, RoutineRepairSerializer, TimetableSerializer,
+    DashboardStatsSerializer, SectionStatusSerializer, GenerationHistorySerializer,
+    GenerationJobSerializer
 )
 from routine.repositories import (
     RoomRepository, InstructorRepository, MeetingTimeRepository,
@@ -24,10 +28,45 @@ from routine.repositories.generation_history_repository import GenerationHistory
 from routine.services.routine_generation_service import RoutineGenerationService
 from routine.services.pdf_generation_service import PDFGenerationService
 from routine.services.dashboard_service import DashboardService
+from routine.services.generation_job_service import GenerationJobService
+from routine.services.generation_stream_service import GenerationStreamService
 from core.exceptions import NotFoundError, ValidationError, RoutineGenerationError
+from core.renderers import EventStreamRenderer
 from datetime import datetime
 
 
+def sync_time_limit(requested):
+    """Requested time limit, capped by ROUTINE_SYNC_TIME_LIMIT for endpoints holding a request worker."""
+    cap = getattr(settings, 'ROUTINE_SYNC_TIME_LIMIT', 0)
+    if not cap:
+        return requested
+    return cap if requested is None else min(requested, cap)
+
+
+def generation_parameters(validated_data, time_limit_seconds):
+    """
+    Strategy parameters of a validated RoutineGenerationSerializer, with their defaults.
+    
+    The same dict is passed to the generation services and recorded in the
+    generation history, so every endpoint runs and records the same parameters.
+    """
+    return {
+        'population_size': validated_data.get('population_size', 9),
+        'max_generations': validated_data.get('max_generations', 1000),
+        'mutation_rate': validated_data.get('mutation_rate', 0.1),
+        'warm_start': validated_data.get('warm_start'),
+        'warm_start_job_id': validated_data.get('warm_start_job_id'),
+        'seed': validated_data.get('seed'),
+        'target_conflicts': validated_data.get('target_conflicts', 0),
+        'stagnation_generations': validated_data.get('stagnation_generations'),
+        'adaptive_mutation': validated_data.get('adaptive_mutation', False),
+        'soft_constraints': validated_data.get('soft_constraints'),
+        'profile': validated_data.get('profile', False),
+        'profile_allocations': validated_data.get('profile_allocations', False),
+        'time_limit_seconds': time_limit_seconds,
+    }
+
+
 class RoomViewSet(viewsets.ModelViewSet):
     """
     ViewSet for Room CRUD operations.
@@ -188,12 +227,14 @@ class RoutineGenerationView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        parameters = generation_parameters(
+            serializer.validated_data, sync_time_limit(serializer.validated_data.get('time_limit_seconds'))
+        )
+        
         try:
             result = self.generation_service.generate_routine(
                 strategy_type=serializer.validated_data.get('strategy_type', 'genetic_algorithm'),
-                population_size=serializer.validated_data.get('population_size', 9),
-                max_generations=serializer.validated_data.get('max_generations', 1000),
-                mutation_rate=serializer.validated_data.get('mutation_rate', 0.1),
+                **parameters
             )
             
             # Save generation history
@@ -204,17 +245,19 @@ class RoutineGenerationView(APIView):
                 conflicts_count=result.get('conflicts', 0),
                 generations_run=result.get('generations', 0),
                 status='Success',
+                stop_reason=result.get('stop_reason'),
+                profile=result.get('profile'),
                 strategy_type=serializer.validated_data.get('strategy_type', 'genetic_algorithm'),
-                parameters={
-                    'population_size': serializer.validated_data.get('population_size', 9),
-                    'max_generations': serializer.validated_data.get('max_generations', 1000),
-                    'mutation_rate': serializer.validated_data.get('mutation_rate', 0.1),
-                },
+                parameters=dict(parameters, seed=result.get('seed')),
                 created_by=request.user.username if hasattr(request.user, 'username') else None
             )
             
             response_serializer = TimetableSerializer(result)
             return Response(response_serializer.data, status=status.HTTP_200_OK)
+        except NotFoundError as e:
+            return Response({'error': e.message}, status=status.HTTP_404_NOT_FOUND)
+        except ValidationError as e:
+            return Response({'error': e.message}, status=status.HTTP_400_BAD_REQUEST)
         except RoutineGenerationError as e:
             # Save failed generation history
             try:
@@ -226,11 +269,7 @@ class RoutineGenerationView(APIView):
                     generations_run=0,
                     status='Failed',
                     strategy_type=serializer.validated_data.get('strategy_type', 'genetic_algorithm'),
-                    parameters={
-                        'population_size': serializer.validated_data.get('population_size', 9),
-                        'max_generations': serializer.validated_data.get('max_generations', 1000),
-                        'mutation_rate': serializer.validated_data.get('mutation_rate', 0.1),
-                    },
+                    parameters=parameters,
                     created_by=request.user.username if hasattr(request.user, 'username') else None
                 )
             except Exception:
@@ -263,6 +302,265 @@ class RoutineGenerationView(APIView):
             )
 
 
+class RoutineGenerationStreamView(APIView):
+    """
+    API endpoint streaming routine generation progress as Server-Sent Events.
+    Following Dependency Inversion Principle - depends on service abstraction.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = RoutineGenerationSerializer
+    # EventSource clients only accept text/event-stream
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, EventStreamRenderer]
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.stream_service = GenerationStreamService()
+    
+    def get(self, request):
+        """
+        Generate routine and stream progress (parameters in the query string,
+        for EventSource clients).
+        
+        GET /api/routine/generate/stream/
+        """
+        return self._stream(request, request.query_params)
+    
+    def post(self, request):
+        """
+        Generate routine and stream progress.
+        
+        POST /api/routine/generate/stream/
+        
+        Emits 'progress' events (generation, best_fitness, mean_fitness,
+        conflicts, elapsed_ms), then one 'result' event with the timetable
+        or one 'error' event.
+        """
+        return self._stream(request, request.data)
+    
+    def _stream(self, request, params):
+        serializer = RoutineGenerationSerializer(data=params)
+        
+        if not serializer.is_valid():
+            return Response(
+                {'errors': serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        events = self.stream_service.stream(
+            strategy_type=serializer.validated_data.get('strategy_type', 'genetic_algorithm'),
+            parameters=generation_parameters(
+                serializer.validated_data, sync_time_limit(serializer.validated_data.get('time_limit_seconds'))
+            ),
+            created_by=request.user.username if hasattr(request.user, 'username') else None
+        )
+        
+        def render():
+            for event, payload in events:
+                if event == 'keepalive':
+                    yield ': keepalive\n\n'
+                    continue
+                if event == 'result':
+                    payload = TimetableSerializer(payload).data
+                elif event == 'error':
+                    payload = {'error': payload}
+                yield EventStreamRenderer.format_event(event, payload)
+        
+        response = StreamingHttpResponse(render(), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
+class GenerationJobListView(APIView):
+    """
+    API endpoint for starting asynchronous routine generation jobs.
+    Following Dependency Inversion Principle - depends on service abstraction.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = RoutineGenerationSerializer
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.job_service = GenerationJobService()
+    
+    def post(self, request):
+        """
+        Queue a routine generation job and return its ID immediately.
+        
+        POST /api/routine/generate/jobs/
+        """
+        serializer = RoutineGenerationSerializer(data=request.data)
+        
+        if not serializer.is_valid():
+            return Response(
+                {'errors': serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            job = self.job_service.submit(
+                strategy_type=serializer.validated_data.get('strategy_type', 'genetic_algorithm'),
+                parameters=generation_parameters(
+                    serializer.validated_data, serializer.validated_data.get('time_limit_seconds')
+                ),
+                created_by=request.user.username if hasattr(request.user, 'username') else None
+            )
+            return Response(GenerationJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+        except Exception:
+            return Response(
+                {'error': 'Failed to start generation job'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class GenerationJobDetailView(APIView):
+    """
+    API endpoint for generation job status, progress and result.
+    Following Dependency Inversion Principle - depends on service abstraction.
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.job_service = GenerationJobService()
+    
+    def get(self, request, job_id):
+        """
+        Get job status, progress and (once finished) the generated routine.
+        
+        GET /api/routine/generate/jobs/<job_id>/
+        """
+        try:
+            job = self.job_service.get_job(job_id)
+            return Response(GenerationJobSerializer(job).data, status=status.HTTP_200_OK)
+        except NotFoundError as e:
+            return Response({'error': e.message}, status=status.HTTP_404_NOT_FOUND)
+        except Exception:
+            return Response(
+                {'error': 'Failed to fetch generation job'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class GenerationJobCancelView(APIView):
+    """
+    API endpoint for cancelling a generation job.
+    Following Dependency Inversion Principle - depends on service abstraction.
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.job_service = GenerationJobService()
+    
+    def post(self, request, job_id):
+        """
+        Cancel a queued or running job.
+        
+        POST /api/routine/generate/jobs/<job_id>/cancel/
+        """
+        try:
+            job = self.job_service.cancel(job_id)
+            return Response(GenerationJobSerializer(job).data, status=status.HTTP_200_OK)
+        except NotFoundError as e:
+            return Response({'error': e.message}, status=status.HTTP_404_NOT_FOUND)
+        except ValidationError as e:
+            return Response({'error': e.message}, status=status.HTTP_409_CONFLICT)
+        except Exception:
+            return Response(
+                {'error': 'Failed to cancel generation job'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class RoutineRepairView(APIView):
+    """
+    API endpoint for incremental routine repair.
+    Following Dependency Inversion Principle - depends on service abstraction.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = RoutineRepairSerializer
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.generation_service = RoutineGenerationService()
+    
+    def post(self, request):
+        """
+        Repair the current routine after rooms, instructors or meeting times changed.
+        
+        POST /api/routine/generate/repair/
+        """
+        serializer = RoutineRepairSerializer(data=request.data)
+        
+        if not serializer.is_valid():
+            return Response(
+                {'errors': serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        params = serializer.validated_data
+        parameters = {
+            'rooms': params.get('rooms', []),
+            'instructors': params.get('instructors', []),
+            'meeting_times': params.get('meeting_times', []),
+            'base': params.get('base', 'previous'),
+            'base_job_id': params.get('base_job_id'),
+            'max_rounds': params.get('max_rounds', 20),
+            'seed': params.get('seed'),
+            'time_limit_seconds': sync_time_limit(params.get('time_limit_seconds')),
+        }
+        try:
+            result = self.generation_service.repair_routine(
+                changed={
+                    'rooms': parameters['rooms'],
+                    'instructors': parameters['instructors'],
+                    'meeting_times': parameters['meeting_times'],
+                },
+                base=parameters['base'],
+                base_job_id=parameters['base_job_id'],
+                max_rounds=parameters['max_rounds'],
+                seed=parameters['seed'],
+                time_limit_seconds=parameters['time_limit_seconds'],
+            )
+        except NotFoundError as e:
+            return Response({'error': e.message}, status=status.HTTP_404_NOT_FOUND)
+        except ValidationError as e:
+            return Response({'error': e.message}, status=status.HTTP_409_CONFLICT)
+        except RoutineGenerationError as e:
+            try:
+                GenerationHistoryRepository().create(
+                    timestamp=datetime.utcnow(),
+                    fitness_score=0.0,
+                    conflicts_count=0,
+                    generations_run=0,
+                    status='Failed',
+                    strategy_type='repair',
+                    parameters=parameters,
+                    created_by=request.user.username if hasattr(request.user, 'username') else None
+                )
+            except Exception:
+                pass  # Don't fail if history save fails
+            return Response(
+                {'error': str(e.message)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        
+        GenerationHistoryRepository().create(
+            timestamp=datetime.utcnow(),
+            fitness_score=result.get('fitness', 0.0),
+            conflicts_count=result.get('conflicts', 0),
+            generations_run=result.get('generations', 0),
+            status='Success',
+            stop_reason=result.get('stop_reason'),
+            strategy_type='repair',
+            parameters=dict(parameters, seed=result.get('seed')),
+            created_by=request.user.username if hasattr(request.user, 'username') else None
+        )
+        
+        return Response(TimetableSerializer(result).data, status=status.HTTP_200_OK)
+
+
 class RoutinePDFGenerationView(APIView):
     """
     API endpoint for PDF generation of routine.
@@ -290,13 +588,15 @@ class RoutinePDFGenerationView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        parameters = generation_parameters(
+            serializer.validated_data, sync_time_limit(serializer.validated_data.get('time_limit_seconds'))
+        )
+        
         try:
             # Generate routine
             result = self.generation_service.generate_routine(
                 strategy_type=serializer.validated_data.get('strategy_type', 'genetic_algorithm'),
-                population_size=serializer.validated_data.get('population_size', 9),
-                max_generations=serializer.validated_data.get('max_generations', 1000),
-                mutation_rate=serializer.validated_data.get('mutation_rate', 0.1),
+                **parameters
             )
             
             # Save generation history
@@ -307,17 +607,19 @@ class RoutinePDFGenerationView(APIView):
                 conflicts_count=result.get('conflicts', 0),
                 generations_run=result.get('generations', 0),
                 status='Success',
+                stop_reason=result.get('stop_reason'),
+                profile=result.get('profile'),
                 strategy_type=serializer.validated_data.get('strategy_type', 'genetic_algorithm'),
-                parameters={
-                    'population_size': serializer.validated_data.get('population_size', 9),
-                    'max_generations': serializer.validated_data.get('max_generations', 1000),
-                    'mutation_rate': serializer.validated_data.get('mutation_rate', 0.1),
-                },
+                parameters=dict(parameters, seed=result.get('seed')),
                 created_by=request.user.username if hasattr(request.user, 'username') else None
             )
             
             # Generate PDF
             return self.pdf_service.create_pdf_response(result, filename='routine.pdf')
+        except NotFoundError as e:
+            return Response({'error': e.message}, status=status.HTTP_404_NOT_FOUND)
+        except ValidationError as e:
+            return Response({'error': e.message}, status=status.HTTP_400_BAD_REQUEST)
         except RoutineGenerationError as e:
             # Save failed generation history
             try:
@@ -329,11 +631,7 @@ class RoutinePDFGenerationView(APIView):
                     generations_run=0,
                     status='Failed',
                     strategy_type=serializer.validated_data.get('strategy_type', 'genetic_algorithm'),
-                    parameters={
-                        'population_size': serializer.validated_data.get('population_size', 9),
-                        'max_generations': serializer.validated_data.get('max_generations', 1000),
-                        'mutation_rate': serializer.validated_data.get('mutation_rate', 0.1),
-                    },
+                    parameters=parameters,
                     created_by=request.user.username if hasattr(request.user, 'username') else None
                 )
             except Exception: